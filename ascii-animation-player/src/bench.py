@@ -0,0 +1,185 @@
+"""Headless playback benchmark: the full render path with no frame pacing."""
+import json
+import os
+import platform
+import threading
+import time
+import tty
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from config import ASCIIConfig
+from storage import ASCIIStorage, animation_name
+from frame_cache import ResizedFrameCache
+from renderer import create_renderer
+from telemetry import PlaybackStats, STAGES
+
+# Terminal size for the resize runs
+DEFAULT_SIZE = (80, 24)
+
+# Rows below the frame kept for the status bar, as in the interactive player
+RESERVED_ROWS = 3
+
+SINKS = ('memory', 'pty')
+
+
+class CountingSink:
+    """Output stream that encodes what it is given and counts the bytes."""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, text: str) -> int:
+        self.bytes += len(text.encode('utf-8'))
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class PtySink(CountingSink):
+    """Write to a raw-mode pseudo-terminal whose other end is read and discarded.
+
+    Adds the cost of the kernel tty layer that a real terminal sits behind,
+    without any terminal emulator drawing the output.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._master, slave = os.openpty()
+        tty.setraw(slave)
+        self._file = os.fdopen(slave, 'w', encoding='utf-8')
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        try:
+            while os.read(self._master, 65536):
+                pass
+        except OSError:
+            pass
+
+    def write(self, text: str) -> int:
+        super().write(text)
+        return self._file.write(text)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+        os.close(self._master)
+
+
+def bench_frames(frames: Sequence[str], renderer: str = 'diff', size: Optional[Tuple[int, int]] = None,
+                 sink: str = 'memory', mode: str = 'nearest', ramp: str = '') -> Dict[str, Any]:
+    """Render every frame once as fast as possible and measure it.
+
+    Each frame is fetched from ``frames`` (so lazily decoded sequences pay
+    their decode cost), resized to ``size`` if given, composed and written
+    by ``renderer``. Resized frames are not cached, so every frame pays
+    the resize. Returns frames per second, CPU milliseconds and output
+    bytes per frame, and the mean time of each stage.
+    """
+    if sink not in SINKS:
+        raise ValueError(f"Unknown sink: {sink}")
+    out = PtySink() if sink == 'pty' else CountingSink()
+    output = create_renderer(renderer, out)
+    cache = ResizedFrameCache(frames, prerender=False, mode=mode, ramp=ramp, retain=False)
+    stats = PlaybackStats()
+    output.stats = cache.stats = stats
+    width, height = size or (0, 0)
+    count = len(frames)
+
+    cpu = time.process_time()
+    stats.start()
+    for index in range(count):
+        stats.begin_frame()
+        frame = cache.get(index, width, height - RESERVED_ROWS, size is not None)
+        stats.lap('resize')
+        written = output.render(frame, f"[Frame {index + 1}/{count}]", frame.count('\n') + 2)
+        stats.end_frame(written)
+    stats.pause()
+    cpu = time.process_time() - cpu
+    out.close()
+
+    return {
+        'renderer': renderer,
+        'resize': size is not None,
+        'frames': count,
+        'fps': count / stats.elapsed if stats.elapsed else 0.0,
+        'cpu_ms_per_frame': cpu * 1000 / max(1, count),
+        'bytes_per_frame': out.bytes / max(1, count),
+        'stages_ms': {stage: stats.stages[stage].mean / 1e6 for stage in STAGES},
+    }
+
+
+def bench_file(path: str, renderers: Sequence[str] = ('full', 'diff'),
+               size: Tuple[int, int] = DEFAULT_SIZE, sink: str = 'memory',
+               mode: str = 'nearest') -> List[Dict[str, Any]]:
+    """Benchmark one animation with each renderer, at native size and resized."""
+    data = ASCIIStorage(ASCIIConfig()).load(path)
+    ramp = data['config'].get('ascii_chars', '')
+    results = []
+    for renderer in renderers:
+        for target in (None, size):
+            result = bench_frames(data['frames'], renderer, target, sink, mode, ramp)
+            result['file'] = animation_name(path)
+            results.append(result)
+    return results
+
+
+def bench_library(paths: Sequence[str], renderers: Sequence[str] = ('full', 'diff'),
+                  size: Tuple[int, int] = DEFAULT_SIZE, sink: str = 'memory',
+                  mode: str = 'nearest') -> Dict[str, Any]:
+    """Benchmark every file; the result can be saved as a baseline."""
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'size': list(size),
+        'sink': sink,
+        'resize_mode': mode,
+        'results': [result for path in paths
+                    for result in bench_file(path, renderers, size, sink, mode)],
+    }
+
+
+def save_baseline(report: Dict[str, Any], path: str):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_baseline(report: Dict[str, Any], baseline: Dict[str, Any],
+                     tolerance: float = 0.1) -> List[Dict[str, Any]]:
+    """Match results to a baseline run and flag regressions.
+
+    A run regresses when its fps falls, or its bytes per frame grow, by
+    more than ``tolerance`` (a fraction) against the same file, renderer
+    and resize setting in ``baseline``.
+    """
+    def key(result):
+        return result['file'], result['renderer'], result['resize']
+
+    previous = {key(result): result for result in baseline['results']}
+    changes = []
+    for result in report['results']:
+        base = previous.get(key(result))
+        if base is None:
+            continue
+        fps = result['fps'] / base['fps'] - 1 if base['fps'] else 0.0
+        size = result['bytes_per_frame'] / base['bytes_per_frame'] - 1 if base['bytes_per_frame'] else 0.0
+        changes.append({
+            'file': result['file'],
+            'renderer': result['renderer'],
+            'resize': result['resize'],
+            'fps_change': fps,
+            'bytes_change': size,
+            'regression': fps < -tolerance or size > tolerance,
+        })
+    return changes
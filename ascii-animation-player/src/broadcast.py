@@ -0,0 +1,295 @@
+"""Broadcast one animation to many terminals over TCP (``main.py serve``)."""
+import asyncio
+import io
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from config import ASCIIConfig
+from renderer import FrameRenderer, DiffRenderer, RESET_STYLE
+from pacing import FrameClock
+from frame_cache import ResizedFrameCache
+
+# Size assumed for clients that do not report one (plain ``nc``)
+DEFAULT_SIZE = (80, 24)
+
+# Rows below the frame kept for the status bar, as in the interactive player
+RESERVED_ROWS = 3
+
+# Unsent bytes a client may have queued before it starts missing frames
+MAX_BUFFERED = 64 * 1024
+
+# Pending connections the listening socket queues (viewers often arrive at once)
+BACKLOG = 1024
+
+# Largest window size honoured; bigger NAWS reports are clamped to it
+MAX_WINDOW = (400, 200)
+
+# Distinct sizes served at once, each with its own resized frames in memory
+MAX_SIZE_GROUPS = 16
+
+HIDE_CURSOR = '\033[?25l'
+SHOW_CURSOR = '\033[?25h'
+
+# Telnet protocol bytes (RFC 854) and window size negotiation (RFC 1073)
+IAC, DO, WILL, SB, SE = 255, 253, 251, 250, 240
+ECHO, SUPPRESS_GO_AHEAD, NAWS = 1, 3, 31
+
+# Ask for the window size, and for keys to be sent as typed rather than per line
+TELNET_NEGOTIATE = bytes([IAC, DO, NAWS, IAC, WILL, ECHO, IAC, WILL, SUPPRESS_GO_AHEAD])
+
+
+def parse_telnet(data: bytes) -> Tuple[bytes, Optional[Tuple[int, int]], bytes]:
+    """Split client input into ``(keys, window_size, unparsed_tail)``.
+
+    Telnet commands are stripped; a NAWS subnegotiation gives the window
+    size (the last one wins). An incomplete command at the end is returned
+    as the tail, to be prefixed to the next read.
+    """
+    keys = bytearray()
+    size = None
+    i = 0
+    while i < len(data):
+        byte = data[i]
+        if byte != IAC:
+            keys.append(byte)
+            i += 1
+            continue
+        if i + 1 >= len(data):
+            break
+        command = data[i + 1]
+        if command == SB:
+            end = data.find(bytes([IAC, SE]), i + 2)
+            if end < 0:
+                break
+            payload = data[i + 2:end].replace(bytes([IAC, IAC]), bytes([IAC]))
+            if len(payload) == 5 and payload[0] == NAWS:
+                size = (payload[1] << 8 | payload[2], payload[3] << 8 | payload[4])
+            i = end + 2
+        elif command == IAC:
+            keys.append(IAC)
+            i += 2
+        elif 251 <= command <= 254:  # WILL, WONT, DO, DONT + option
+            if i + 2 >= len(data):
+                break
+            i += 3
+        else:
+            i += 2
+    return bytes(keys), size, data[i:]
+
+
+class Client:
+    """One connected viewer and what it last received."""
+
+    def __init__(self, writer: asyncio.StreamWriter, size: Tuple[int, int]):
+        self.writer = writer
+        self.transport = writer.transport
+        self.size = size
+        self.synced = False  # Screen matches its group's last frame
+        self.frames = 0
+        self.dropped = 0
+
+
+class SizeGroup:
+    """Clients sharing a terminal size, and the output encoded for them.
+
+    Each frame is composed once per group as a diff against the group's
+    previous frame and, only if some client needs it, as a full redraw.
+    Clients that received the previous frame get the diff; new clients and
+    clients that missed a frame get the full redraw.
+    """
+
+    def __init__(self, size: Tuple[int, int], frame_style: str = ''):
+        self.size = size
+        self.clients: List[Client] = []
+        self._out = io.StringIO()
+        self._diff = DiffRenderer(self._out, frame_style)
+        self._full = FrameRenderer(self._out, frame_style)
+        self._frame: Optional[Tuple[str, str]] = None
+        self._full_payload: Optional[bytes] = None
+
+    def encode(self, frame: str, status: str) -> bytes:
+        """Diff payload for the next frame."""
+        self._frame = (frame, status)
+        self._full_payload = None
+        return self._capture(self._diff, frame, status)
+
+    def full_payload(self) -> bytes:
+        """Full redraw of the frame last passed to ``encode``."""
+        if self._full_payload is None:
+            self._full.reset()
+            self._full_payload = self._capture(self._full, *self._frame)
+        return self._full_payload
+
+    def _capture(self, renderer: FrameRenderer, frame: str, status: str) -> bytes:
+        self._out.seek(0)
+        self._out.truncate()
+        renderer.render(frame, status, self.size[1] - 2)
+        return self._out.getvalue().encode('utf-8')
+
+
+class BroadcastServer:
+    """Play one animation, in a loop, to every connected TCP client.
+
+    Frames are paced by a single ``FrameClock`` and resized once per
+    distinct client size (see ``SizeGroup``); writes never wait for a
+    client. A client with more than ``max_buffered`` bytes still unsent
+    skips frames until it catches up, then gets a full redraw, so slow
+    viewers never hold up the rest. Telnet clients report their window
+    size; others get ``default_size``. Pressing ``q`` disconnects.
+
+    Reported sizes are clamped to ``MAX_WINDOW``, and at most
+    ``max_groups`` sizes are served at once: past that, a client joins
+    the largest existing group that fits its window (or the smallest
+    group, if none does). A group's resized frames are dropped when its
+    last client leaves, so the cache never holds more than ``max_groups``
+    layouts however many sizes clients report.
+    """
+
+    def __init__(self, frames: Sequence[str], fps: float, config: ASCIIConfig = None,
+                 default_size: Tuple[int, int] = DEFAULT_SIZE, max_buffered: int = MAX_BUFFERED,
+                 max_groups: int = MAX_SIZE_GROUPS):
+        self.frames = frames
+        self.fps = fps
+        self.config = config or ASCIIConfig()
+        self.default_size = default_size
+        self.max_buffered = max_buffered
+        self.max_groups = max(1, max_groups)
+        self.groups: Dict[Tuple[int, int], SizeGroup] = {}
+        self.frames_sent = 0
+        self.dropped = 0
+        self.frame_cache = ResizedFrameCache(frames, self.config.resize_cache_sizes, prerender=False,
+                                             mode=self.config.resize_mode, ramp=self.config.ascii_chars)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._broadcaster: Optional[asyncio.Task] = None
+        self._joined: Optional[asyncio.Event] = None
+        self._handlers: Set[asyncio.Task] = set()
+
+    @property
+    def clients(self) -> List[Client]:
+        return [client for group in self.groups.values() for client in group.clients]
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> asyncio.AbstractServer:
+        """Start listening and broadcasting; ``port=0`` picks a free port."""
+        self._joined = asyncio.Event()
+        self._server = await asyncio.start_server(self._handle_client, host, port, backlog=BACKLOG)
+        self._broadcaster = asyncio.create_task(self._broadcast_loop())
+        return self._server
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self, host: str = '127.0.0.1', port: int = 0):
+        server = await self.start(host, port)
+        try:
+            await server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Stop broadcasting and disconnect every client."""
+        if self._broadcaster is not None:
+            self._broadcaster.cancel()
+        for client in self.clients:
+            client.transport.abort()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        self.groups.clear()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client = Client(writer, self.default_size)
+        writer.write(TELNET_NEGOTIATE + HIDE_CURSOR.encode())
+        reported = self.default_size
+        self._join(client, reported)
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        tail = b''
+        try:
+            while True:
+                data = await reader.read(1024)
+                if not data:
+                    break
+                keys, size, tail = parse_telnet(tail + data)
+                if size and all(size) and size != reported:
+                    reported = size
+                    self._leave(client)
+                    self._join(client, size)
+                if b'q' in keys.lower():
+                    writer.write(f"{RESET_STYLE}{SHOW_CURSOR}\r\n".encode())
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._leave(client)
+            self._handlers.discard(handler)
+            writer.close()
+
+    def _join(self, client: Client, size: Tuple[int, int]):
+        client.size = self._group_size(size)
+        group = self.groups.get(client.size)
+        if group is None:
+            group = self.groups[client.size] = SizeGroup(client.size)
+            self.frame_cache.max_sizes = max(self.config.resize_cache_sizes, len(self.groups))
+        client.synced = False
+        group.clients.append(client)
+        self._joined.set()
+
+    def _group_size(self, size: Tuple[int, int]) -> Tuple[int, int]:
+        """Size of the group a client with a ``size`` window joins."""
+        size = (min(size[0], MAX_WINDOW[0]), min(size[1], MAX_WINDOW[1]))
+        if size in self.groups or len(self.groups) < self.max_groups:
+            return size
+        fitting = [group for group in self.groups if group[0] <= size[0] and group[1] <= size[1]]
+        if fitting:
+            return max(fitting, key=lambda group: group[0] * group[1])
+        return min(self.groups, key=lambda group: group[0] * group[1])
+
+    def _leave(self, client: Client):
+        group = self.groups.get(client.size)
+        if group is not None and client in group.clients:
+            group.clients.remove(client)
+            if not group.clients:
+                del self.groups[client.size]
+                width, height = client.size
+                self.frame_cache.discard(width, height - RESERVED_ROWS)
+                self.frame_cache.max_sizes = max(self.config.resize_cache_sizes, len(self.groups))
+
+    async def _broadcast_loop(self):
+        clock = FrameClock(self.fps)
+        index = 0
+        while True:
+            if not self.groups:
+                # Nobody watching: wait for a viewer, then start on time
+                self._joined.clear()
+                await self._joined.wait()
+                clock.reset(index)
+            index, delay = clock.schedule(index)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if index >= len(self.frames):
+                index = 0
+                clock.reset(0)
+            self.send_frame(index)
+            index += 1
+
+    def send_frame(self, index: int):
+        """Encode frame ``index`` once per size group and write it to every client."""
+        viewers = sum(len(group.clients) for group in self.groups.values())
+        status = f"[Frame {index + 1}/{len(self.frames)}] [Viewers: {viewers}]"
+        for (width, height), group in list(self.groups.items()):
+            diff = None
+            for client in group.clients:
+                if client.transport.is_closing():
+                    continue
+                if client.transport.get_write_buffer_size() > self.max_buffered:
+                    client.synced = False
+                    client.dropped += 1
+                    self.dropped += 1
+                    continue
+                if diff is None:
+                    frame = self.frame_cache.get(index, width, height - RESERVED_ROWS)
+                    diff = group.encode(frame, status[:width])
+                client.transport.write(diff if client.synced else group.full_payload())
+                client.synced = True
+                client.frames += 1
+                self.frames_sent += 1
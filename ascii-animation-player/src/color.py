@@ -0,0 +1,179 @@
+"""Per-cell colour: quantized colour planes, terminal palettes and SGR runs.
+
+A colour plane is a ``(rows, cols, 3)`` uint8 RGB array aligned with a
+frame's glyph grid. For playback each plane is mapped to one integer code
+per cell for the terminal's colour mode (packed RGB for ``truecolor``, a
+palette index otherwise), and each row is written as runs of equal codes,
+so an SGR sequence is only emitted where the colour changes.
+"""
+import numpy as np
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+from resize import FrameLayout
+
+COLOR_MODES = ('mono', 'ansi', 'ansi256', 'truecolor')
+
+# Bits kept per channel when colour planes are stored
+DEFAULT_COLOR_BITS = 5
+
+# Code for cells without colour (padding, centring margins)
+NO_COLOR = -1
+DEFAULT_FOREGROUND = '\033[39m'
+
+# xterm's default 16-colour palette
+ANSI16_RGB = [
+    (0, 0, 0), (205, 0, 0), (0, 205, 0), (205, 205, 0),
+    (0, 0, 238), (205, 0, 205), (0, 205, 205), (229, 229, 229),
+    (127, 127, 127), (255, 0, 0), (0, 255, 0), (255, 255, 0),
+    (92, 92, 255), (255, 0, 255), (0, 255, 255), (255, 255, 255),
+]
+
+# Channel levels of the 6x6x6 cube in the 256-colour palette
+CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+
+# Palette lookups are indexed by RGB reduced to this many bits per channel
+_LUT_BITS = 5
+
+
+def quantize(planes: np.ndarray, bits: int = DEFAULT_COLOR_BITS) -> np.ndarray:
+    """Keep the top ``bits`` of each channel, repeating them into the low
+    bits so that black stays 0 and white stays 255."""
+    planes = np.asarray(planes, dtype=np.uint8)
+    if bits >= 8:
+        return planes
+    high = planes & (0xFF << (8 - bits) & 0xFF)
+    fill = high
+    for shift in range(bits, 8, bits):
+        fill = fill | (high >> shift)
+    return fill.astype(np.uint8)
+
+
+def stack_colors(planes: Sequence[np.ndarray], shape: Tuple[int, int],
+                 bits: int = DEFAULT_COLOR_BITS) -> np.ndarray:
+    """Quantize per-frame planes into one ``(frames, rows, cols, 3)`` array.
+
+    Planes smaller than ``shape`` (ragged frames) are padded with black.
+    """
+    rows, cols = shape
+    stacked = np.zeros((len(planes), rows, cols, 3), dtype=np.uint8)
+    for index, plane in enumerate(planes):
+        plane = quantize(plane, bits)[:rows, :cols]
+        stacked[index, :plane.shape[0], :plane.shape[1]] = plane
+    return stacked
+
+
+def cell_colors(image: np.ndarray, rows: int, cols: int, bgr: bool = True) -> np.ndarray:
+    """Average colour of each cell when ``image`` is split into a
+    ``rows`` x ``cols`` grid (one cell per output character).
+
+    ``image`` is a video frame as decoded by OpenCV (BGR, or greyscale).
+    """
+    if image.ndim == 2:
+        image = np.repeat(image[..., None], 3, axis=2)
+    height, width = image.shape[:2]
+    row_starts = (np.arange(rows) * height) // max(1, rows)
+    col_starts = (np.arange(cols) * width) // max(1, cols)
+    sums = np.add.reduceat(image.astype(np.float32), col_starts, axis=1)
+    sums = np.add.reduceat(sums, row_starts, axis=0)
+    counts = (np.diff(np.append(row_starts, height))[:, None]
+              * np.diff(np.append(col_starts, width))[None, :])[..., None]
+    planes = np.clip(sums / counts + 0.5, 0, 255).astype(np.uint8)
+    return planes[..., ::-1] if bgr else planes
+
+
+def _palette(mode: str) -> np.ndarray:
+    if mode == 'ansi':
+        return np.array(ANSI16_RGB, dtype=np.float32)
+    cube = [(r, g, b) for r in CUBE_LEVELS for g in CUBE_LEVELS for b in CUBE_LEVELS]
+    grays = [(level, level, level) for level in range(8, 248, 10)]
+    return np.array(ANSI16_RGB + cube + grays, dtype=np.float32)
+
+
+@lru_cache(maxsize=None)
+def palette_lut(mode: str) -> np.ndarray:
+    """Nearest palette index for every RGB colour reduced to 5 bits per channel.
+
+    Built once per mode (32768 entries), so mapping a frame is one
+    indexing operation. The 256-colour mode only picks from the cube and
+    grey ramp, whose colours do not depend on the terminal's theme.
+    """
+    palette = _palette(mode)
+    first = 0 if mode == 'ansi' else 16
+    candidates = palette[first:]
+    levels = (np.arange(1 << _LUT_BITS, dtype=np.float32) * 255 / ((1 << _LUT_BITS) - 1))
+    r, g, b = np.meshgrid(levels, levels, levels, indexing='ij')
+    colors = np.stack([r.ravel(), g.ravel(), b.ravel()], axis=1)
+    lut = np.empty(len(colors), dtype=np.int32)
+    for start in range(0, len(colors), 4096):
+        block = colors[start:start + 4096]
+        distance = ((block[:, None, :] - candidates[None, :, :]) ** 2).sum(axis=2)
+        lut[start:start + 4096] = distance.argmin(axis=1) + first
+    return lut
+
+
+def color_codes(planes: np.ndarray, mode: str) -> np.ndarray:
+    """Map a ``(rows, cols, 3)`` plane to one integer code per cell for ``mode``."""
+    planes = np.asarray(planes)
+    r, g, b = (planes[..., channel].astype(np.int32) for channel in range(3))
+    if mode == 'truecolor':
+        return r << 16 | g << 8 | b
+    if mode not in ('ansi', 'ansi256'):
+        raise ValueError(f"Unknown colour mode: {mode}")
+    drop = 8 - _LUT_BITS
+    return palette_lut(mode)[(r >> drop) << 2 * _LUT_BITS | (g >> drop) << _LUT_BITS | b >> drop]
+
+
+@lru_cache(maxsize=65536)
+def sgr(code: int, mode: str) -> str:
+    """SGR sequence setting the foreground to ``code`` in ``mode``."""
+    if code == NO_COLOR:
+        return DEFAULT_FOREGROUND
+    if mode == 'truecolor':
+        return f'\033[38;2;{code >> 16};{code >> 8 & 0xFF};{code & 0xFF}m'
+    if mode == 'ansi256':
+        return f'\033[38;5;{code}m'
+    return f'\033[{30 + code if code < 8 else 82 + code}m'
+
+
+def fit_colors(codes: np.ndarray, layout: FrameLayout) -> np.ndarray:
+    """Lay out a frame's codes at the same cells as its text.
+
+    ``layout`` is the ``FrameLayout`` the frame cache used for the text;
+    centring margins and cells beyond the plane get ``NO_COLOR``.
+    """
+    rows, cols = layout.row_points, layout.col_points
+    rows, cols = rows[rows < codes.shape[0]], cols[cols < codes.shape[1]]
+    fitted = np.full((layout.top + layout.target_rows, layout.left + layout.target_cols),
+                     NO_COLOR, dtype=codes.dtype)
+    fitted[layout.top:layout.top + len(rows), layout.left:layout.left + len(cols)] = \
+        codes[rows[:, None], cols[None, :]]
+    return fitted
+
+
+def style_rows(lines: List[str], codes: Optional[np.ndarray], mode: str) -> List[str]:
+    """Prefix each run of equally coloured cells with one SGR sequence.
+
+    Every styled row ends on the default foreground, so rows can be
+    redrawn independently. Text beyond the colour plane is left unstyled.
+    """
+    if codes is None or not len(codes):
+        return lines
+    rows, cols = codes.shape
+    starts = np.ones(codes.shape, dtype=bool)
+    starts[:, 1:] = codes[:, 1:] != codes[:, :-1]
+    styled = []
+    for row, line in enumerate(lines):
+        if row >= rows or not line:
+            styled.append(line)
+            continue
+        cells = min(len(line), cols)
+        row_codes = codes[row]
+        bounds = np.flatnonzero(starts[row, :cells]).tolist() + [cells]
+        parts = []
+        for start, end in zip(bounds, bounds[1:]):
+            parts.append(sgr(int(row_codes[start]), mode))
+            parts.append(line[start:end])
+        parts.append(DEFAULT_FOREGROUND)
+        parts.append(line[cells:])
+        styled.append(''.join(parts))
+    return styled
@@ -0,0 +1,95 @@
+"""Whole-file compression helpers, including block-parallel compression."""
+import bz2
+import gzip
+import io
+import lzma
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+OPEN_FUNCS = {'none': open, 'gzip': gzip.open, 'lzma': lzma.open, 'bz2': bz2.open}
+
+# One-shot compressors producing a complete gzip member / bz2 stream / xz
+# stream, so that concatenated blocks are still readable by OPEN_FUNCS.
+BLOCK_COMPRESSORS = {
+    'gzip': lambda block: gzip.compress(block, compresslevel=9),
+    'lzma': lambda block: lzma.compress(block, format=lzma.FORMAT_XZ),
+    'bz2': lambda block: bz2.compress(block, compresslevel=9),
+}
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+
+def resolve_workers(workers: int) -> int:
+    """Translate a configured worker count (0 = one per CPU) into a number."""
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+class ParallelCompressedFile(io.RawIOBase):
+    """Binary file that compresses fixed-size blocks on a thread pool.
+
+    Every block becomes an independent gzip member, bz2 stream or xz
+    stream, written in order, so the result is a standard multi-member
+    file that the regular single-threaded readers accept. zlib, bz2 and
+    lzma release the GIL while compressing, so threads scale with cores.
+    At most two blocks per worker are held in memory at a time.
+    """
+
+    def __init__(self, path: str, compression: str, workers: int,
+                 block_size: int = DEFAULT_BLOCK_SIZE):
+        super().__init__()
+        self._compress = BLOCK_COMPRESSORS[compression]
+        self._workers = resolve_workers(workers)
+        self._block_size = block_size
+        self._buffer = bytearray()
+        self._pending = deque()
+        self._pool = ThreadPoolExecutor(max_workers=self._workers)
+        self._file = open(path, 'wb')
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self._block_size:
+            self._submit(bytes(self._buffer[:self._block_size]))
+            del self._buffer[:self._block_size]
+        return len(data)
+
+    def _submit(self, block: bytes):
+        self._pending.append(self._pool.submit(self._compress, block))
+        while len(self._pending) > 2 * self._workers:
+            self._file.write(self._pending.popleft().result())
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._file.write(self._pending.popleft().result())
+        finally:
+            self._pool.shutdown()
+            self._file.close()
+            super().close()
+
+
+def open_compressed(path: str, mode: str, compression: str, workers: int = 1,
+                    block_size: int = DEFAULT_BLOCK_SIZE):
+    """Open ``path`` for writing through the configured compressor.
+
+    ``mode`` is ``'wb'`` or ``'wt'``; text is written as UTF-8. With more
+    than one worker (0 = one per CPU) blocks are compressed in parallel.
+    """
+    text = 't' in mode
+    if compression == 'none' or workers == 1:
+        if text:
+            return OPEN_FUNCS[compression](path, 'wt', encoding='utf-8')
+        return OPEN_FUNCS[compression](path, 'wb')
+
+    raw = ParallelCompressedFile(path, compression, workers, block_size)
+    if text:
+        return io.TextIOWrapper(io.BufferedWriter(raw, buffer_size=block_size), encoding='utf-8')
+    return raw
@@ -32,23 +32,35 @@ class ASCIIConfig:
     reverse_chars: bool = False  # Reverse the character mapping
     color_mode: str = "mono"  # "mono", "ansi", "ansi256", "truecolor"
     background: str = "black"  # Background color for colored modes
+    color_bits: int = 5  # Bits per channel kept in stored colour planes
     
     # Advanced ASCII options
     use_braille: bool = False  # Use Unicode Braille characters for higher resolution
     dithering: bool = False  # Apply dithering for smoother gradients
+    dither_mode: str = "diffusion"  # "diffusion" (error diffusion), "bayer2", "bayer4", "bayer8", "blue-noise"
     edge_detection: bool = False  # Emphasize edges
     edge_threshold: float = 100.0  # Threshold for edge detection
     
     # Storage options
     compression: str = "gzip"  # "none", "gzip", "lzma", "bz2"
-    storage_format: str = "pickle"  # "pickle", "json", "npz"
+    compression_workers: int = 1  # Threads compressing blocks in parallel when saving (0 = one per CPU)
+    storage_format: str = "pickle"  # "pickle", "json", "jsonl", "npz", "container", "web"
+    compression_dict: Optional[str] = None  # Trained zlib dictionary for per-frame container compression
+    keyframe_interval: int = 0  # Full frame every N frames, deltas in between (0 = all full frames)
+    row_store: Optional[str] = None  # Shared store for interned frame rows (None = store frames inline)
+    web_chunk_frames: int = 60  # Frames per chunk in web exports (the first chunk is shorter)
     
     # Playback options
     playback_speed: float = 1.0  # Speed multiplier
     loop: bool = False  # Loop the animation
     show_progress: bool = True  # Show progress bar during conversion
-    clear_screen: bool = True  # Clear screen between frames
+    clear_screen: bool = True  # Clear screen between frames (full renderer only)
+    renderer: str = "diff"  # "diff" (write only changed runs) or "full" (redraw every frame)
     auto_resize_playback: bool = True  # Auto-resize during playback
+    resize_cache_sizes: int = 2  # Terminal sizes whose resized frames are kept in memory
+    resize_cache_frames: int = 4096  # Resized frames kept per terminal size for streamed files
+    resize_mode: str = "nearest"  # "nearest" (sample glyphs) or "area" (average glyph density)
+    prefetch_frames: int = 64  # Frames decoded ahead of playback by the background decoder
     
     @classmethod
     def from_yaml(cls, path: str) -> 'ASCIIConfig':
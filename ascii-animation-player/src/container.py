@@ -0,0 +1,185 @@
+"""Seekable, memory-mapped container format for ASCII animations.
+
+Layout (all integers little-endian)::
+
+    header     fixed size, see HEADER_FORMAT
+    frames     one independently compressed blob per frame
+    metadata   UTF-8 JSON with config, metadata, version and encoding
+    index      (frame_count + 1) uint64 offsets into the file
+
+The metadata block and offset table are written after the frames so that
+frames can be streamed to disk; the header is patched on close to point
+at them. Version 2 headers also carry the id of the preset dictionary used
+by the ``zdict`` codec (all zeros when there is none). Readers map the file and only decompress a frame when it is
+indexed, so opening costs the same regardless of animation length.
+"""
+import bz2
+import json
+import lzma
+import mmap
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Sequence
+from dictionary import dictionary_id, find_dictionary
+
+MAGIC = b'ASCA'
+CONTAINER_VERSION = 2
+
+# magic, container version, codec, flags, frame count,
+# metadata offset, metadata length, index offset[, dictionary id]
+HEADER_V1_FORMAT = '<4sHBBIQQQ'
+HEADER_FORMAT = HEADER_V1_FORMAT + '8s'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+OFFSET_FORMAT = '<Q'
+OFFSET_SIZE = struct.calcsize(OFFSET_FORMAT)
+NO_DICTIONARY = b'\0' * 8
+
+CODECS = {'none': 0, 'gzip': 1, 'lzma': 2, 'bz2': 3, 'zdict': 4}
+CODEC_NAMES = {value: key for key, value in CODECS.items()}
+
+
+def compress_frame(data: bytes, compression: str, zdict: bytes = None) -> bytes:
+    """Compress a single frame blob."""
+    if compression == 'none':
+        return data
+    elif compression == 'gzip':
+        return zlib.compress(data, 9)
+    elif compression == 'zdict':
+        compressor = zlib.compressobj(9, zdict=zdict)
+        return compressor.compress(data) + compressor.flush()
+    elif compression == 'lzma':
+        return lzma.compress(data, check=lzma.CHECK_NONE)
+    elif compression == 'bz2':
+        return bz2.compress(data)
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def decompress_frame(data: bytes, compression: str, zdict: bytes = None) -> bytes:
+    """Decompress a single frame blob."""
+    if compression == 'none':
+        return bytes(data)
+    elif compression == 'gzip':
+        return zlib.decompress(data)
+    elif compression == 'zdict':
+        decompressor = zlib.decompressobj(zdict=zdict)
+        return decompressor.decompress(data) + decompressor.flush()
+    elif compression == 'lzma':
+        return lzma.decompress(data)
+    elif compression == 'bz2':
+        return bz2.decompress(data)
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def encode_record(record: Any, encoding: Dict[str, Any] = None) -> bytes:
+    """Serialize a frame record (a string, or a delta record) to bytes."""
+    if encoding:
+        return json.dumps(record, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return record.encode('utf-8')
+
+
+def decode_record(data: bytes, encoding: Dict[str, Any] = None) -> Any:
+    """Inverse of :func:`encode_record`."""
+    if encoding:
+        return json.loads(data)
+    return data.decode('utf-8')
+
+
+class ContainerWriter:
+    """Write frame records one by one into a container file.
+
+    Passing ``zdict`` compresses every frame with zlib against that preset
+    dictionary and records the dictionary's id in the header.
+    """
+
+    def __init__(self, path: str, compression: str, encoding: Dict[str, Any] = None,
+                 zdict: bytes = None):
+        self.path = path
+        self.compression = 'zdict' if zdict else compression
+        self.encoding = encoding
+        self.zdict = zdict
+        self.offsets = []
+        self._file = open(path, 'wb')
+        self._file.write(b'\0' * HEADER_SIZE)
+
+    def append(self, record: Any):
+        """Compress and write the next frame record."""
+        self.offsets.append(self._file.tell())
+        blob = encode_record(record, self.encoding)
+        self._file.write(compress_frame(blob, self.compression, self.zdict))
+
+    def close(self, info: Dict[str, Any]):
+        """Write the metadata block and offset table, then patch the header.
+
+        ``info`` holds the ``config``, ``metadata`` and ``version`` entries
+        (and ``encoding`` for delta-encoded frames).
+        """
+        self.offsets.append(self._file.tell())
+
+        metadata_offset = self._file.tell()
+        metadata_block = json.dumps(info).encode('utf-8')
+        self._file.write(metadata_block)
+
+        index_offset = self._file.tell()
+        for offset in self.offsets:
+            self._file.write(struct.pack(OFFSET_FORMAT, offset))
+
+        dict_id = bytes.fromhex(dictionary_id(self.zdict)) if self.zdict else NO_DICTIONARY
+        self._file.seek(0)
+        self._file.write(struct.pack(
+            HEADER_FORMAT, MAGIC, CONTAINER_VERSION, CODECS[self.compression], 0,
+            len(self.offsets) - 1, metadata_offset, len(metadata_block), index_offset, dict_id
+        ))
+        self._file.close()
+
+
+class ContainerRecords(Sequence):
+    """Lazy sequence of frame records backed by a memory-mapped container.
+
+    Dictionaries referenced by the header are looked up next to the file,
+    in a ``dictionaries/`` directory beside it, then in the package default.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version = struct.unpack_from('<4sH', self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not an ASCII animation container: {path}")
+        if version > CONTAINER_VERSION:
+            raise ValueError(f"Unsupported container version: {version}")
+
+        header_format = HEADER_V1_FORMAT if version == 1 else HEADER_FORMAT
+        (_magic, _version, codec, _flags, frame_count, metadata_offset,
+         metadata_length, index_offset, *dict_id) = struct.unpack_from(header_format, self._map, 0)
+
+        self.compression = CODEC_NAMES[codec]
+        self.dictionary_id = dict_id[0].hex() if dict_id and dict_id[0] != NO_DICTIONARY else None
+        self.zdict = None
+        if self.dictionary_id:
+            directory = Path(path).resolve().parent
+            self.zdict = find_dictionary(self.dictionary_id, [directory, directory / 'dictionaries'])
+        self.frame_count = frame_count
+        self.info = json.loads(self._map[metadata_offset:metadata_offset + metadata_length])
+        self.encoding = self.info.get('encoding')
+        self._index_offset = index_offset
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += self.frame_count
+        if not 0 <= index < self.frame_count:
+            raise IndexError("frame index out of range")
+
+        start, end = struct.unpack_from('<QQ', self._map, self._index_offset + index * OFFSET_SIZE)
+        blob = decompress_frame(self._map[start:end], self.compression, self.zdict)
+        return decode_record(blob, self.encoding)
+
+    def close(self):
+        """Release the memory map."""
+        self._map.close()
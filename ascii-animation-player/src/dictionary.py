@@ -0,0 +1,74 @@
+"""Trained preset dictionaries for per-frame zlib compression."""
+import hashlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+# zlib only looks back 32 KB, so a larger dictionary is never used
+DICTIONARY_SIZE = 32 * 1024
+NGRAM_SIZE = 4
+DICTIONARY_SUFFIX = '.zdict'
+DEFAULT_DICTIONARY_DIR = Path(__file__).resolve().parent.parent / 'dictionaries'
+
+_loaded: Dict[str, bytes] = {}
+
+
+def train_dictionary(animations: Iterable[Sequence[str]], size: int = DICTIONARY_SIZE,
+                     frames_per_animation: int = 16) -> bytes:
+    """Build a zlib preset dictionary from a sample of animation frames.
+
+    Frames are sampled evenly from each animation. Rows that repeat and
+    short glyph n-grams are scored by how many bytes they cover, and the
+    best ones are packed with the most valuable last, since zlib reaches
+    the end of the dictionary with the shortest distances.
+    """
+    counts = Counter()
+    for frames in animations:
+        step = max(1, len(frames) // frames_per_animation)
+        for index in range(0, len(frames), step):
+            for line in frames[index].split('\n'):
+                data = (line + '\n').encode('utf-8')
+                counts[data] += 1
+                for start in range(len(data) - NGRAM_SIZE + 1):
+                    counts[data[start:start + NGRAM_SIZE]] += 1
+
+    repeated = [(segment, count) for segment, count in counts.items() if count >= 2]
+    chosen: List[bytes] = []
+    total = 0
+    for segment, count in sorted(repeated, key=lambda item: -item[1] * len(item[0])):
+        if total + len(segment) > size:
+            continue
+        chosen.append(segment)
+        total += len(segment)
+    return b''.join(reversed(chosen))
+
+
+def dictionary_id(zdict: bytes) -> str:
+    """Version identifier of a dictionary, derived from its content."""
+    return hashlib.sha256(zdict).hexdigest()[:16]
+
+
+def save_dictionary(zdict: bytes, directory: str) -> Path:
+    """Write a dictionary as ``<id>.zdict`` and return its path."""
+    path = Path(directory) / f"{dictionary_id(zdict)}{DICTIONARY_SUFFIX}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(zdict)
+    return path
+
+
+def read_dictionary(path: str) -> bytes:
+    """Read a dictionary file."""
+    zdict = Path(path).read_bytes()
+    _loaded[dictionary_id(zdict)] = zdict
+    return zdict
+
+
+def find_dictionary(dict_id: str, search_dirs: Iterable[Path]) -> bytes:
+    """Locate a dictionary by id in ``search_dirs`` or the default directory."""
+    if dict_id in _loaded:
+        return _loaded[dict_id]
+    for directory in list(search_dirs) + [DEFAULT_DICTIONARY_DIR]:
+        path = Path(directory) / f"{dict_id}{DICTIONARY_SUFFIX}"
+        if path.exists():
+            return read_dictionary(str(path))
+    raise FileNotFoundError(f"Compression dictionary {dict_id} not found")
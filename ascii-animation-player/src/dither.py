@@ -0,0 +1,98 @@
+"""Threshold-map dithering: ordered (Bayer) and tiled blue noise.
+
+Each mode is a small matrix of thresholds in (0, 1) tiled over the
+frame, so dithering costs one vectorised compare (Braille dots) or one
+add-and-floor (glyph levels) per frame, with no per-pixel loop. Unlike
+error diffusion the threshold at a pixel never depends on its
+neighbours, so a pixel that does not change between frames keeps its
+glyph, which keeps delta-encoded animations small.
+"""
+import numpy as np
+from functools import lru_cache
+
+# ``diffusion`` is the processor's own error-diffusion dithering
+DITHER_MODES = ('diffusion', 'bayer2', 'bayer4', 'bayer8', 'blue-noise')
+THRESHOLD_MODES = DITHER_MODES[1:]
+
+BLUE_NOISE_SIZE = 64
+BLUE_NOISE_SEED = 0x2800
+
+
+def bayer_matrix(size: int) -> np.ndarray:
+    """``size`` x ``size`` Bayer index matrix (``size`` a power of two)."""
+    if size < 2 or size & (size - 1):
+        raise ValueError(f"Bayer matrix size must be a power of two, got {size}")
+    matrix = np.array([[0, 2], [3, 1]], dtype=np.int32)
+    while len(matrix) < size:
+        matrix = np.block([[4 * matrix, 4 * matrix + 2],
+                           [4 * matrix + 3, 4 * matrix + 1]])
+    return matrix
+
+
+def blue_noise_matrix(size: int = BLUE_NOISE_SIZE, seed: int = BLUE_NOISE_SEED) -> np.ndarray:
+    """``size`` x ``size`` rank matrix with mostly high-frequency energy.
+
+    White noise is high-pass filtered in the frequency domain (so the
+    result wraps around and tiles without seams) and replaced by its
+    ranks, which makes every threshold level equally common.
+    """
+    noise = np.random.default_rng(seed).random((size, size))
+    freq_y = np.fft.fftfreq(size)[:, None]
+    freq_x = np.fft.fftfreq(size)[None, :]
+    radius = np.sqrt(freq_y ** 2 + freq_x ** 2)
+    high_pass = 1 - np.exp(-(radius / 0.15) ** 2)
+    filtered = np.fft.ifft2(np.fft.fft2(noise) * high_pass).real
+    return np.argsort(np.argsort(filtered, axis=None)).reshape(size, size).astype(np.int32)
+
+
+@lru_cache(maxsize=None)
+def threshold_matrix(mode: str) -> np.ndarray:
+    """Thresholds in (0, 1) for ``mode``, evenly spread over the levels."""
+    if mode == 'blue-noise':
+        ranks = blue_noise_matrix()
+    elif mode in THRESHOLD_MODES:
+        ranks = bayer_matrix(int(mode[len('bayer'):]))
+    else:
+        raise ValueError(f"Unknown dither mode: {mode}")
+    thresholds = ((ranks + 0.5) / ranks.size).astype(np.float32)
+    thresholds.flags.writeable = False
+    return thresholds
+
+
+@lru_cache(maxsize=16)
+def threshold_map(mode: str, height: int, width: int) -> np.ndarray:
+    """The ``mode`` matrix tiled over a ``height`` x ``width`` frame.
+
+    Tiles are anchored at the top-left, so the same pixel always gets
+    the same threshold from frame to frame.
+    """
+    matrix = threshold_matrix(mode)
+    reps = (-(-height // matrix.shape[0]), -(-width // matrix.shape[1]))
+    tiled = np.tile(matrix, reps)[:height, :width]
+    tiled.flags.writeable = False
+    return tiled
+
+
+def dither_dots(gray: np.ndarray, mode: str) -> np.ndarray:
+    """Raised dots of ``(..., height, width)`` brightness, e.g. for Braille.
+
+    A pixel is set where its brightness exceeds its threshold, so a flat
+    area of brightness ``v`` raises about ``v / 255`` of its dots.
+    """
+    gray = np.asarray(gray)
+    height, width = gray.shape[-2:]
+    return gray > threshold_map(mode, height, width) * 255
+
+
+def dither_levels(gray: np.ndarray, levels: int, mode: str) -> np.ndarray:
+    """Quantize ``(..., height, width)`` brightness to ``levels`` steps.
+
+    Each pixel rounds up where its fractional level exceeds its
+    threshold, so flat areas between two glyphs mix them in proportion.
+    Returns level indices, 0 for black.
+    """
+    gray = np.asarray(gray)
+    height, width = gray.shape[-2:]
+    scaled = gray.astype(np.float32) * ((levels - 1) / 255)
+    dithered = np.floor(scaled + threshold_map(mode, height, width))
+    return np.minimum(dithered, levels - 1).astype(np.uint8 if levels <= 256 else np.uint16)
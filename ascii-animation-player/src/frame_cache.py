@@ -0,0 +1,174 @@
+"""Cache of frames resized (and centred) for the current terminal size."""
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+from glyphs import GlyphFrames
+from resize import FrameLayout, plan_layout, resize_frames
+from terminal_utils import frame_layout, pad_frame, resize_ascii_frame, trim_frame
+
+# (width, height, resize, center)
+CacheKey = Tuple[int, int, bool, bool]
+
+# A laid-out frame and the layout it was laid out with
+Entry = Tuple[str, FrameLayout]
+
+# Frames resized per batch when prerendering glyph-index arrays
+PRERENDER_BATCH = 64
+
+
+class ResizedFrameCache:
+    """Resized frames keyed by frame index and target layout.
+
+    Each layout (target width and height, whether to resize, whether to
+    centre) gets a slot per frame. The first request for a new layout
+    starts a background thread that prerenders the whole animation for
+    it, while ``get`` renders any frame it needs that is not ready yet.
+    Once a layout is filled, playback does no resize work at all. Only
+    the ``max_sizes`` most recently used layouts are kept.
+
+    ``frames`` may be a lazily decoded sequence; it is only ever indexed
+    under a lock, so the prerender thread and playback can share it. When
+    it is a ``GlyphFrames`` array (npz files), frames with the same
+    content bounds are resized in batches straight from the array, laid
+    out exactly as their strings would be (in ``'area'`` mode the glyphs
+    are picked from the animation's whole palette). ``mode`` is the resize mode
+    (``'nearest'`` or ``'area'``). With ``retain=False`` nothing is kept
+    and every ``get`` lays its frame out afresh. ``max_frames`` bounds the
+    frames kept per layout, for streamed sources that must not end up in
+    memory whole: the first ``max_frames`` frames are kept and replay with
+    no resize work, later ones are laid out afresh on every ``get``. If ``stats`` is set to a
+    ``PlaybackStats``, fetching source frames for ``get`` is timed as the
+    decode stage. ``get_with_layout`` also returns the ``FrameLayout``
+    of the frame, so its colours can be laid out at the same cells.
+    """
+
+    def __init__(self, frames: Sequence[str], max_sizes: int = 2, prerender: bool = True,
+                 mode: str = 'nearest', ramp: str = '', retain: bool = True,
+                 max_frames: Optional[int] = None):
+        self.frames = frames
+        self.max_sizes = max(1, max_sizes)
+        self.prerender = prerender and retain
+        self.retain = retain
+        self.max_frames = max_frames
+        self.mode = mode
+        self.ramp = ramp
+        self.misses = 0
+        self.stats = None
+        self._layouts: 'OrderedDict[CacheKey, List[Optional[Entry]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._source_lock = threading.Lock()
+        self._closed = False
+
+    def get(self, index: int, width: int, height: int,
+            resize: bool = True, center: bool = False) -> str:
+        """Return frame ``index`` laid out for a ``width`` x ``height`` area."""
+        return self.get_with_layout(index, width, height, resize, center)[0]
+
+    def get_with_layout(self, index: int, width: int, height: int,
+                        resize: bool = True, center: bool = False) -> Entry:
+        """Like ``get``, returning ``(frame, layout)``."""
+        key = (width, height, resize, center)
+        if not self.retain or (self.max_frames is not None and index >= self.max_frames):
+            self.misses += 1
+            return self._render(index, key, self.stats)
+        slots = self._layouts.get(key)
+        if slots is None:
+            slots = self._add_layout(key, index)
+        elif next(reversed(self._layouts)) != key:
+            with self._lock:
+                if key in self._layouts:
+                    self._layouts.move_to_end(key)
+
+        entry = slots[index]
+        if entry is None:
+            self.misses += 1
+            entry = slots[index] = self._render(index, key, self.stats)
+        return entry
+
+    def prepare(self, width: int, height: int, resize: bool = True,
+                center: bool = False, start: int = 0):
+        """Start prerendering a layout ahead of use, from frame ``start``."""
+        key = (width, height, resize, center)
+        if self.retain and key not in self._layouts:
+            self._add_layout(key, start % max(1, len(self.frames)))
+
+    def discard(self, width: int, height: int, resize: bool = True, center: bool = False):
+        """Drop a layout's frames (stopping its prerender) once nothing shows it."""
+        with self._lock:
+            self._layouts.pop((width, height, resize, center), None)
+
+    def close(self):
+        """Stop any prerendering and drop cached layouts."""
+        self._closed = True
+        with self._lock:
+            self._layouts.clear()
+
+    def _add_layout(self, key: CacheKey, start: int) -> List[Optional[Entry]]:
+        with self._lock:
+            if key in self._layouts:
+                return self._layouts[key]
+            slots = [None] * len(self.frames)
+            self._layouts[key] = slots
+            while len(self._layouts) > self.max_sizes:
+                self._layouts.popitem(last=False)
+        if self.prerender:
+            threading.Thread(target=self._prerender, args=(key, slots, start), daemon=True).start()
+        return slots
+
+    def _prerender(self, key: CacheKey, slots: List[Optional[Entry]], start: int):
+        """Fill a layout's slots, from the playback position onwards and
+        wrapping around, until it is evicted or the cache is closed."""
+        order = [(start + offset) % len(slots) for offset in range(len(slots))]
+        batch = PRERENDER_BATCH if self._batched(key) else 1
+        for first in range(0, len(order), batch):
+            if self._closed or self._layouts.get(key) is not slots:
+                return
+            indices = [index for index in order[first:first + batch] if slots[index] is None]
+            if indices:
+                for index, entry in zip(indices, self._render_batch(indices, key)):
+                    slots[index] = entry
+
+    def _batched(self, key: CacheKey) -> bool:
+        return isinstance(self.frames, GlyphFrames) and key[2]
+
+    def _render(self, index: int, key: CacheKey, stats=None) -> Entry:
+        return self._render_batch([index], key, stats)[0]
+
+    def _render_batch(self, indices: List[int], key: CacheKey, stats=None) -> List[Entry]:
+        width, height, resize, center = key
+        if self._batched(key):
+            frames, layouts = self._resize_glyph_batch(indices, width, height, center)
+        else:
+            with self._source_lock:
+                frames = [self.frames[index] for index in indices]
+            if stats is not None:
+                stats.lap('decode')
+            layouts = [frame_layout(frame, width, height, resize, center) for frame in frames]
+            if resize:
+                frames = [resize_ascii_frame(frame, width, height, self.mode) for frame in frames]
+            else:
+                frames = [trim_frame(frame) for frame in frames]
+        if center:
+            frames = [pad_frame(frame, layout) for frame, layout in zip(frames, layouts)]
+        return list(zip(frames, layouts))
+
+    def _resize_glyph_batch(self, indices: List[int], width: int, height: int,
+                            center: bool) -> Tuple[List[str], List[FrameLayout]]:
+        """Resize glyph-array frames in batches of equal content bounds,
+        laying them out exactly like the per-frame path."""
+        frames: List[Optional[str]] = [None] * len(indices)
+        layouts: List[Optional[FrameLayout]] = [None] * len(indices)
+        bounds, groups = np.unique(self.frames.content_bounds(indices), axis=0, return_inverse=True)
+        for group, (first, end, cols) in enumerate(bounds.tolist()):
+            members = np.flatnonzero(groups.ravel() == group)
+            layout = plan_layout(end - first, cols, width, height, True, center, first)
+            if (layout.target_rows, layout.target_cols) == (layout.rows, layout.cols):
+                resized = [trim_frame(self.frames[indices[member]]) for member in members]
+            else:
+                source = self.frames.indices[np.asarray(indices)[members], first:end, :cols]
+                resized = resize_frames(GlyphFrames(self.frames.palette, source),
+                                        width, height, self.mode, self.ramp).decode()
+            for member, frame in zip(members, resized):
+                frames[member], layouts[member] = frame, layout
+        return frames, layouts
@@ -0,0 +1,185 @@
+"""Keyframe + delta encoding for ASCII animation frames."""
+from bisect import bisect_right
+from typing import List, Any, Sequence, Optional, Tuple
+from config import ASCIIConfig
+from interning import InternEncoder, open_store
+
+# Runs closer together than this are merged, since each run carries
+# its own row/column overhead.
+RUN_MERGE_GAP = 4
+
+
+def diff_line(row: int, old: str, new: str) -> List[list]:
+    """Describe how to turn one line into another as a list of runs.
+
+    A run is ``[row, col, text]`` (overwrite ``text`` in place starting at
+    ``col``) or ``[row, text]`` (replace the whole line).
+    """
+    if len(old) != len(new):
+        return [[row, new]]
+
+    runs = []
+    start = None
+    last_diff = None
+    for col, (a, b) in enumerate(zip(old, new)):
+        if a == b:
+            continue
+        if start is None:
+            start = col
+        elif col - last_diff > RUN_MERGE_GAP:
+            runs.append([row, start, new[start:last_diff + 1]])
+            start = col
+        last_diff = col
+
+    if start is not None:
+        runs.append([row, start, new[start:last_diff + 1]])
+    return runs
+
+
+def diff_frames(old_lines: List[str], new_lines: List[str]) -> List[list]:
+    """Compute the runs that turn ``old_lines`` into ``new_lines``.
+
+    Both frames must have the same number of lines.
+    """
+    runs = []
+    for row, (old, new) in enumerate(zip(old_lines, new_lines)):
+        if old != new:
+            runs.extend(diff_line(row, old, new))
+    return runs
+
+
+def apply_runs(lines: List[str], runs: List[list]) -> List[str]:
+    """Apply delta runs to a frame's lines in place and return them."""
+    for run in runs:
+        if len(run) == 2:
+            lines[run[0]] = run[1]
+        else:
+            row, col, text = run
+            line = lines[row]
+            lines[row] = line[:col] + text + line[col + len(text):]
+    return lines
+
+
+def _record_size(runs: List[list]) -> int:
+    """Rough serialized size of a delta record, used to pick keyframes."""
+    return sum(len(run[-1]) + 8 for run in runs)
+
+
+class DeltaEncoder:
+    """Turn a stream of frames into keyframe/delta records.
+
+    Keyframes are stored as the full frame string and are emitted every
+    ``keyframe_interval`` frames, whenever the frame's line count changes,
+    or when a delta would not be clearly smaller than the frame itself
+    (scene cuts, noisy renders). All other frames are stored as a list of runs
+    against the previous frame.
+    """
+
+    def __init__(self, keyframe_interval: int):
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        self.keyframe_interval = keyframe_interval
+        self.keyframes: List[int] = []
+        self._index = 0
+        self._since_keyframe = 0
+        self._previous: Optional[List[str]] = None
+
+    def encode(self, frame: str) -> Any:
+        """Encode the next frame and return its record."""
+        lines = frame.split('\n')
+        record: Any = frame
+
+        if (self._previous is not None
+                and self._since_keyframe < self.keyframe_interval
+                and len(lines) == len(self._previous)):
+            runs = diff_frames(self._previous, lines)
+            if _record_size(runs) < len(frame) // 4:
+                record = runs
+
+        if isinstance(record, str):
+            self.keyframes.append(self._index)
+            self._since_keyframe = 1
+        else:
+            self._since_keyframe += 1
+
+        self._previous = lines
+        self._index += 1
+        return record
+
+    def flush(self):
+        """Nothing to persist outside the animation file itself."""
+
+    def info(self) -> dict:
+        """Encoding description stored alongside the records."""
+        return {
+            'type': 'delta',
+            'keyframe_interval': self.keyframe_interval,
+            'keyframes': list(self.keyframes),
+        }
+
+
+def create_encoder(config: ASCIIConfig, output_path: str):
+    """Return the frame encoder selected by ``config``, or None for full frames."""
+    if config.row_store and config.keyframe_interval > 0:
+        raise ValueError("row_store and keyframe_interval cannot be combined")
+    if config.row_store:
+        return InternEncoder(open_store(config.row_store), output_path)
+    if config.keyframe_interval > 0:
+        return DeltaEncoder(config.keyframe_interval)
+    return None
+
+
+def encode_delta(frames: List[str], keyframe_interval: int) -> Tuple[List[Any], dict]:
+    """Encode a whole animation, returning ``(records, encoding_info)``."""
+    encoder = DeltaEncoder(keyframe_interval)
+    records = [encoder.encode(frame) for frame in frames]
+    return records, encoder.info()
+
+
+class DeltaFrames(Sequence):
+    """Read-only frame sequence that rebuilds frames from delta records.
+
+    Any frame is rebuilt by starting at the nearest keyframe at or before
+    it, so random access never replays from frame 0. The last rebuilt
+    frame is kept so that sequential playback costs one delta per frame.
+    ``records`` may itself be a lazy sequence.
+    """
+
+    def __init__(self, records: Sequence[Any], keyframes: List[int]):
+        self._records = records
+        self._keyframes = keyframes
+        self._last_index = -1
+        self._last_lines: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("frame index out of range")
+
+        keyframe = self._keyframes[bisect_right(self._keyframes, index) - 1]
+        if keyframe <= self._last_index <= index:
+            start, lines = self._last_index + 1, self._last_lines
+        else:
+            start, lines = keyframe + 1, self._records[keyframe].split('\n')
+
+        for i in range(start, index + 1):
+            apply_runs(lines, self._records[i])
+
+        self._last_index = index
+        self._last_lines = lines
+        return '\n'.join(lines)
+
+
+def decode_frames(records: Sequence[Any], encoding: Optional[dict]) -> Sequence[str]:
+    """Wrap stored records in the sequence type matching their encoding."""
+    if not encoding or encoding.get('type') == 'full':
+        return records
+    if encoding.get('type') == 'delta':
+        return DeltaFrames(records, encoding['keyframes'])
+    raise ValueError(f"Unknown frame encoding: {encoding.get('type')}")
@@ -0,0 +1,133 @@
+"""Brightness to glyph mapping through a 256-entry lookup table.
+
+Every 8-bit brightness maps to one glyph of ``ascii_chars`` (dark to
+light, or light to dark with ``reverse_chars``). The table is built once
+per ramp, so mapping a frame is a single NumPy gather, and frames come
+out either as glyph-index arrays (see ``glyphs.GlyphFrames``) or as
+strings assembled in one pass by ``glyphs.join_rows``. ``mapped_frame``
+converts a whole video frame for a config: resized to its cell grid, then
+mapped (or packed as Braille).
+"""
+import numpy as np
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple, Union
+from config import ASCIIConfig
+from glyphs import GlyphFrames, join_rows, palette_dtype
+from dither import dither_levels
+from braille import braille_frame, CELL_HEIGHT, CELL_WIDTH
+
+# ITU-R BT.601 luma weights in 1/256ths, in OpenCV's BGR channel order
+LUMA_WEIGHTS_BGR = (29, 150, 77)
+
+# Width of a terminal cell relative to its height, for keeping the aspect ratio
+CELL_ASPECT = 0.5
+
+
+@lru_cache(maxsize=32)
+def brightness_lut(ascii_chars: str, reverse: bool = False) -> np.ndarray:
+    """Index into ``ascii_chars`` for each brightness 0-255.
+
+    Brightness ``v`` picks glyph ``v * len // 256``, so every glyph covers
+    an equal share of the range, black is the first glyph and white the
+    last (the other way round if ``reverse``). Indices always refer to
+    ``ascii_chars`` as given.
+    """
+    if not ascii_chars:
+        raise ValueError("ascii_chars must not be empty")
+    levels = np.arange(256, dtype=np.int32) * len(ascii_chars) // 256
+    if reverse:
+        levels = len(ascii_chars) - 1 - levels
+    lut = levels.astype(palette_dtype(ascii_chars))
+    lut.flags.writeable = False
+    return lut
+
+
+@lru_cache(maxsize=32)
+def _glyph_codes(ascii_chars: str) -> np.ndarray:
+    return np.array([ord(glyph) for glyph in ascii_chars], dtype='<u4')
+
+
+def to_gray(image: np.ndarray, color: bool = False) -> np.ndarray:
+    """8-bit brightness of an image: greyscale as is, BGR(A) (``color``) by luma."""
+    image = np.asarray(image)
+    if color:
+        weights = np.array(LUMA_WEIGHTS_BGR, dtype=np.uint32)
+        return ((image[..., :3].astype(np.uint32) @ weights + 128) >> 8).astype(np.uint8)
+    if image.dtype != np.uint8:
+        return np.clip(image, 0, 255).astype(np.uint8)
+    return image
+
+
+def map_indices(gray: np.ndarray, ascii_chars: str, reverse: bool = False,
+                dither_mode: Optional[str] = None) -> np.ndarray:
+    """Glyph indices for a brightness array of any shape (one gather).
+
+    With a threshold ``dither_mode`` (see ``dither.py``) flat areas mix
+    the two nearest glyphs instead; the array must then be
+    ``(..., height, width)`` frames.
+    """
+    if dither_mode is None:
+        return brightness_lut(ascii_chars, reverse)[to_gray(gray)]
+    levels = dither_levels(to_gray(gray), len(ascii_chars), dither_mode)
+    if reverse:
+        levels = len(ascii_chars) - 1 - levels
+    return levels.astype(palette_dtype(ascii_chars), copy=False)
+
+
+def _brightness(images: np.ndarray, frame_ndim: int) -> np.ndarray:
+    images = np.asarray(images)
+    return to_gray(images, images.ndim == frame_ndim + 1)
+
+
+def map_frame(gray: np.ndarray, ascii_chars: str, reverse: bool = False,
+              dither_mode: Optional[str] = None) -> str:
+    """One ``(rows, cols)`` brightness frame (or BGR image) as a frame string."""
+    indices = map_indices(_brightness(gray, 2), ascii_chars, reverse, dither_mode)
+    return join_rows(_glyph_codes(ascii_chars)[indices][None])[0]
+
+
+def map_frames(grays: Union[np.ndarray, Sequence[np.ndarray]], ascii_chars: str,
+               reverse: bool = False, dither_mode: Optional[str] = None) -> GlyphFrames:
+    """Map a stack of equally sized frames in one call.
+
+    ``grays`` is an ``(n, rows, cols)`` brightness array (or ``(n, rows,
+    cols, 3)`` BGR). The result indexes into ``ascii_chars``;
+    ``.indices`` is the glyph array and ``.decode()`` gives all frame
+    strings at once.
+    """
+    return GlyphFrames(ascii_chars, map_indices(_brightness(grays, 3), ascii_chars, reverse, dither_mode))
+
+
+def cell_grid(cfg: ASCIIConfig, height: int, width: int) -> Tuple[int, int]:
+    """``(cols, rows)`` of cells for a ``height`` x ``width`` pixel frame.
+
+    Fills ``cfg.width`` x ``cfg.height``, or with ``maintain_aspect_ratio``
+    the largest grid inside it with the frame's shape (cells being
+    ``CELL_ASPECT`` times as wide as they are tall).
+    """
+    if not cfg.maintain_aspect_ratio:
+        return cfg.width, cfg.height
+    rows = round(cfg.width * height / width * CELL_ASPECT)
+    if rows <= cfg.height:
+        return cfg.width, max(1, rows)
+    return max(1, min(cfg.width, round(cfg.height * width / height / CELL_ASPECT))), cfg.height
+
+
+def mapped_frame(cfg: ASCIIConfig, enhanced) -> str:
+    """Map an enhanced video frame through the brightness LUT.
+
+    The frame is area-averaged down to the ``cell_grid`` (2x4 pixels per
+    cell for Braille) and mapped with ``map_frame`` (or packed with
+    ``braille_frame``), dithered with ``dither.py`` if a threshold dither
+    mode is set.
+    """
+    import cv2
+    image = np.asarray(enhanced)
+    gray = to_gray(image, image.ndim == 3)
+    cols, rows = cell_grid(cfg, *gray.shape[:2])
+    dither_mode = cfg.dither_mode if cfg.dithering else None
+    if cfg.use_braille:
+        gray = cv2.resize(gray, (cols * CELL_WIDTH, rows * CELL_HEIGHT), interpolation=cv2.INTER_AREA)
+        return braille_frame(gray, dither_mode=dither_mode)
+    gray = cv2.resize(gray, (cols, rows), interpolation=cv2.INTER_AREA)
+    return map_frame(gray, cfg.ascii_chars, cfg.reverse_chars, dither_mode)
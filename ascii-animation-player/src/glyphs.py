@@ -0,0 +1,171 @@
+"""Glyph-index array representation of ASCII frames.
+
+A frame is stored as a ``(height, width)`` array of indices into a palette
+string, and an animation as an ``(n_frames, height, width)`` uint8 (or
+uint16, for palettes over 256 glyphs) array. Frames whose rows differ in
+length are padded with spaces, and their true row lengths kept aside so
+they decode exactly.
+"""
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+NEWLINE = ord('\n')
+SPACE = ord(' ')
+
+
+def frame_codes(frame: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Split a frame into a ``(height, width)`` array of codepoints.
+
+    Returns the array and, for ragged frames, the original row lengths.
+    """
+    lines = frame.split('\n')
+    width = max(map(len, lines))
+    lengths = [len(line) for line in lines]
+    ragged = any(length != width for length in lengths)
+
+    text = ''.join(line.ljust(width) for line in lines) if ragged else ''.join(lines)
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype='<u4').reshape(len(lines), width)
+    return codes, (np.array(lengths, dtype=np.uint16) if ragged else None)
+
+
+def palette_dtype(palette: str):
+    """Smallest index dtype able to address ``palette``."""
+    return np.uint8 if len(palette) <= 256 else np.uint16
+
+
+class GlyphEncoder:
+    """Map frames to indices into a palette that grows as new glyphs appear.
+
+    Seeding the palette with ``ascii_chars`` keeps indices of the
+    configured ramp equal to their brightness level.
+    """
+
+    def __init__(self, palette: str = ''):
+        self.palette = ''
+        self._index = {}
+        for glyph in palette:
+            self._add(ord(glyph))
+
+    def _add(self, code: int) -> int:
+        if code not in self._index:
+            self._index[code] = len(self.palette)
+            self.palette += chr(code)
+        return self._index[code]
+
+    def encode(self, frame: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Return ``(indices, row_lengths)`` for one frame, as uint16 indices."""
+        codes, row_lengths = frame_codes(frame)
+        unique, inverse = np.unique(codes, return_inverse=True)
+        lookup = np.array([self._add(int(code)) for code in unique], dtype=np.uint16)
+        return lookup[inverse].reshape(codes.shape), row_lengths
+
+
+class GlyphFrames(Sequence):
+    """Frames backed by a glyph-index array, decoded to strings on demand.
+
+    ``indices`` is exposed directly for consumers that work on arrays
+    (resizing, diffing); ``palette_codes[indices]`` gives codepoints.
+    """
+
+    def __init__(self, palette: str, indices: np.ndarray,
+                 row_lengths: Optional[np.ndarray] = None, heights: Optional[np.ndarray] = None):
+        self.palette = palette
+        self.indices = indices
+        self.row_lengths = row_lengths
+        self.heights = heights
+        self.palette_codes = np.array([ord(glyph) for glyph in palette], dtype='<u4')
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.decode(range(*index.indices(len(self))))
+        frame = self.indices[index]
+        if self.row_lengths is None and self.heights is None:
+            return join_rows(self.palette_codes[frame][None])[0]
+
+        height = frame.shape[0] if self.heights is None else int(self.heights[index])
+        codes = self.palette_codes[frame[:height]]
+        if self.row_lengths is None:
+            return join_rows(codes[None])[0]
+        lengths = self.row_lengths[index]
+        return '\n'.join(codes[row, :lengths[row]].tobytes().decode('utf-32-le') for row in range(height))
+
+    def content_bounds(self, indices: Sequence[int]) -> np.ndarray:
+        """``(first, end, cols)`` of each frame once the empty rows at either
+        end are dropped (as ``terminal_utils.content_rows`` does for strings):
+        its first and past-the-last content rows and its widest row."""
+        indices = np.asarray(indices, dtype=np.intp)
+        rows, cols = self.indices.shape[1:]
+        if self.row_lengths is None:
+            lengths = np.full((len(indices), rows), cols, dtype=np.intp)
+        else:
+            lengths = self.row_lengths[indices].astype(np.intp)
+        heights = np.full(len(indices), rows, dtype=np.intp)
+        if self.heights is not None:
+            heights = self.heights[indices].astype(np.intp)
+            lengths[np.arange(rows)[None, :] >= heights[:, None]] = 0
+        content = lengths > 0
+        first = np.where(content.any(axis=1), content.argmax(axis=1), heights)
+        end = np.where(content.any(axis=1), rows - content[:, ::-1].argmax(axis=1), heights)
+        return np.stack([first, end, lengths.max(axis=1, initial=0)], axis=1)
+
+    def decode(self, indices: Sequence[int] = None) -> List[str]:
+        """Decode several frames at once (all of them by default)."""
+        if indices is None:
+            indices = range(len(self))
+        if self.row_lengths is not None or self.heights is not None:
+            return [self[i] for i in indices]
+        return join_rows(self.palette_codes[self.indices[np.asarray(indices, dtype=np.intp)]])
+
+
+def join_rows(codes: np.ndarray) -> List[str]:
+    """Turn an ``(n, height, width)`` codepoint array into frame strings."""
+    n, height, width = codes.shape
+    framed = np.empty((n, height, width + 1), dtype='<u4')
+    framed[:, :, :width] = codes
+    framed[:, :, width] = NEWLINE
+    text = framed.tobytes().decode('utf-32-le')
+    size = height * (width + 1)
+    return [text[i * size:(i + 1) * size - 1] for i in range(n)]
+
+
+def stack_frames(frames: Sequence[Tuple[np.ndarray, Optional[np.ndarray]]],
+                 palette: str) -> GlyphFrames:
+    """Stack per-frame ``(indices, row_lengths)`` pairs into one GlyphFrames.
+
+    Frames of different sizes are padded to the largest one; row lengths
+    and heights are only kept when they are needed to decode exactly.
+    """
+    if not frames:
+        return GlyphFrames(palette, np.zeros((0, 0, 0), dtype=np.uint8))
+    height = max(indices.shape[0] for indices, _ in frames)
+    width = max(indices.shape[1] for indices, _ in frames)
+    space = palette.find(' ')
+    if space < 0:
+        space = len(palette)
+        palette += ' '
+
+    stacked = np.full((len(frames), height, width), space, dtype=palette_dtype(palette))
+    row_lengths = np.zeros((len(frames), height), dtype=np.uint16)
+    heights = np.zeros(len(frames), dtype=np.uint16)
+    uniform = True
+    for i, (indices, lengths) in enumerate(frames):
+        rows, cols = indices.shape
+        stacked[i, :rows, :cols] = indices
+        row_lengths[i, :rows] = cols if lengths is None else lengths
+        heights[i] = rows
+        uniform = uniform and lengths is None and rows == height and cols == width
+
+    if uniform:
+        return GlyphFrames(palette, stacked)
+    same_height = bool((heights == height).all())
+    return GlyphFrames(palette, stacked, row_lengths, None if same_height else heights)
+
+
+def encode_glyphs(frames: Sequence[str], palette: str = '') -> GlyphFrames:
+    """Encode a whole animation as a glyph-index array."""
+    encoder = GlyphEncoder(palette)
+    encoded = [encoder.encode(frame) for frame in frames]
+    return stack_frames(encoded, encoder.palette)
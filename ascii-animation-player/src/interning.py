@@ -0,0 +1,166 @@
+"""Content-addressed row and frame interning shared across animation files."""
+import fcntl
+import gzip
+import hashlib
+import os
+from typing import Any, Dict, List, Sequence, Union
+
+
+class RowStore:
+    """Append-only store holding each distinct frame row once.
+
+    Rows are addressed by content: a lookup table maps each row to its
+    position, and positions never change once written, so any number of
+    animation files can reference the same store. New rows are appended
+    to the file as an extra gzip member on ``flush``.
+
+    Because ids are positions, one process at a time may add rows: the
+    first new row takes an exclusive lock on ``<path>.lock``, waiting for
+    any other writer to flush, and picks up the rows it appended before
+    handing out ids. ``flush`` releases the lock. Reading and appending
+    the file itself take a shared or exclusive lock on it, so a reader
+    never sees half a member.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._flushed = 0
+        self._size = 0
+        self._writer_lock = None
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def refresh(self):
+        """Load rows other processes appended since the file was last read."""
+        if self._flushed < len(self.rows) or not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            fcntl.flock(f, fcntl.LOCK_SH)
+            f.seek(self._size)
+            data = f.read()
+        if not data:
+            return
+        self._size += len(data)
+        rows = gzip.decompress(data).decode('utf-8').split('\n')[:-1]
+        self.ids.update((row, index) for index, row in enumerate(rows, len(self.rows)))
+        self.rows.extend(rows)
+        self._flushed = len(self.rows)
+
+    def intern(self, row: str) -> int:
+        """Return the id of ``row``, adding it to the store if it is new."""
+        row_id = self.ids.get(row)
+        if row_id is None and self._writer_lock is None:
+            self._lock_for_writing()
+            row_id = self.ids.get(row)
+        if row_id is None:
+            row_id = len(self.rows)
+            self.rows.append(row)
+            self.ids[row] = row_id
+        return row_id
+
+    def flush(self):
+        """Append rows added since the last flush to the store file and let
+        other writers in."""
+        if self._flushed < len(self.rows):
+            data = gzip.compress(('\n'.join(self.rows[self._flushed:]) + '\n').encode('utf-8'))
+            with open(self.path, 'ab') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                f.write(data)
+            self._size += len(data)
+            self._flushed = len(self.rows)
+        if self._writer_lock is not None:
+            self._writer_lock.close()
+            self._writer_lock = None
+
+    def _lock_for_writing(self):
+        self._writer_lock = open(f"{self.path}.lock", 'a')
+        fcntl.flock(self._writer_lock, fcntl.LOCK_EX)
+        self.refresh()
+
+
+# One loaded store per file, shared by every animation that references it
+_stores: Dict[str, RowStore] = {}
+
+
+def open_store(path: str) -> RowStore:
+    """Open a row store, reusing it if this process already loaded it."""
+    key = os.path.realpath(path)
+    if key not in _stores:
+        _stores[key] = RowStore(path)
+    return _stores[key]
+
+
+class InternEncoder:
+    """Encode frames as row ids into a shared row store.
+
+    The first occurrence of a frame is recorded as its list of row ids;
+    later identical frames are recorded as the index of that first record.
+    Identical rows share one store entry, within a file and across files
+    using the same store. Only a digest per distinct frame is kept while
+    encoding, so streamed files never hold a table of every frame.
+    """
+
+    def __init__(self, store: RowStore, output_path: str):
+        self.store = store
+        self.store_ref = os.path.relpath(store.path, os.path.dirname(os.path.abspath(output_path)))
+        self._frame_ids: Dict[bytes, int] = {}
+        self._records = 0
+
+    def encode(self, frame: str) -> Union[List[int], int]:
+        """Encode the next frame as its row ids, or a reference to an earlier record."""
+        digest = hashlib.blake2b(frame.encode('utf-8'), digest_size=16).digest()
+        index = self._records
+        self._records += 1
+        first = self._frame_ids.get(digest)
+        if first is not None:
+            return first
+        self._frame_ids[digest] = index
+        return [self.store.intern(row) for row in frame.split('\n')]
+
+    def flush(self):
+        """Persist new rows to the shared store."""
+        self.store.flush()
+
+    def info(self) -> dict:
+        """Encoding description stored alongside the records."""
+        return {
+            'type': 'interned',
+            'store': self.store_ref,
+            'store_rows': len(self.store),
+        }
+
+
+class InternedFrames(Sequence):
+    """Frame sequence rebuilt from frame records referencing a shared row store.
+
+    Rows are held once by the store; frames are only joined when indexed.
+    """
+
+    def __init__(self, records: Sequence[Any], encoding: Dict[str, Any], store: RowStore):
+        if len(store) < encoding['store_rows']:
+            store.refresh()
+        if len(store) < encoding['store_rows']:
+            raise ValueError(f"Row store {store.path} is missing rows referenced by this animation")
+        self._records = records
+        self._rows = store.rows
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        record = self._records[index]
+        row_ids = self._records[record] if isinstance(record, int) else record
+        rows = self._rows
+        return '\n'.join([rows[row_id] for row_id in row_ids])
+
+
+def load_interned(records: Sequence[Any], encoding: Dict[str, Any], animation_path: str) -> InternedFrames:
+    """Resolve an animation's store reference and wrap its frame records."""
+    store_path = os.path.join(os.path.dirname(os.path.abspath(animation_path)), encoding['store'])
+    return InternedFrames(records, encoding, open_store(store_path))
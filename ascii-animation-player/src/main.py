@@ -1,14 +1,41 @@
 #!/usr/bin/env python3
 """Main CLI for video-to-ASCII converter."""
+import asyncio
 import click
+import json
 import sys
 from pathlib import Path
+from typing import List
 from config import ASCIIConfig
 from video_processor import VideoToASCII
-from storage import ASCIIStorage
+from storage import ASCIIStorage, animation_name, FORMAT_SUFFIXES
 from player import ASCIIPlayer
 from terminal_utils import get_terminal_size
 from colorama import Fore, Style
+from tqdm import tqdm
+from dictionary import train_dictionary, save_dictionary, DEFAULT_DICTIONARY_DIR, DICTIONARY_SIZE
+from transcode import transcode_library
+from web_export import is_web_export
+from prefetch import PrefetchedFrames
+from telemetry import PlaybackStats, format_summary
+from bench import bench_library, save_baseline, load_baseline, compare_baseline
+from broadcast import BroadcastServer
+from segments import frame_to_ascii, iter_ascii_frames, iter_segment_frames
+
+
+def _library_files(input_dir: str) -> List[str]:
+    """Animation files directly inside ``input_dir``, sorted by name."""
+    storage = ASCIIStorage(ASCIIConfig())
+    inputs = []
+    for input_path in sorted(Path(input_dir).iterdir()):
+        if not input_path.is_file():
+            continue
+        try:
+            storage.load_info(str(input_path))
+        except ValueError:
+            continue
+        inputs.append(str(input_path))
+    return inputs
 
 
 @click.group()
@@ -31,11 +58,21 @@ def cli():
 @click.option('--braille', is_flag=True, help='Use Unicode Braille characters')
 @click.option('--dither', is_flag=True, help='Apply dithering')
 @click.option('--edge', is_flag=True, help='Emphasize edges')
+@click.option('--dither-mode', type=click.Choice(['diffusion', 'bayer2', 'bayer4', 'bayer8', 'blue-noise']),
+              help='Dithering method (implies --dither); ordered and blue-noise modes are temporally stable')
+@click.option('--color-mode', type=click.Choice(['mono', 'ansi', 'ansi256', 'truecolor']),
+              help='Store per-character colour for this mode (npz format only)')
 @click.option('--compression', type=click.Choice(['none', 'gzip', 'lzma', 'bz2']), default='gzip')
-@click.option('--format', 'storage_format', type=click.Choice(['pickle', 'json', 'npz']), default='pickle')
+@click.option('--format', 'storage_format', type=click.Choice(['pickle', 'json', 'jsonl', 'npz', 'container']), default='pickle')
+@click.option('--keyframe-interval', default=0, help='Store a full frame every N frames and deltas in between (0 = off)')
+@click.option('--row-store', type=click.Path(), help='Intern frame rows into this shared store file')
+@click.option('--dictionary', type=click.Path(exists=True), help='Trained zlib dictionary (container format, gzip)')
+@click.option('--compression-workers', default=1, help='Threads compressing blocks in parallel (0 = one per CPU)')
+@click.option('--workers', default=1, help='Processes converting time segments in parallel (0 = one per CPU)')
 @click.option('--preview', is_flag=True, help='Preview first frame before processing')
 def convert(video_file, output, config, width, height, auto_terminal, fps, brightness, contrast, 
-           chars, braille, dither, edge, compression, storage_format, preview):
+           chars, braille, dither, edge, dither_mode, color_mode, compression, storage_format, keyframe_interval, row_store,
+           dictionary, compression_workers, workers, preview):
     """Convert a video file to ASCII animation."""
     
     # Load or create config
@@ -63,8 +100,25 @@ def convert(video_file, output, config, width, height, auto_terminal, fps, brigh
     cfg.use_braille = braille
     cfg.dithering = dither
     cfg.edge_detection = edge
+    if dither_mode:
+        cfg.dithering = True
+        cfg.dither_mode = dither_mode
+    if cfg.edge_detection and cfg.dithering and cfg.dither_mode != 'diffusion':
+        raise click.BadParameter(f"{cfg.dither_mode} dithering cannot be combined with edge detection; "
+                                 f"use --dither-mode diffusion or drop --edge", param_hint='--dither-mode')
     cfg.compression = compression
     cfg.storage_format = storage_format
+    cfg.keyframe_interval = keyframe_interval
+    cfg.row_store = row_store
+    cfg.compression_dict = dictionary
+    cfg.compression_workers = compression_workers
+    if dictionary and compression != 'gzip':
+        raise click.BadParameter(f"a trained dictionary is zlib-based and cannot be used with "
+                                 f"--compression {compression}", param_hint='--dictionary')
+    if color_mode:
+        cfg.color_mode = color_mode
+    if cfg.color_mode != 'mono' and cfg.storage_format != 'npz':
+        raise click.BadParameter("colour planes are only stored by the npz format", param_hint='--format')
     
     # Show configuration
     click.echo(f"\n{Fore.GREEN}Configuration:{Style.RESET_ALL}")
@@ -73,8 +127,15 @@ def convert(video_file, output, config, width, height, auto_terminal, fps, brigh
     click.echo(f"  Brightness: {cfg.brightness}")
     click.echo(f"  Contrast: {cfg.contrast}")
     click.echo(f"  Characters: {'Braille' if cfg.use_braille else repr(cfg.ascii_chars)}")
+    if cfg.dithering:
+        click.echo(f"  Dithering: {cfg.dither_mode}")
+    click.echo(f"  Colour: {cfg.color_mode}")
     click.echo(f"  Compression: {cfg.compression}")
     click.echo(f"  Format: {cfg.storage_format}")
+    if cfg.keyframe_interval:
+        click.echo(f"  Keyframe interval: {cfg.keyframe_interval}")
+    if workers != 1:
+        click.echo(f"  Workers: {workers or 'one per CPU'}")
     
     # Initialize processor
     processor = VideoToASCII(cfg)
@@ -85,32 +146,30 @@ def convert(video_file, output, config, width, height, auto_terminal, fps, brigh
         frames_gen = processor.extract_frames(video_file)
         first_frame = next(frames_gen)
         enhanced = processor.enhance_frame(first_frame)
-        
-        if cfg.use_braille or cfg.dithering or cfg.edge_detection:
-            ascii_frame = processor.frame_to_ascii_custom(enhanced)
-        else:
-            ascii_frame = processor.frame_to_ascii_magic(enhanced)
+        ascii_frame = frame_to_ascii(processor, cfg, enhanced)
             
         ASCIIPlayer.preview_frame(ascii_frame, "First Frame Preview", auto_fit=True)
         
         if not click.confirm("\nContinue with conversion?"):
             return
             
-    # Process video
+    # Process video, streaming each frame to disk as it is converted
     click.echo(f"\n{Fore.GREEN}Processing video...{Style.RESET_ALL}")
-    frames = processor.process_video(video_file)
-    
-    # Save animation
-    click.echo(f"\n{Fore.GREEN}Saving animation...{Style.RESET_ALL}")
     storage = ASCIIStorage(cfg)
-    storage.save(frames, output)
+    if workers == 1:
+        frames = iter_ascii_frames(processor, cfg, video_file)
+    else:
+        frames = iter_segment_frames(VideoToASCII, cfg, video_file, workers)
+    with storage.open_writer(output) as writer:
+        for ascii_frame, colors in frames:
+            writer.append(ascii_frame, colors)
     
     # Show stats
-    file_size = storage.get_file_size_mb(output if cfg.compression == 'none' 
-                                       else f"{output}.{cfg.compression[:2]}")
+    output_path = storage.get_output_path(output)
+    file_size = storage.get_file_size_mb(output_path)
     click.echo(f"\n{Fore.GREEN}Conversion complete!{Style.RESET_ALL}")
-    click.echo(f"  Total frames: {len(frames)}")
-    click.echo(f"  Output file: {output}")
+    click.echo(f"  Total frames: {writer.frame_count}")
+    click.echo(f"  Output file: {output_path}")
     click.echo(f"  File size: {file_size:.2f} MB")
     
 
@@ -120,50 +179,302 @@ def convert(video_file, output, config, width, height, auto_terminal, fps, brigh
 @click.option('--loop', is_flag=True, help='Loop the animation')
 @click.option('--speed', default=1.0, help='Playback speed multiplier')
 @click.option('--no-resize', is_flag=True, help='Disable automatic resizing')
-def play(animation_file, simple, loop, speed, no_resize):
+@click.option('--renderer', type=click.Choice(['diff', 'full']), default='diff',
+              help='Write only changed runs (diff) or redraw every frame (full)')
+@click.option('--resize-mode', type=click.Choice(['nearest', 'area']), default='nearest',
+              help='Sample glyphs (nearest) or average glyph density (area) when shrinking')
+@click.option('--color-mode', type=click.Choice(['mono', 'ansi', 'ansi256', 'truecolor']),
+              help='Colour output for files with colour planes (default: as converted)')
+@click.option('--stats', is_flag=True, help='Print per-stage frame timing when playback ends')
+@click.option('--stats-json', type=click.Path(dir_okay=False),
+              help='Also write the timing report to this JSON file (implies --stats)')
+def play(animation_file, simple, loop, speed, no_resize, renderer, resize_mode, color_mode, stats, stats_json):
     """Play an ASCII animation file."""
     
-    # Load animation
+    # Read animation info without decoding frames
     click.echo(f"Loading animation from {animation_file}...")
     
     # Create config for loading
     temp_cfg = ASCIIConfig()
     storage = ASCIIStorage(temp_cfg)
-    data = storage.load(animation_file)
+    info = storage.load_info(animation_file)
+    metadata = info['metadata']
     
     # Create config from saved data
-    cfg = ASCIIConfig(**data['config'])
+    cfg = ASCIIConfig(**info['config'])
     cfg.loop = loop
     cfg.playback_speed = speed
     cfg.auto_resize_playback = not no_resize
+    cfg.renderer = renderer
+    cfg.resize_mode = resize_mode
+    if color_mode:
+        cfg.color_mode = color_mode
     
     # Show info
     click.echo(f"\n{Fore.GREEN}Animation Info:{Style.RESET_ALL}")
-    click.echo(f"  Frames: {data['metadata']['frame_count']}")
-    click.echo(f"  FPS: {data['metadata']['fps']}")
-    click.echo(f"  Original dimensions: {data['metadata']['dimensions']}")
+    click.echo(f"  Format: {info['format']} ({info['compression']}, {info['encoding']} frames)")
+    click.echo(f"  Frames: {metadata['frame_count']}")
+    click.echo(f"  FPS: {metadata['fps']}")
+    click.echo(f"  Original dimensions: {metadata['dimensions']}")
     click.echo(f"  Playback speed: {cfg.playback_speed}x")
     
     # Get current terminal size
     term_width, term_height = get_terminal_size()
     click.echo(f"  Terminal size: {term_width}x{term_height}")
     
-    if not no_resize and data['metadata']['dimensions'][0] > term_width:
+    if not no_resize and metadata['dimensions'][0] > term_width:
         click.echo(f"  {Fore.YELLOW}Auto-resize enabled (press R to toggle){Style.RESET_ALL}")
     
+    # Decode frames in the background; playback starts once the first is ready
+    frames = storage.open_frames(animation_file, metadata['frame_count'])
+    colors = storage.load_colors(animation_file)
+    if colors is not None:
+        click.echo(f"  Colour: {cfg.color_mode}")
+    
     # Play animation
     player = ASCIIPlayer(cfg)
     player.auto_resize = not no_resize
+    if stats or stats_json:
+        player.stats = PlaybackStats()
     
-    if simple:
-        click.echo(f"\n{Fore.YELLOW}Starting simple playback (Ctrl+C to stop)...{Style.RESET_ALL}")
-        player.play_simple(data['frames'], data['metadata']['fps'])
-    else:
-        click.echo(f"\n{Fore.YELLOW}Starting interactive playback...{Style.RESET_ALL}")
-        click.echo("Controls: Q=Quit, Space=Pause, ←/→=Seek, +/-=Speed, R=Resize, C=Center")
-        click.pause("Press any key to start...")
-        player.play(data['frames'], data['metadata']['fps'])
+    try:
+        if simple:
+            click.echo(f"\n{Fore.YELLOW}Starting simple playback (Ctrl+C to stop)...{Style.RESET_ALL}")
+            player.play_simple(frames, metadata['fps'], colors=colors)
+        else:
+            click.echo(f"\n{Fore.YELLOW}Starting interactive playback...{Style.RESET_ALL}")
+            click.echo("Controls: Q=Quit, Space=Pause, ←/→=Seek, +/-=Speed, R=Resize, C=Center")
+            click.pause("Press any key to start...")
+            player.play(frames, metadata['fps'], colors=colors)
+    finally:
+        if isinstance(frames, PrefetchedFrames):
+            frames.close()
+    
+    if player.stats is not None:
+        report = player.stats.summary()
+        click.echo(f"\n{Fore.GREEN}Playback Stats:{Style.RESET_ALL}")
+        click.echo(format_summary(report))
+        if stats_json:
+            report.update({
+                'animation': animation_file,
+                'format': info['format'],
+                'compression': info['compression'],
+                'renderer': renderer,
+                'resize_mode': resize_mode,
+                'terminal_size': list(player.terminal.size),
+            })
+            Path(stats_json).write_text(json.dumps(report, indent=2))
+            click.echo(f"Stats written to {stats_json}")
+        
+
+@cli.command()
+@click.argument('animation_file', type=click.Path(exists=True))
+@click.option('--host', default='127.0.0.1', help='Address to listen on (0.0.0.0 for all interfaces)')
+@click.option('--port', default=2323, help='TCP port to listen on')
+@click.option('--speed', default=1.0, help='Playback speed multiplier')
+@click.option('--resize-mode', type=click.Choice(['nearest', 'area']), default='nearest',
+              help='Sample glyphs (nearest) or average glyph density (area) when shrinking')
+def serve(animation_file, host, port, speed, resize_mode):
+    """Broadcast an animation, looping, to every client that connects over TCP."""
+    storage = ASCIIStorage(ASCIIConfig())
+    data = storage.load(animation_file)
+    metadata = data['metadata']
+    cfg = ASCIIConfig(**data['config'])
+    cfg.resize_mode = resize_mode
+    
+    server = BroadcastServer(data['frames'], metadata['fps'] * speed, cfg)
+    click.echo(f"Serving {animation_name(animation_file)} ({metadata['frame_count']} frames "
+               f"at {metadata['fps'] * speed:g} fps) on {host}:{port}")
+    click.echo(f"Watch with: telnet {host} {port}   (or: nc {host} {port}; q to leave)")
+    try:
+        asyncio.run(server.serve_forever(host, port))
+    except KeyboardInterrupt:
+        pass
+    click.echo(f"\nStopped after {server.frames_sent} frames sent, {server.dropped} dropped for slow clients")
+
+
+@cli.command()
+@click.argument('input_dir', type=click.Path(exists=True, file_okay=False))
+@click.option('-o', '--output-dir', required=True, help='Directory for the interned animations')
+@click.option('--store', 'store_path', help='Shared row store file (default: OUTPUT_DIR/rows.store)')
+@click.option('--format', 'storage_format', type=click.Choice(['pickle', 'jsonl', 'npz', 'container']), default='pickle')
+def intern(input_dir, output_dir, store_path, storage_format):
+    """Re-save a directory of animations against one shared row store."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    store_path = store_path or str(output_dir / 'rows.store')
+    
+    total_before = total_after = 0
+    for input_path in sorted(Path(input_dir).iterdir()):
+        if not input_path.is_file():
+            continue
+        data = ASCIIStorage(ASCIIConfig()).load(str(input_path))
+        cfg = ASCIIConfig(**data['config'])
+        cfg.storage_format = storage_format
+        cfg.keyframe_interval = 0
+        cfg.row_store = store_path
+        
+        storage = ASCIIStorage(cfg)
+        output = str(output_dir / (animation_name(str(input_path)) + FORMAT_SUFFIXES[storage_format]))
+        storage.save(list(data['frames']), output, data['metadata'])
+        
+        before = input_path.stat().st_size
+        after = Path(storage.get_output_path(output)).stat().st_size
+        total_before += before
+        total_after += after
+        click.echo(f"  {input_path.name}: {before / 1024:.0f} KB -> {after / 1024:.0f} KB")
         
+    store_size = Path(store_path).stat().st_size
+    click.echo(f"\n{Fore.GREEN}Interned library:{Style.RESET_ALL}")
+    click.echo(f"  Animations: {total_before / 1024:.0f} KB -> {total_after / 1024:.0f} KB")
+    click.echo(f"  Row store: {store_path} ({store_size / 1024:.0f} KB)")
+    click.echo(f"  Total: {(total_after + store_size) / 1024:.0f} KB")
+    
+
+@cli.command()
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+def info(paths):
+    """List animation files (or directories of them) without decoding frames."""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir() and not is_web_export(str(path)):
+            files.extend(sorted(p for p in path.iterdir() if p.is_file() or is_web_export(str(p))))
+        else:
+            files.append(path)
+        
+    storage = ASCIIStorage(ASCIIConfig())
+    click.echo(f"{'Name':<48} {'Format':<10} {'Compr.':<7} {'Frames':<8} {'Encoding':<9} {'FPS':>4} {'Dimensions':>11} {'Size':>9}")
+    for path in files:
+        try:
+            details = storage.load_info(str(path))
+        except ValueError:
+            click.echo(f"{path.name[:48]:<48} {Fore.YELLOW}not an animation{Style.RESET_ALL}")
+            continue
+        metadata = details['metadata']
+        dimensions = 'x'.join(str(d) for d in metadata['dimensions'])
+        click.echo(f"{path.name[:48]:<48} {details['format']:<10} {details['compression']:<7} "
+                   f"{metadata['frame_count']:<8} {details['encoding']:<9} {metadata['fps']:>4} "
+                   f"{dimensions:>11} {details['file_size'] / 1024:>6.0f} KB")
+    
+
+@cli.command()
+@click.argument('input_dir', type=click.Path(exists=True, file_okay=False))
+@click.option('-o', '--output-dir', required=True, help='Directory for the transcoded animations')
+@click.option('--format', 'storage_formats', multiple=True, default=['pickle'],
+              type=click.Choice(['pickle', 'json', 'jsonl', 'npz', 'container']),
+              help='Target format (repeat to compare several)')
+@click.option('--compression', type=click.Choice(['none', 'gzip', 'lzma', 'bz2']), default='gzip')
+@click.option('--keyframe-interval', default=0, help='Store a full frame every N frames and deltas in between (0 = off)')
+@click.option('--dictionary', type=click.Path(exists=True), help='Trained zlib dictionary (container format, gzip)')
+@click.option('--workers', default=0, help='Worker processes (0 = one per CPU, 1 = cleanest timings)')
+def transcode(input_dir, output_dir, storage_formats, compression, keyframe_interval, dictionary, workers):
+    """Re-encode a directory of animations and report size and speed per format."""
+    if dictionary and compression != 'gzip':
+        raise click.BadParameter(f"a trained dictionary is zlib-based and cannot be used with "
+                                 f"--compression {compression}", param_hint='--dictionary')
+    inputs = _library_files(input_dir)
+    click.echo(f"Transcoding {len(inputs)} animations to {', '.join(storage_formats)} ({compression})...")
+    results = transcode_library(inputs, output_dir, storage_formats, compression,
+                                keyframe_interval, dictionary, workers)
+    
+    click.echo(f"\n{'Name':<48} {'Format':<10} {'Size':>9} {'Ratio':>6} {'Encode':>9} {'Load':>9} {'1st frame':>10}")
+    for result in results:
+        name = animation_name(result['input'])
+        click.echo(f"{name[:48]:<48} {result['format']:<10} {result['size'] / 1024:>6.0f} KB "
+                   f"{result['size'] / result['input_size']:>6.2f} {result['encode_time'] * 1000:>6.0f} ms "
+                   f"{result['load_time'] * 1000:>6.0f} ms {result['first_frame_time'] * 1000:>7.1f} ms")
+        
+    click.echo(f"\n{Fore.GREEN}Totals per format:{Style.RESET_ALL}")
+    for storage_format in storage_formats:
+        rows = [result for result in results if result['format'] == storage_format]
+        size = sum(result['size'] for result in rows)
+        first_frame = max(result['first_frame_time'] for result in rows) if rows else 0
+        click.echo(f"  {storage_format:<10} {size / 1024:>8.0f} KB  "
+                   f"encode {sum(r['encode_time'] for r in rows):>6.2f} s  "
+                   f"load {sum(r['load_time'] for r in rows):>6.2f} s  "
+                   f"worst 1st frame {first_frame * 1000:.1f} ms")
+    
+
+@cli.command()
+@click.argument('input_dir', default='animations', type=click.Path(exists=True, file_okay=False))
+@click.option('--renderer', 'renderers', multiple=True, default=['full', 'diff'],
+              type=click.Choice(['full', 'diff']), help='Renderer to measure (repeat for several)')
+@click.option('--size', default='80x24', help='Terminal size for the resized runs (WxH)')
+@click.option('--resize-mode', type=click.Choice(['nearest', 'area']), default='nearest')
+@click.option('--sink', type=click.Choice(['memory', 'pty']), default='memory',
+              help='Discard output in memory or write it through a pseudo-terminal')
+@click.option('-o', '--output', type=click.Path(dir_okay=False), help='Save the results as a JSON baseline')
+@click.option('--baseline', type=click.Path(exists=True, dir_okay=False), help='Compare against a saved baseline')
+@click.option('--tolerance', default=0.1, help='Fractional fps loss or size growth counted as a regression')
+def bench(input_dir, renderers, size, resize_mode, sink, output, baseline, tolerance):
+    """Measure the render path over a directory of animations, without pacing."""
+    width, height = (int(part) for part in size.lower().split('x'))
+    inputs = _library_files(input_dir)
+    click.echo(f"Benchmarking {len(inputs)} animations ({', '.join(renderers)}; {sink} sink)...")
+    report = bench_library(inputs, renderers, (width, height), sink, resize_mode)
+    
+    click.echo(f"\n{'Name':<48} {'Renderer':<8} {'Resize':<8} {'Max fps':>9} {'CPU/frame':>10} {'Bytes/frame':>12}")
+    for result in report['results']:
+        resized = size if result['resize'] else 'native'
+        click.echo(f"{result['file'][:48]:<48} {result['renderer']:<8} {resized:<8} {result['fps']:>9.0f} "
+                   f"{result['cpu_ms_per_frame']:>7.3f} ms {result['bytes_per_frame']:>12.0f}")
+    
+    if output:
+        save_baseline(report, output)
+        click.echo(f"\nResults saved to {output}")
+    if baseline:
+        changes = compare_baseline(report, load_baseline(baseline), tolerance)
+        regressions = [change for change in changes if change['regression']]
+        click.echo(f"\n{Fore.GREEN}Against {baseline}:{Style.RESET_ALL} "
+                   f"{len(changes)} runs compared, {len(regressions)} regressions")
+        for change in regressions:
+            click.echo(f"  {Fore.RED}{change['file']} {change['renderer']} "
+                       f"{'resized' if change['resize'] else 'native'}: fps {change['fps_change']:+.0%}, "
+                       f"bytes {change['bytes_change']:+.0%}{Style.RESET_ALL}")
+        if regressions:
+            sys.exit(1)
+
+
+@cli.command('export-web')
+@click.argument('animation_file', type=click.Path(exists=True))
+@click.option('-o', '--output-dir', required=True, help='Directory for the manifest and chunks')
+@click.option('--chunk-frames', default=60, help='Frames per chunk (the first chunk is shorter)')
+def export_web(animation_file, output_dir, chunk_frames):
+    """Export an animation as a manifest plus gzipped, delta-encoded chunks for the site."""
+    data = ASCIIStorage(ASCIIConfig()).load(animation_file)
+    cfg = ASCIIConfig(**data['config'])
+    cfg.web_chunk_frames = chunk_frames
+    metadata = data['metadata']
+    cfg.target_fps = metadata.get('fps', cfg.target_fps)
+    cfg.width, cfg.height = metadata.get('dimensions', (cfg.width, cfg.height))
+    
+    report = ASCIIStorage(cfg).export_web(list(data['frames']), output_dir, metadata)
+    source_size = Path(animation_file).stat().st_size
+    click.echo(f"{Fore.GREEN}Exported {len(data['frames'])} frames in {report['chunks']} chunks to {output_dir}{Style.RESET_ALL}")
+    click.echo(f"  First paint: {report['first_paint_bytes'] / 1024:.1f} KB (manifest + first chunk, gzip)")
+    click.echo(f"  Total: {report['total_bytes'] / 1024:.1f} KB gzip, {report['raw_total_bytes'] / 1024:.1f} KB uncompressed")
+    click.echo(f"  Source: {source_size / 1024:.1f} KB")
+    
+
+@cli.command('train-dict')
+@click.argument('input_dir', type=click.Path(exists=True, file_okay=False))
+@click.option('-o', '--output-dir', default=str(DEFAULT_DICTIONARY_DIR), help='Directory to write the dictionary to')
+@click.option('--size', default=DICTIONARY_SIZE, help='Dictionary size in bytes')
+@click.option('--frames', 'frames_per_animation', default=16, help='Frames sampled per animation')
+def train_dict(input_dir, output_dir, size, frames_per_animation):
+    """Train (or refresh) a compression dictionary from a directory of animations."""
+    storage = ASCIIStorage(ASCIIConfig())
+    animations = []
+    for input_path in sorted(Path(input_dir).iterdir()):
+        if input_path.is_file():
+            animations.append(storage.load(str(input_path))['frames'])
+            
+    zdict = train_dictionary(animations, size=size, frames_per_animation=frames_per_animation)
+    path = save_dictionary(zdict, output_dir)
+    click.echo(f"Trained dictionary from {len(animations)} animations ({len(zdict)} bytes)")
+    click.echo(f"  Saved to: {path}")
+    click.echo(f"  Use with: convert --format container --dictionary {path}")
+    
 
 @cli.command()
 @click.option('-o', '--output', default='config.yaml', help='Output config file')
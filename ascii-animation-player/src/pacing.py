@@ -0,0 +1,74 @@
+"""Deadline-based frame pacing."""
+import time
+from typing import Callable, Tuple
+
+# Frames shown later than this past their deadline count as late
+LATE_TOLERANCE = 0.002
+
+
+class FrameClock:
+    """Schedule frames against absolute ``perf_counter`` deadlines.
+
+    Frame ``n`` is due at ``origin + (n - origin_frame) / (fps * speed)``,
+    so the time spent rendering one frame is absorbed by the wait for the
+    next instead of adding to it. When playback falls more than a frame
+    behind, ``wait_for`` skips ahead to the frame that is due now and
+    counts the skipped ones as dropped. Seeking, pausing and speed
+    changes re-anchor the schedule at the current frame.
+    """
+
+    def __init__(self, fps: float, speed: float = 1.0,
+                 clock: Callable[[], float] = time.perf_counter,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.fps = fps
+        self.speed = speed
+        self.dropped = 0
+        self.late = 0
+        self._clock = clock
+        self._sleep = sleep
+        self.reset(0)
+
+    @property
+    def period(self) -> float:
+        """Seconds between frames at the current speed."""
+        return 1.0 / (self.fps * self.speed)
+
+    def reset(self, frame: int):
+        """Make ``frame`` due now (after a seek, pause or loop)."""
+        self._origin_frame = frame
+        self._origin = self._clock()
+
+    def set_speed(self, speed: float, frame: int):
+        """Change speed, keeping ``frame`` due now."""
+        self.speed = speed
+        self.reset(frame)
+
+    def deadline(self, frame: int) -> float:
+        """Absolute time at which ``frame`` should be on screen."""
+        return self._origin + (frame - self._origin_frame) * self.period
+
+    def due_frame(self) -> int:
+        """Index of the frame whose slot the clock is currently in."""
+        return self._origin_frame + int((self._clock() - self._origin) / self.period)
+
+    def schedule(self, frame: int) -> Tuple[int, float]:
+        """Return the frame to show next and how long to wait for it.
+
+        If ``frame``'s slot has already passed, the frame that is due now
+        is returned instead, with no wait.
+        """
+        due = self.due_frame()
+        if due > frame:
+            self.dropped += due - frame
+            frame = due
+        delay = self.deadline(frame) - self._clock()
+        if -delay > LATE_TOLERANCE:
+            self.late += 1
+        return frame, max(0.0, delay)
+
+    def wait_for(self, frame: int) -> int:
+        """Sleep until the next frame is due and return it (see ``schedule``)."""
+        frame, delay = self.schedule(frame)
+        if delay > 0:
+            self._sleep(delay)
+        return frame
@@ -1,18 +1,48 @@
 """ASCII animation player for terminal."""
-import time
 import sys
 import os
 import termios
 import tty
-import select
-from typing import List, Dict, Any
+import asyncio
+import numpy as np
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from colorama import init, Fore, Back, Style
-import threading
 from config import ASCIIConfig
 from terminal_utils import (
-    get_terminal_size, resize_ascii_frame, center_frame, 
+    get_terminal_size, resize_ascii_frame, terminal_size_service,
     clear_terminal, hide_cursor, show_cursor
 )
+from renderer import create_renderer
+from pacing import FrameClock
+from frame_cache import ResizedFrameCache
+from resize import FrameLayout
+from prefetch import FrameSource, PrefetchedFrames
+from telemetry import PlaybackStats
+from color import COLOR_MODES, color_codes, fit_colors
+
+# Escape sequences sent by the arrow keys (ESC [ C, ESC [ D, ...)
+ESCAPE_SEQUENCE_LENGTH = 3
+
+
+def parse_keys(data: bytes) -> Tuple[List[str], bytes]:
+    """Split raw terminal input into ``(keys, unparsed_tail)``.
+    
+    Escape sequences become one key each. A sequence cut off at the end
+    of ``data`` is returned as the tail, to be prefixed to the next read,
+    so its bytes are never handled as separate keys.
+    """
+    keys = []
+    i = 0
+    while i < len(data):
+        if data[i] == 0x1b and data[i + 1:i + 2] in (b'', b'['):
+            if i + ESCAPE_SEQUENCE_LENGTH > len(data):
+                break
+            keys.append(data[i:i + ESCAPE_SEQUENCE_LENGTH].decode('ascii', errors='ignore'))
+            i += ESCAPE_SEQUENCE_LENGTH
+        else:
+            keys.append(chr(data[i]))
+            i += 1
+    return keys, data[i:]
 
 
 class ASCIIPlayer:
@@ -23,37 +53,40 @@ class ASCIIPlayer:
         self.is_playing = False
         self.current_frame = 0
         self.total_frames = 0
-        self.terminal_width, self.terminal_height = get_terminal_size()
+        self.terminal = terminal_size_service()
+        self.terminal_width, self.terminal_height = self.terminal.size
+        self.reserved_rows = 3  # Rows below the frame kept for the status bar
+        self.running = False
+        self._shown_frame = 0
         self.auto_resize = True  # Auto-resize frames to fit terminal
         self.center_content = False  # Center content in terminal
+        self.stats: Optional[PlaybackStats] = None  # Per-stage frame timing, if set
+        self.colors: Optional[Sequence[np.ndarray]] = None  # Per-frame colour planes
+        self.clock = FrameClock(self.config.target_fps, self.config.playback_speed)
         init()  # Initialize colorama
+        frame_style = Fore.GREEN if self.config.color_mode != "mono" else ''
+        color_mode = self.config.color_mode if self.config.color_mode in COLOR_MODES[1:] else 'truecolor'
+        self.renderer = create_renderer(self.config.renderer, frame_style=frame_style,
+                                        status_style=Fore.CYAN, color_mode=color_mode)
         
-    def play(self, frames: List[str], fps: int = None):
-        """Play ASCII animation with controls."""
-        self.total_frames = len(frames)
-        self.current_frame = 0
-        self.is_playing = True
-        
-        fps = fps or self.config.target_fps
-        frame_delay = 1.0 / (fps * self.config.playback_speed)
+    def play(self, frames: FrameSource, fps: int = None, frame_count: int = None,
+             colors: Optional[Sequence[np.ndarray]] = None):
+        """Play ASCII animation with controls.
         
+        ``frames`` may be a sequence (including lazily decoded ones), an
+        iterator, or a callable returning a fresh iterator; the last two
+        need ``frame_count`` and are decoded ahead by a background thread.
+        ``colors`` gives a ``(rows, cols, 3)`` RGB plane per frame, shown
+        unless ``color_mode`` is ``"mono"``.
+        """
         # Set up terminal for non-blocking input
         old_settings = termios.tcgetattr(sys.stdin)
         
         try:
             tty.setraw(sys.stdin.fileno())
             hide_cursor()
-            
-            # Start playback thread
-            playback_thread = threading.Thread(
-                target=self._playback_loop,
-                args=(frames, frame_delay)
-            )
-            playback_thread.daemon = True
-            playback_thread.start()
-            
-            # Handle keyboard input
-            self._handle_controls()
+            asyncio.run(self.play_async(frames, fps, input_fd=sys.stdin.fileno(),
+                                        frame_count=frame_count, colors=colors))
             
         finally:
             # Restore terminal settings
@@ -61,67 +94,205 @@ class ASCIIPlayer:
             show_cursor()
             self._clear_screen()
             
-    def _playback_loop(self, frames: List[str], frame_delay: float):
-        """Main playback loop running in separate thread."""
-        while self.is_playing:
-            if self.current_frame >= self.total_frames:
-                if self.config.loop:
-                    self.current_frame = 0
-                else:
-                    self.is_playing = False
-                    break
+    async def play_async(self, frames: FrameSource, fps: int = None, input_fd: int = None,
+                         frame_count: int = None, colors: Optional[Sequence[np.ndarray]] = None):
+        """Run playback as coroutines on the current event loop.
+        
+        Key input (read from ``input_fd``, if given), frame timing and
+        rendering all run on one loop, so keys take effect as soon as they
+        arrive, seeks and speed changes apply from the next frame, and no
+        state is shared between threads. Several players can run on one
+        loop, each with its own renderer output.
+        """
+        source = self._open_source(frames, frame_count)
+        self._set_colors(colors)
+        self.total_frames = len(source)
+        self.current_frame = 0
+        self.is_playing = True
+        self.running = True
+        
+        fps = fps or self.config.target_fps
+        self.clock = FrameClock(fps, self.config.playback_speed)
+        self.frame_cache = self._create_frame_cache(source)
+        self.reserved_rows = 3
+        self._changed = asyncio.Event()
+        self._render_request = asyncio.Event()
+        self._shown_frame = 0
+        self._input_tail = b''
+        loop = asyncio.get_running_loop()
+        unsubscribe = self._watch_terminal_size(loop)
+        self._start_stats()
+        
+        if input_fd is not None:
+            loop.add_reader(input_fd, self._read_input, input_fd)
+        try:
+            await asyncio.gather(self._timing_task(), self._render_task())
+        finally:
+            if input_fd is not None:
+                loop.remove_reader(input_fd)
+            unsubscribe()
+            self._finish_stats()
+            self.frame_cache.close()
+            if source is not frames:
+                source.close()
+            
+    def stop(self):
+        """Stop playback (from a key handler or another coroutine)."""
+        self.running = False
+        self._changed.set()
+        self._render_request.set()
+        
+    async def _timing_task(self):
+        """Decide which frame is due and when, and ask for it to be drawn.
+        
+        Frames are due at their deadline on ``self.clock``; frames whose
+        slot has passed are skipped rather than slowing playback down.
+        Any control that changes the schedule wakes this task early.
+        """
+        while self.running:
+            self._changed.clear()
+            if not self.is_playing:
+                await self._changed.wait()
+                continue
+                
+            index, delay = self.clock.schedule(self.current_frame)
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), delay)
+                    continue  # Seek, pause or speed change: reschedule
+                except asyncio.TimeoutError:
+                    pass
                     
-            # Update terminal size periodically
-            self.terminal_width, self.terminal_height = get_terminal_size()
+            if index >= self.total_frames:
+                if not self.config.loop:
+                    self.stop()
+                    break
+                index %= self.total_frames
+                self.clock.reset(index)
+                
+            self._request_frame(index)
+            self.current_frame = index + 1
+            # Let the renderer run before scheduling the next frame
+            await asyncio.sleep(0)
             
-            # Display current frame
-            self._display_frame(frames[self.current_frame])
+    async def _render_task(self):
+        """Draw the most recently requested frame whenever one is requested."""
+        while self.running:
+            await self._render_request.wait()
+            self._render_request.clear()
+            if not self.running:
+                break
+            self._update_terminal_size()
+            self._display_frame(self._shown_frame)
             
-            # Wait for next frame
-            time.sleep(frame_delay)
-            self.current_frame += 1
+    def _request_frame(self, index: int):
+        self._shown_frame = index
+        self._render_request.set()
+        
+    def _open_source(self, frames: FrameSource, frame_count: int = None) -> Sequence[str]:
+        """Frames as a sequence; iterators get a background prefetch buffer."""
+        if isinstance(frames, Sequence):
+            return frames
+        return PrefetchedFrames(frames, frame_count, self.config.prefetch_frames)
+        
+    def _create_frame_cache(self, frames: Sequence[str]) -> ResizedFrameCache:
+        """Resized-frame cache for ``frames`` using the configured resize mode.
+        
+        Prefetched (streamed) frames are cached as they are shown, up to
+        ``resize_cache_frames`` per layout, rather than prerendered, so
+        looping replays them without resizing and the source is only read
+        in order.
+        """
+        if isinstance(frames, PrefetchedFrames):
+            return ResizedFrameCache(frames, self.config.resize_cache_sizes, prerender=False,
+                                     mode=self.config.resize_mode, ramp=self.config.ascii_chars,
+                                     max_frames=self.config.resize_cache_frames)
+        return ResizedFrameCache(frames, self.config.resize_cache_sizes,
+                                 mode=self.config.resize_mode, ramp=self.config.ascii_chars)
             
-    def _display_frame(self, frame: str):
-        """Display a single frame with automatic resizing."""
-        if self.config.clear_screen:
-            self._clear_screen()
+    def _start_stats(self):
+        """Hook ``self.stats`` (if set) into the frame cache and renderer."""
+        self.frame_cache.stats = self.renderer.stats = self.stats
+        if self.stats is not None:
+            self.stats.start()
             
-        # Move cursor to top-left
-        sys.stdout.write('\033[H')
-        
-        # Resize frame if needed
-        if self.auto_resize:
-            # Leave room for status bar (2 lines)
-            available_height = self.terminal_height - 3
-            frame = resize_ascii_frame(frame, self.terminal_width, available_height)
+    def _finish_stats(self):
+        if self.stats is not None:
+            self.stats.pause()
+            self.stats.dropped = self.clock.dropped
+            self.stats.late = self.clock.late
             
-        # Center frame if requested
-        if self.center_content:
-            frame = center_frame(frame, self.terminal_width, self.terminal_height - 3)
+    def _set_colors(self, colors: Optional[Sequence[np.ndarray]]):
+        """Use ``colors`` for playback unless the colour mode is mono."""
+        self.colors = colors if self.config.color_mode != 'mono' else None
+        
+    def _frame_colors(self, index: int, layout: FrameLayout) -> Optional[np.ndarray]:
+        """Colour codes for frame ``index``, laid out like the cached frame."""
+        if self.colors is None:
+            return None
+        codes = color_codes(self.colors[index], self.renderer.color_mode)
+        return fit_colors(codes, layout)
         
-        # Apply color if configured
-        if self.config.color_mode != "mono":
-            sys.stdout.write(Fore.GREEN)
+    def _watch_terminal_size(self, loop: asyncio.AbstractEventLoop = None):
+        """Start tracking resizes; returns a function that stops tracking.
+        
+        With ``loop``, resizes are handled as callbacks on that loop;
+        otherwise ``_update_terminal_size`` picks them up once per frame.
+        """
+        self.terminal.start(loop)
+        unsubscribe = self.terminal.subscribe(self._on_terminal_resize)
+        
+        def stop():
+            unsubscribe()
+            self.terminal.stop()
+        return stop
+        
+    def _on_terminal_resize(self, width: int, height: int):
+        """Start prerendering frames for the new size before they are needed."""
+        self.frame_cache.prepare(width, height - self.reserved_rows, self.auto_resize,
+                                 self.center_content, start=self.current_frame)
             
-        sys.stdout.write(frame)
+    def _update_terminal_size(self):
+        """Pick up the tracked terminal size and redraw from scratch if it changed."""
+        self.terminal.poll()
+        size = self.terminal.size
+        if size != (self.terminal_width, self.terminal_height):
+            self.terminal_width, self.terminal_height = size
+            self.renderer.reset()
+            
+    def _display_frame(self, index: int):
+        """Display a single frame with automatic resizing.
         
-        # Reset color
-        if self.config.color_mode != "mono":
-            sys.stdout.write(Style.RESET_ALL)
+        Resized and centred frames come from ``self.frame_cache``, so the
+        resize work is done once per terminal size rather than per frame.
+        """
+        stats = self.stats
+        if stats is not None:
+            stats.begin_frame()
             
-        # Show status bar
-        self._show_status()
-        sys.stdout.flush()
+        # Leave room for status bar (2 lines)
+        available_height = self.terminal_height - self.reserved_rows
+        frame, layout = self.frame_cache.get_with_layout(index, self.terminal_width, available_height,
+                                                         self.auto_resize, self.center_content)
+        colors = self._frame_colors(index, layout)
+        if stats is not None:
+            stats.lap('resize')
+        
+        if self.config.clear_screen and self.config.renderer == 'full':
+            self.renderer.reset()
         
-    def _show_status(self):
-        """Show playback status bar."""
-        # Move to bottom of terminal
-        sys.stdout.write(f'\033[{self.terminal_height - 1};0H')
+        # Frame and status bar go out in a single write
+        written = self.renderer.render(frame, self._status_line(), self.terminal_height - 2, colors)
+        if stats is not None:
+            stats.end_frame(written)
         
-        status = f"[Frame {self.current_frame + 1}/{self.total_frames}] "
+    def _status_line(self) -> str:
+        """Playback status bar text."""
+        status = f"[Frame {self._shown_frame + 1}/{self.total_frames}] "
         status += f"[{'PLAYING' if self.is_playing else 'PAUSED'}] "
         status += f"[Speed: {self.config.playback_speed}x] "
         status += f"[Size: {self.terminal_width}x{self.terminal_height}] "
+        status += f"[Dropped: {self.clock.dropped} Late: {self.clock.late}] "
         
         controls = "[Q: Quit | Space: Pause | ←/→: Seek | +/-: Speed | R: Resize | C: Center]"
         
@@ -129,65 +300,105 @@ class ASCIIPlayer:
         if len(status) + len(controls) > self.terminal_width:
             controls = "[Q|Spc|←→|+-|R|C]"
             
-        sys.stdout.write(f"{Fore.CYAN}{status}{controls}{Style.RESET_ALL}")
+        return (status + controls)[:self.terminal_width]
         
-    def _handle_controls(self):
-        """Handle keyboard controls."""
-        while True:
-            if select.select([sys.stdin], [], [], 0.1)[0]:
-                key = sys.stdin.read(1)
-                
-                if key.lower() == 'q':
-                    self.is_playing = False
-                    break
-                elif key == ' ':
-                    self.is_playing = not self.is_playing
-                elif key == '+' or key == '=':
-                    self.config.playback_speed = min(4.0, self.config.playback_speed + 0.25)
-                elif key == '-':
-                    self.config.playback_speed = max(0.25, self.config.playback_speed - 0.25)
-                elif key.lower() == 'r':
-                    self.auto_resize = not self.auto_resize
-                elif key.lower() == 'c':
-                    self.center_content = not self.center_content
-                elif key == '\x1b':  # Arrow keys
-                    if sys.stdin.read(1) == '[':
-                        arrow = sys.stdin.read(1)
-                        if arrow == 'C':  # Right arrow
-                            self.current_frame = min(self.total_frames - 1, self.current_frame + 5)
-                        elif arrow == 'D':  # Left arrow
-                            self.current_frame = max(0, self.current_frame - 5)
-                            
-            if not self.is_playing and self.current_frame >= self.total_frames - 1:
-                break
+    def _read_input(self, fd: int):
+        """Reader callback: handle every key that is waiting on ``fd``."""
+        data = os.read(fd, 64)
+        if not data:
+            self.stop()
+            return
+        keys, self._input_tail = parse_keys(self._input_tail + data)
+        for key in keys:
+            self._handle_key(key)
                 
+    def _handle_key(self, key: str):
+        """Apply one key press to the player state."""
+        if key.lower() == 'q':
+            self.stop()
+            return
+        elif key == ' ':
+            self.is_playing = not self.is_playing
+            self.current_frame = self._shown_frame + 1
+            self.clock.reset(self.current_frame)
+            if self.stats is not None and self.is_playing:
+                self.stats.start()
+            elif self.stats is not None:
+                self.stats.pause()
+        elif key == '+' or key == '=':
+            self.config.playback_speed = min(4.0, self.config.playback_speed + 0.25)
+            self.clock.set_speed(self.config.playback_speed, self.current_frame)
+        elif key == '-':
+            self.config.playback_speed = max(0.25, self.config.playback_speed - 0.25)
+            self.clock.set_speed(self.config.playback_speed, self.current_frame)
+        elif key.lower() == 'r':
+            self.auto_resize = not self.auto_resize
+            self.renderer.reset()
+        elif key.lower() == 'c':
+            self.center_content = not self.center_content
+            self.renderer.reset()
+        elif key in ('\x1b[C', '\x1b[D'):  # Right/left arrow
+            step = 5 if key == '\x1b[C' else -5
+            self.current_frame = max(0, min(self.total_frames - 1, self._shown_frame + step))
+            self.clock.reset(self.current_frame)
+            if not self.is_playing:
+                self._shown_frame = self.current_frame
+        else:
+            return
+            
+        self._changed.set()
+        if not self.is_playing:
+            # Paused: redraw straight away to show the seek or the new status
+            self._request_frame(self._shown_frame)
+            
     def _clear_screen(self):
         """Clear terminal screen."""
         clear_terminal()
         
-    def play_simple(self, frames: List[str], fps: int = None):
+    def play_simple(self, frames: FrameSource, fps: int = None, frame_count: int = None,
+                    colors: Optional[Sequence[np.ndarray]] = None):
         """Simple playback without controls (for testing)."""
+        source = self._open_source(frames, frame_count)
+        self._set_colors(colors)
         fps = fps or self.config.target_fps
-        frame_delay = 1.0 / (fps * self.config.playback_speed)
+        self.clock = FrameClock(fps, self.config.playback_speed)
+        self.frame_cache = self._create_frame_cache(source)
+        self.reserved_rows = 2
+        unsubscribe = self._watch_terminal_size()
+        self._start_stats()
+        stats = self.stats
         
         try:
             hide_cursor()
             while True:
-                for i, frame in enumerate(frames):
+                self.clock.reset(0)
+                i = 0
+                while True:
+                    i = self.clock.wait_for(i)
+                    if i >= len(source):
+                        break
                     # Update terminal size
-                    self.terminal_width, self.terminal_height = get_terminal_size()
+                    self._update_terminal_size()
                     
-                    if self.config.clear_screen:
-                        self._clear_screen()
+                    if self.config.clear_screen and self.config.renderer == 'full':
+                        self.renderer.reset()
+                    if stats is not None:
+                        stats.begin_frame()
                         
-                    # Auto-resize frame
-                    if self.auto_resize:
-                        frame = resize_ascii_frame(frame, self.terminal_width, self.terminal_height - 2)
+                    # Auto-resized frame, from the cache
+                    frame, layout = self.frame_cache.get_with_layout(i, self.terminal_width,
+                                                                     self.terminal_height - self.reserved_rows,
+                                                                     self.auto_resize)
+                    colors = self._frame_colors(i, layout)
+                    if stats is not None:
+                        stats.lap('resize')
                         
-                    print(frame)
-                    print(f"\nFrame {i + 1}/{len(frames)} | Terminal: {self.terminal_width}x{self.terminal_height}")
-                    
-                    time.sleep(frame_delay)
+                    status = (f"Frame {i + 1}/{len(source)} | Terminal: {self.terminal_width}x{self.terminal_height}"
+                              f" | Dropped: {self.clock.dropped} Late: {self.clock.late}")
+                    written = self.renderer.render(frame, status, frame.count('\n') + 2, colors)
+                    if stats is not None:
+                        stats.end_frame(written)
+                    i += 1
                 
                 # If not looping, break after one complete playthrough
                 if not self.config.loop:
@@ -197,6 +408,11 @@ class ASCIIPlayer:
             print("\nPlayback interrupted.")
         finally:
             show_cursor()
+            unsubscribe()
+            self._finish_stats()
+            self.frame_cache.close()
+            if source is not frames:
+                source.close()
             
     @staticmethod
     def preview_frame(frame: str, title: str = "Preview", auto_fit: bool = True):
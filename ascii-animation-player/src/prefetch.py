@@ -0,0 +1,141 @@
+"""Background decoding of frames into a bounded prefetch buffer."""
+import threading
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence, Union
+
+FrameSource = Union[Sequence[str], Iterable[str], Callable[[], Iterator[str]]]
+
+# Frames kept behind the read position, for short backward seeks
+KEEP_BEHIND = 8
+
+
+class PrefetchedFrames(Sequence):
+    """Frame sequence filled ahead of playback by a decoder thread.
+
+    ``source`` is either an indexable sequence (random access, e.g. a
+    lazily decoded container), a callable returning a fresh iterator over
+    the frames (sequential, restartable), or a plain iterator (one pass
+    only). At most ``capacity`` frames ahead of the last one read, plus a
+    few behind it, are held in memory. Indexing blocks only until that
+    frame has been decoded, so playback can start after the first frame.
+
+    Reading a frame outside the buffered window restarts the decoder at
+    that frame: sequences jump straight to it, callables are restarted
+    (which is how looping back to frame 0 works) and skip forward.
+    """
+
+    def __init__(self, source: FrameSource, length: Optional[int] = None, capacity: int = 64):
+        if isinstance(source, Sequence):
+            self._sequence, self._factory = source, None
+            length = len(source) if length is None else length
+        elif callable(source):
+            self._sequence, self._factory = None, source
+        else:
+            self._sequence, self._factory = None, None
+        if length is None:
+            raise ValueError("length is required for iterator frame sources")
+
+        self._length = length
+        self.capacity = max(1, capacity)
+        self._buffer: Dict[int, str] = {}
+        self._cond = threading.Condition()
+        self._read = 0
+        self._next = 0
+        self._generation = 0
+        self._iterator: Optional[Iterator[str]] = (
+            iter(source) if self._sequence is None and self._factory is None else None)
+        self._iterator_position = 0
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._decode_loop, daemon=True)
+        self._thread.start()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("frame index out of range")
+
+        with self._cond:
+            self._read = index
+            # Frames between the decoder and a capacity ahead of it will arrive
+            if index not in self._buffer and not self._next <= index <= self._next + self.capacity:
+                self._restart(index)
+            self._evict()
+            self._cond.notify_all()
+            while index not in self._buffer:
+                if self._error is not None:
+                    raise self._error
+                if self._closed:
+                    raise RuntimeError("frame source closed")
+                self._cond.wait()
+            return self._buffer[index]
+
+    def close(self):
+        """Stop the decoder thread and drop buffered frames."""
+        with self._cond:
+            self._closed = True
+            self._buffer.clear()
+            self._cond.notify_all()
+
+    def _restart(self, index: int):
+        """Point the decoder at ``index`` (called with the lock held)."""
+        self._buffer.clear()
+        self._next = index
+        self._generation += 1
+
+    def _evict(self):
+        """Drop frames too far behind the read position (lock held)."""
+        for stale in [i for i in self._buffer if i < self._read - KEEP_BEHIND]:
+            del self._buffer[stale]
+
+    def _decode_loop(self):
+        while True:
+            with self._cond:
+                while not self._closed and (self._next >= self._length
+                                            or self._next - self._read >= self.capacity):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                index, generation = self._next, self._generation
+
+            try:
+                frame = self._decode(index)
+            except BaseException as error:
+                with self._cond:
+                    self._error = error
+                    self._cond.notify_all()
+                return
+
+            with self._cond:
+                if generation == self._generation:
+                    self._buffer[index] = frame
+                    self._next = index + 1
+                    self._evict()
+                    self._cond.notify_all()
+
+    def _decode(self, index: int) -> str:
+        if self._sequence is not None:
+            return self._sequence[index]
+        if self._iterator is None or index < self._iterator_position:
+            if self._factory is None:
+                raise IndexError("a one-pass frame iterator cannot seek backwards")
+            self._iterator = iter(self._factory())
+            self._iterator_position = 0
+        while self._iterator_position < index:
+            self._next_frame()
+        return self._next_frame()
+
+    def _next_frame(self) -> str:
+        """Advance the iterator by one frame."""
+        try:
+            frame = next(self._iterator)
+        except StopIteration:
+            raise RuntimeError(f"frame source ended after {self._iterator_position} of "
+                               f"{self._length} frames") from None
+        self._iterator_position += 1
+        return frame
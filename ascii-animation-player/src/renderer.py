@@ -0,0 +1,146 @@
+"""Terminal renderers that compose each frame into a single write."""
+import sys
+import numpy as np
+from typing import List, Optional, TextIO
+from frame_codec import diff_line
+from color import style_rows
+
+CLEAR_SCREEN = '\033[2J'
+CLEAR_LINE = '\033[K'
+RESET_STYLE = '\033[0m'
+
+
+def move_to(row: int, col: int = 0) -> str:
+    """Escape sequence moving the cursor to a 0-based ``(row, col)``."""
+    return f'\033[{row + 1};{col + 1}H'
+
+
+class FrameRenderer:
+    """Redraw the whole frame and status line on every call.
+
+    The frame is addressed row by row rather than written with newlines,
+    so it renders correctly in raw mode, and everything is sent with a
+    single ``write`` followed by one ``flush``. If ``stats`` is set to a
+    ``PlaybackStats``, the compose, write and flush stages are timed.
+
+    Frames rendered with per-cell colour codes (see ``color.py``) are
+    written in ``color_mode`` with one SGR sequence per run of equally
+    coloured cells, instead of in ``frame_style``.
+    """
+
+    def __init__(self, out: TextIO = None, frame_style: str = '', status_style: str = '',
+                 color_mode: str = 'truecolor'):
+        self.out = out or sys.stdout
+        self.frame_style = frame_style
+        self.status_style = status_style
+        self.color_mode = color_mode
+        self.bytes_written = 0
+        self.stats = None
+        self._needs_clear = True
+        self._height = 0
+
+    def reset(self):
+        """Forget what is on screen; the next frame clears and redraws it."""
+        self._needs_clear = True
+        self._height = 0
+
+    def render(self, frame: str, status: Optional[str] = None, status_row: int = 0,
+               colors: Optional[np.ndarray] = None) -> int:
+        """Draw ``frame`` at the top-left and ``status`` on ``status_row``.
+
+        ``colors`` optionally gives a colour code per cell, laid out like
+        the frame (``color.fit_colors``). Returns the number of bytes
+        written, as UTF-8 (Braille glyphs are three bytes each).
+        """
+        parts = [CLEAR_SCREEN] if self._needs_clear else []
+        self._needs_clear = False
+        style = self.frame_style if colors is None else ''
+        parts.append(style)
+        self._compose_frame(style_rows(frame.split('\n'), colors, self.color_mode), parts,
+                            colors is not None)
+        if style:
+            parts.append(RESET_STYLE)
+        if status is not None:
+            parts.append(f"{move_to(status_row)}{self.status_style}{status}{CLEAR_LINE}")
+            if self.status_style:
+                parts.append(RESET_STYLE)
+
+        buffer = ''.join(parts)
+        stats = self.stats
+        if stats is not None:
+            stats.lap('compose')
+        self.out.write(buffer)
+        if stats is not None:
+            stats.lap('write')
+        self.out.flush()
+        if stats is not None:
+            stats.lap('flush')
+        written = len(buffer) if buffer.isascii() else len(buffer.encode('utf-8'))
+        self.bytes_written += written
+        return written
+
+    def _compose_frame(self, lines: List[str], parts: List[str], styled: bool = False):
+        for row, line in enumerate(lines):
+            parts.append(f"{move_to(row)}{line}{CLEAR_LINE}")
+        self._clear_rows(len(lines), parts)
+
+    def _clear_rows(self, height: int, parts: List[str]):
+        """Blank rows left over from a taller previous frame."""
+        for row in range(height, self._height):
+            parts.append(f"{move_to(row)}{CLEAR_LINE}")
+        self._height = height
+
+
+class DiffRenderer(FrameRenderer):
+    """Write only the runs that changed since the previous frame.
+
+    The renderer keeps the lines it last emitted and, for each new frame,
+    moves the cursor to every changed run and overwrites just that run.
+    Nearby changes are merged into one run (see ``frame_codec.diff_line``)
+    because each cursor move costs several bytes. Call ``reset`` whenever
+    something else may have drawn over the screen, such as a resize.
+    Coloured rows carry SGR sequences, so they are compared whole and
+    redrawn whole when they change.
+    """
+
+    def __init__(self, out: TextIO = None, frame_style: str = '', status_style: str = '',
+                 color_mode: str = 'truecolor'):
+        super().__init__(out, frame_style, status_style, color_mode)
+        self._lines: List[str] = []
+
+    def reset(self):
+        super().reset()
+        self._lines = []
+
+    def _compose_frame(self, lines: List[str], parts: List[str], styled: bool = False):
+        previous = self._lines
+        for row, line in enumerate(lines):
+            if row >= len(previous):
+                parts.append(f"{move_to(row)}{line}{CLEAR_LINE}")
+                continue
+            if line == previous[row]:
+                continue
+            redraw = f"{move_to(row)}{line}{CLEAR_LINE}"
+            if styled:
+                parts.append(redraw)
+                continue
+            runs = diff_line(row, previous[row], line)
+            if len(runs[0]) == 2:
+                parts.append(redraw)
+                continue
+            # On noisy rows the runs can cost more than redrawing the row
+            patch = ''.join(f"{move_to(row, col)}{text}" for _, col, text in runs)
+            parts.append(patch if len(patch) < len(redraw) else redraw)
+        self._clear_rows(len(lines), parts)
+        self._lines = lines
+
+
+RENDERERS = {'full': FrameRenderer, 'diff': DiffRenderer}
+
+
+def create_renderer(mode: str, out: TextIO = None, frame_style: str = '',
+                    status_style: str = '', color_mode: str = 'truecolor') -> FrameRenderer:
+    """Return the renderer for ``mode`` ("full" or "diff")."""
+    if mode not in RENDERERS:
+        raise ValueError(f"Unknown renderer: {mode}")
+    return RENDERERS[mode](out, frame_style, status_style, color_mode)
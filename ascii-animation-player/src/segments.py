@@ -0,0 +1,166 @@
+"""Video to ASCII conversion, sequential or split into segments across processes.
+
+The parallel mode cuts the clip into time segments, each converted by a
+worker process with its own ``VideoToASCII`` (and so its own capture
+handle) through the ``start_time``/``end_time`` config, then merges the
+segments in order. Segment boundaries fall on source frames that the
+sequential conversion keeps, so every segment knows exactly how many
+frames it must produce and the merged result matches a sequential run.
+"""
+import copy
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+from tqdm import tqdm
+from config import ASCIIConfig
+from color import cell_colors
+from compression import resolve_workers
+from glyph_map import mapped_frame
+
+# Output frames per segment below which a worker's seek and start-up cost dominates
+MIN_SEGMENT_FRAMES = 60
+
+# Segments per worker, so a worker that finishes early picks up more work
+SEGMENTS_PER_WORKER = 4
+
+# Segments converted or waiting to be yielded, per worker; bounds how many
+# converted segments are held in memory at once
+SEGMENTS_IN_FLIGHT_PER_WORKER = 2
+
+# Segment boundaries are moved this far (in frames) past the frame they
+# start on, so that both flooring and rounding a time back to a frame index
+# give that frame
+BOUNDARY_OFFSET = 0.25
+
+# (first source frame, end source frame or None for the end of the clip,
+#  output frames expected or None when the clip may end inside the segment)
+Segment = Tuple[int, Optional[int], Optional[int]]
+
+
+def frame_to_ascii(processor, cfg: ASCIIConfig, enhanced) -> str:
+    """Map an enhanced video frame to ASCII with the configured converter.
+
+    Edge detection and error-diffusion dithering are the processor's own;
+    anything else, Braille included, goes through the brightness LUT or
+    Braille packing (``mapped_frame``).
+    """
+    if cfg.edge_detection or (cfg.dithering and cfg.dither_mode == 'diffusion'):
+        return processor.frame_to_ascii_custom(enhanced)
+    return mapped_frame(cfg, enhanced)
+
+
+def iter_ascii_frames(processor, cfg: ASCIIConfig, video_file: str):
+    """Yield ``(ascii_frame, colors)`` one at a time instead of building the full list.
+
+    ``colors`` is the average colour under each character, or None in mono mode.
+    """
+    frames = processor.extract_frames(video_file)
+    if cfg.show_progress:
+        frames = tqdm(frames, desc="Converting", unit="frame")
+    for frame in frames:
+        enhanced = processor.enhance_frame(frame)
+        ascii_frame = frame_to_ascii(processor, cfg, enhanced)
+        colors = None
+        if cfg.color_mode != 'mono':
+            lines = ascii_frame.split('\n')
+            colors = cell_colors(np.asarray(enhanced), len(lines), max(len(line) for line in lines))
+        yield ascii_frame, colors
+
+
+def probe_video(video_file: str) -> Tuple[float, int]:
+    """Source frame rate and frame count from the container's metadata."""
+    import cv2
+    capture = cv2.VideoCapture(video_file)
+    try:
+        if not capture.isOpened():
+            raise ValueError(f"Cannot open video: {video_file}")
+        return capture.get(cv2.CAP_PROP_FPS), int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        capture.release()
+
+
+def plan_segments(cfg: ASCIIConfig, source_fps: float, source_frames: int, workers: int) -> List[Segment]:
+    """Split the configured time range into segments of whole output frames.
+
+    The sequential conversion keeps every ``frame_skip``-th source frame
+    from ``start_time``; each segment starts on one of those frames and
+    holds the same number of them, except the last, which runs to
+    ``end_time`` (or the end of the clip) because frame counts from
+    container metadata can be wrong.
+    """
+    skip = cfg.get_frame_skip(source_fps)
+    first = int(cfg.start_time * source_fps + BOUNDARY_OFFSET)
+    end = source_frames
+    if cfg.end_time is not None:
+        end = min(end, int(cfg.end_time * source_fps + BOUNDARY_OFFSET))
+    total = max(0, -(-(end - first) // skip))
+    per_segment = max(MIN_SEGMENT_FRAMES, -(-total // (workers * SEGMENTS_PER_WORKER)))
+    segments: List[Segment] = []
+    for offset in range(0, max(total - per_segment, 0), per_segment):
+        start = first + offset * skip
+        segments.append((start, start + per_segment * skip, per_segment))
+    last = first + len(segments) * per_segment * skip
+    segments.append((last, None, None))
+    return segments
+
+
+def convert_segment(processor_factory, video_file: str, cfg: ASCIIConfig, source_fps: float,
+                    segment: Segment) -> List[Tuple[str, Optional[np.ndarray]]]:
+    """Convert one segment in a worker process; runs on its own processor."""
+    start, end, expected = segment
+    cfg = copy.copy(cfg)
+    cfg.show_progress = False
+    cfg.start_time = (start + BOUNDARY_OFFSET) / source_fps
+    if end is not None:
+        cfg.end_time = (end + BOUNDARY_OFFSET) / source_fps
+    frames = list(iter_ascii_frames(processor_factory(cfg), cfg, video_file))
+    if expected is not None and len(frames) > expected:
+        raise RuntimeError(f"Segment starting at source frame {start} produced {len(frames)} "
+                           f"frames, expected {expected}")
+    return frames
+
+
+def iter_segment_frames(processor_factory, cfg: ASCIIConfig, video_file: str, workers: int = 0,
+                        source: Optional[Tuple[float, int]] = None) -> Iterator[Tuple[str, Optional[np.ndarray]]]:
+    """Yield ``(ascii_frame, colors)`` like ``iter_ascii_frames``, converted in parallel.
+
+    ``processor_factory(cfg)`` builds the processor in each worker (it
+    must be picklable, e.g. the ``VideoToASCII`` class). ``source`` is the
+    ``(fps, frame_count)`` of the video, probed with OpenCV if not given.
+    Segments are yielded in order as they complete. At most
+    ``SEGMENTS_IN_FLIGHT_PER_WORKER`` segments per worker are submitted or
+    held at a time, so converted frames do not pile up in memory when the
+    consumer is slower than the workers. A segment may only
+    come up short when the clip ends inside it; any later segment that
+    still produces frames means the boundaries did not line up, and
+    raises ``RuntimeError`` rather than yield misordered frames.
+    """
+    source_fps, source_frames = source or probe_video(video_file)
+    workers = resolve_workers(workers)
+    segments = iter(plan_segments(cfg, source_fps, source_frames, workers))
+    progress = tqdm(desc="Converting", unit="frame", disable=not cfg.show_progress)
+    ended_at = None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            window = workers * SEGMENTS_IN_FLIGHT_PER_WORKER
+            in_flight = deque()
+            while True:
+                for segment in islice(segments, window - len(in_flight)):
+                    in_flight.append((segment, pool.submit(convert_segment, processor_factory, video_file,
+                                                           cfg, source_fps, segment)))
+                if not in_flight:
+                    break
+                segment, future = in_flight.popleft()
+                frames = future.result()
+                if frames and ended_at is not None:
+                    raise RuntimeError(f"Segment starting at source frame {segment[0]} produced frames "
+                                       f"after the clip ended at source frame {ended_at}")
+                expected = segment[2]
+                if expected is not None and len(frames) < expected:
+                    ended_at = segment[0]
+                progress.update(len(frames))
+                yield from frames
+    finally:
+        progress.close()
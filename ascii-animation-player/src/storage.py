@@ -1,13 +1,101 @@
 """Storage functionality for ASCII animations."""
 import pickle
-import gzip
-import lzma
-import bz2
 import json
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple
 from pathlib import Path
 from config import ASCIIConfig
+from compression import OPEN_FUNCS, open_compressed
+from frame_codec import create_encoder, decode_frames, apply_runs
+from interning import load_interned
+from glyphs import GlyphFrames, encode_glyphs, stack_frames
+from container import ContainerRecords, MAGIC as CONTAINER_MAGIC
+from web_export import export_web, is_web_export, load_web_records
+from prefetch import PrefetchedFrames
+from color import stack_colors
+from writers import (
+    FrameWriter, PickleStreamWriter, JSONLinesWriter, NpzStreamWriter,
+    ContainerStreamWriter, BufferedWriter
+)
+
+# File suffixes appended by the whole-file compressors
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'lzma': '.xz', 'bz2': '.bz2'}
+
+# Streaming writer per storage format
+STREAM_WRITERS = {
+    'pickle': PickleStreamWriter,
+    'jsonl': JSONLinesWriter,
+    'npz': NpzStreamWriter,
+    'container': ContainerStreamWriter,
+}
+
+# Conventional file suffix for each storage format
+FORMAT_SUFFIXES = {'pickle': '.pkl', 'json': '.json', 'jsonl': '.jsonl', 'npz': '.npz', 'container': '.asca'}
+
+# Suffixes that describe an animation's format or compression
+ANIMATION_SUFFIXES = {'.pickle'} | set(FORMAT_SUFFIXES.values()) | set(COMPRESSION_SUFFIXES.values())
+
+
+# Leading bytes of each whole-file compressor
+COMPRESSION_MAGIC = {b'\x1f\x8b': 'gzip', b'\xfd7zXZ\x00': 'lzma', b'BZh': 'bz2'}
+ZIP_MAGIC = b'PK\x03\x04'
+
+
+def read_last_line(path: str, chunk_size: int = 1 << 16) -> bytes:
+    """Last non-empty line of an uncompressed file, read backwards from its end."""
+    with open(path, 'rb') as f:
+        position = f.seek(0, 2)
+        tail = b''
+        while position > 0:
+            step = min(chunk_size, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+            start = tail.rstrip(b'\n').rfind(b'\n')
+            if start >= 0:
+                return tail[start + 1:]
+        return tail
+
+
+def sniff_format(path: str) -> Tuple[str, str]:
+    """Detect ``(storage_format, compression)`` from a file's leading bytes.
+    
+    Only the first few bytes are read (and decompressed), so file names and
+    suffixes such as ``.pkl.gz.gz`` do not matter. Web exports are
+    directories and are recognised by their manifest.
+    """
+    if Path(path).is_dir():
+        if is_web_export(path):
+            return 'web', 'gzip'
+        raise ValueError(f"Unrecognised animation file format: {path}")
+    with open(path, 'rb') as f:
+        head = f.read(8)
+    if head.startswith(CONTAINER_MAGIC):
+        return 'container', 'none'
+    if head.startswith(ZIP_MAGIC):
+        return 'npz', 'none'
+        
+    compression = next((name for magic, name in COMPRESSION_MAGIC.items() if head.startswith(magic)), 'none')
+    with OPEN_FUNCS[compression](path, 'rb') as f:
+        head = f.read(64)
+        
+    if head.startswith(b'\x80'):
+        return 'pickle', compression
+    head = head.lstrip()
+    if head.startswith(b'{'):
+        # Streamed JSON-lines files open with a {"format": "stream", ...} header
+        if head[1:].lstrip().startswith(b'"format"'):
+            return 'jsonl', compression
+        return 'json', compression
+    raise ValueError(f"Unrecognised animation file format: {path}")
+
+
+def animation_name(path: str) -> str:
+    """Return a file's name with its format and compression suffixes removed."""
+    name = Path(path).name
+    while Path(name).suffix in ANIMATION_SUFFIXES:
+        name = name[:-len(Path(name).suffix)]
+    return name
 
 
 class ASCIIStorage:
@@ -16,8 +104,27 @@ class ASCIIStorage:
     def __init__(self, config: ASCIIConfig):
         self.config = config
         
-    def save(self, frames: List[str], output_path: str, metadata: Dict[str, Any] = None):
-        """Save ASCII frames with metadata."""
+    def save(self, frames: List[str], output_path: str, metadata: Dict[str, Any] = None,
+             colors: Sequence[np.ndarray] = None):
+        """Save ASCII frames with metadata.
+        
+        ``colors`` optionally gives a ``(rows, cols, 3)`` RGB plane per
+        frame; the npz format stores it, quantized, next to the glyphs.
+        """
+        self._check_dictionary()
+        if colors is not None:
+            self._check_colors()
+        
+        # JSON lines and containers are always written frame by frame
+        if self.config.storage_format in ('jsonl', 'container'):
+            with self.open_writer(output_path, metadata) as writer:
+                for frame in frames:
+                    writer.append(frame)
+            return
+        if self.config.storage_format == 'web':
+            self.export_web(frames, output_path, metadata)
+            return
+            
         # Prepare data structure
         data = {
             'frames': frames,
@@ -25,6 +132,16 @@ class ASCIIStorage:
             'metadata': metadata or {},
             'version': '1.0'
         }
+        if colors is not None:
+            data['colors'] = colors
+        
+        # Store keyframes plus deltas, or interned references, instead of full frames
+        encoder = create_encoder(self.config, self.get_output_path(output_path))
+        if encoder:
+            data['frames'] = [encoder.encode(frame) for frame in frames]
+            data['encoding'] = encoder.info()
+            data['version'] = '1.1'
+            encoder.flush()
         
         # Add frame metadata
         data['metadata'].update({
@@ -43,120 +160,415 @@ class ASCIIStorage:
         else:
             raise ValueError(f"Unknown storage format: {self.config.storage_format}")
             
+    def open_writer(self, output_path: str, metadata: Dict[str, Any] = None) -> FrameWriter:
+        """Open a writer that streams frames to ``output_path`` as they are appended.
+        
+        Use as a context manager; metadata is written when the writer closes.
+        The JSON format cannot be streamed, so its writer buffers frames and
+        calls save() on close.
+        """
+        self._check_dictionary()
+        path = self.get_output_path(output_path)
+        if self.config.storage_format in ('json', 'web'):
+            return BufferedWriter(self.config, path, metadata, storage=self, output_path=output_path)
+        if self.config.storage_format not in STREAM_WRITERS:
+            raise ValueError(f"Unknown storage format: {self.config.storage_format}")
+        return STREAM_WRITERS[self.config.storage_format](self.config, path, metadata)
+        
+    def export_web(self, frames: Sequence[str], output_dir: str,
+                   metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Write a chunked, delta-encoded web export (see ``web_export``).
+        
+        Returns the export report: gzip bytes for first paint and in total.
+        """
+        metadata = dict(metadata or {})
+        metadata.update({
+            'frame_count': len(frames),
+            'fps': self.config.target_fps,
+            'dimensions': (self.config.width, self.config.height),
+        })
+        return export_web(frames, output_dir, metadata, chunk_frames=self.config.web_chunk_frames)
+        
+    def _check_colors(self):
+        """Colour planes are stored next to glyph arrays, i.e. full frames in npz."""
+        if self.config.storage_format != 'npz':
+            raise ValueError("colour planes are only stored by the npz format")
+        if self.config.keyframe_interval > 0 or self.config.row_store:
+            raise ValueError("colour planes need full frames (no keyframe_interval or row_store)")
+            
+    def load_colors(self, input_path: str) -> Optional[np.ndarray]:
+        """Read the ``(frames, rows, cols, 3)`` colour planes, or None if there are none."""
+        if sniff_format(input_path)[0] != 'npz':
+            return None
+        with np.load(input_path) as archive:
+            if 'colors' in archive.files:
+                return archive['colors']
+            if 'color_stream' in archive.files:
+                return self._read_color_stream(archive)
+        return None
+        
+    def _check_dictionary(self):
+        """Preset dictionaries only apply to per-frame (container) zlib compression."""
+        if self.config.compression_dict and self.config.storage_format != 'container':
+            raise ValueError("compression_dict is only supported by the container format")
+        if self.config.compression_dict and self.config.compression != 'gzip':
+            raise ValueError("compression_dict requires gzip (zlib) compression")
+            
     def load(self, input_path: str) -> Dict[str, Any]:
         """Load ASCII frames and metadata."""
-        path = Path(input_path)
-        
-        # Determine format from extension
-        if path.suffix in ['.pkl', '.pickle']:
-            return self._load_pickle(input_path)
-        elif path.suffix == '.json':
-            return self._load_json(input_path)
-        elif path.suffix == '.npz':
-            return self._load_npz(input_path)
+        data = self._load_raw(input_path)
+        
+        # Rebuild frames lazily from keyframes and deltas, or from the row store
+        encoding = data.get('encoding')
+        if encoding and encoding.get('type') == 'interned':
+            data['frames'] = load_interned(data['frames'], encoding, input_path)
+        else:
+            data['frames'] = decode_frames(data['frames'], encoding)
+        return data
+        
+    def iter_frames(self, input_path: str) -> Iterator[str]:
+        """Yield decoded frames in order while reading the file.
+        
+        Streamed pickles and JSON-lines files are read record by record,
+        with delta records applied as they arrive, so the first frame is
+        available without reading the rest. Other layouts, and frames that
+        reference a row store, are loaded through ``load``.
+        """
+        storage_format, compression = sniff_format(input_path)
+        if storage_format not in ('pickle', 'jsonl'):
+            yield from self.load(input_path)['frames']
+            return
+            
+        keyframe, lines = None, None
+        for index, record in enumerate(self._iter_records(input_path, storage_format, compression)):
+            if isinstance(record, str):
+                keyframe, lines = record, None
+                yield record
+            elif isinstance(record, list) and keyframe is not None:
+                if lines is None:
+                    lines = keyframe.split('\n')
+                yield '\n'.join(apply_runs(lines, record))
+            else:
+                # Interned row ids (lists before any keyframe, or references)
+                # need the row store named in the trailer
+                frames = self.load(input_path)['frames']
+                yield from (frames[i] for i in range(index, len(frames)))
+                return
+                
+    def open_frames(self, input_path: str, frame_count: int = None) -> Sequence[str]:
+        """Open frames for playback, decoded ahead of use by a background thread.
+        
+        Streamed files are decoded sequentially into a prefetch buffer of
+        ``config.prefetch_frames`` frames and re-read from the start when
+        playback loops, so they are never held in memory whole. Lazily
+        decoded sequences (containers, delta records) are decoded ahead
+        the same way; glyph arrays are returned as loaded. ``frame_count``
+        saves reading it from the file. Close a ``PrefetchedFrames``
+        result when done.
+        """
+        storage_format, _ = sniff_format(input_path)
+        if storage_format in ('pickle', 'jsonl'):
+            if frame_count is None:
+                frame_count = self.load_info(input_path)['metadata']['frame_count']
+            return PrefetchedFrames(lambda: self.iter_frames(input_path), frame_count,
+                                    self.config.prefetch_frames)
+        frames = self.load(input_path)['frames']
+        if isinstance(frames, (GlyphFrames, list)):
+            return frames
+        return PrefetchedFrames(frames, capacity=self.config.prefetch_frames)
+        
+    def load_info(self, input_path: str) -> Dict[str, Any]:
+        """Read ``config``, ``metadata`` and ``version`` without decoding frames.
+        
+        Containers, npz archives and uncompressed JSON-lines files only read
+        their header and trailer (the trailer backwards from the end of the
+        file). Compressed JSON-lines files are decompressed to the trailer
+        without parsing the frame lines; streamed pickles have to unpickle
+        every record to reach it, and the single-object pickle and JSON
+        layouts are parsed whole.
+        """
+        storage_format, compression = sniff_format(input_path)
+        
+        if storage_format == 'web':
+            data = load_web_records(input_path)
+        elif storage_format == 'container':
+            records = ContainerRecords(input_path)
+            data = dict(records.info)
+            compression = records.compression
+            records.close()
+        elif storage_format == 'npz':
+            with np.load(input_path) as archive:
+                data = {
+                    'config': json.loads(str(archive['config'])),
+                    'metadata': json.loads(str(archive['metadata'])),
+                    'version': str(archive['version'])
+                }
+                if 'encoding' in archive.files:
+                    data['encoding'] = json.loads(str(archive['encoding']))
+        elif storage_format == 'jsonl':
+            with OPEN_FUNCS[compression](input_path, 'rt', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+                if compression == 'none':
+                    line = read_last_line(input_path)
+                else:
+                    for line in f:
+                        pass
+            data = self._join_stream(header, [], json.loads(line))
+        elif storage_format == 'pickle':
+            data = self._load_pickle(input_path, compression, skip_frames=True)
+        else:
+            data = self._load_json(input_path, compression)
+            
+        data.pop('frames', None)
+        data['encoding'] = (data.get('encoding') or {}).get('type', 'full')
+        data['format'] = storage_format
+        data['compression'] = compression
+        if storage_format == 'web':
+            data['file_size'] = sum(p.stat().st_size for p in Path(input_path).iterdir())
         else:
-            # Try to detect format
-            try:
-                return self._load_pickle(input_path)
-            except:
-                try:
-                    return self._load_json(input_path)
-                except:
-                    return self._load_npz(input_path)
-                    
+            data['file_size'] = Path(input_path).stat().st_size
+        return data
+        
+    def _load_raw(self, input_path: str) -> Dict[str, Any]:
+        """Load the stored data structure without decoding frames."""
+        storage_format, compression = sniff_format(input_path)
+        
+        if storage_format == 'container':
+            return self._load_container(input_path)
+        elif storage_format == 'web':
+            return load_web_records(input_path)
+        elif storage_format == 'npz':
+            return self._load_npz(input_path)
+        elif storage_format == 'pickle':
+            return self._load_pickle(input_path, compression)
+        elif storage_format == 'jsonl':
+            return self._load_jsonl(input_path, compression)
+        return self._load_json(input_path, compression)
+        
     def _save_pickle(self, data: Dict[str, Any], output_path: str):
         """Save using pickle format with optional compression."""
-        if self.config.compression == 'none':
-            with open(output_path, 'wb') as f:
-                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
-        elif self.config.compression == 'gzip':
-            with gzip.open(f"{output_path}.gz", 'wb') as f:
-                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
-        elif self.config.compression == 'lzma':
-            with lzma.open(f"{output_path}.xz", 'wb') as f:
-                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
-        elif self.config.compression == 'bz2':
-            with bz2.open(f"{output_path}.bz2", 'wb') as f:
-                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._open_compressed(output_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
                 
     def _save_json(self, data: Dict[str, Any], output_path: str):
         """Save using JSON format with optional compression."""
         json_str = json.dumps(data, indent=2)
         
-        if self.config.compression == 'none':
-            with open(output_path, 'w') as f:
-                f.write(json_str)
-        elif self.config.compression == 'gzip':
-            with gzip.open(f"{output_path}.gz", 'wt', encoding='utf-8') as f:
-                f.write(json_str)
-        elif self.config.compression == 'lzma':
-            with lzma.open(f"{output_path}.xz", 'wt', encoding='utf-8') as f:
-                f.write(json_str)
-        elif self.config.compression == 'bz2':
-            with bz2.open(f"{output_path}.bz2", 'wt', encoding='utf-8') as f:
-                f.write(json_str)
+        with self._open_compressed(output_path, 'wt') as f:
+            f.write(json_str)
+
+    def _open_compressed(self, output_path: str, mode: str):
+        """Open the (suffixed) output file through the configured compressor.
+
+        With ``compression_workers`` other than 1, blocks are compressed in
+        parallel into a multi-member file that loads like any other.
+        """
+        return open_compressed(self.get_output_path(output_path), mode,
+                               self.config.compression, self.config.compression_workers)
                 
     def _save_npz(self, data: Dict[str, Any], output_path: str):
-        """Save using NumPy compressed format."""
-        # Convert frames to numpy array for efficient storage
-        # Encode strings as bytes
-        frames_bytes = [frame.encode('utf-8') for frame in data['frames']]
+        """Save using NumPy compressed format.
+        
+        Full frames are stored as a palette plus an ``(n_frames, height,
+        width)`` glyph-index array (version 2.0), which loads without
+        pickle. Delta or interned records are stored as JSON bytes.
+        """
+        arrays = {
+            'config': json.dumps(data['config']),
+            'metadata': json.dumps(data['metadata']),
+        }
+        
+        if 'encoding' in data:
+            arrays['frames'] = [json.dumps(record).encode('utf-8') for record in data['frames']]
+            arrays['encoding'] = json.dumps(data['encoding'])
+            arrays['version'] = data['version']
+        else:
+            glyphs = encode_glyphs(data['frames'], self.config.ascii_chars)
+            arrays['glyphs'] = glyphs.indices
+            arrays['palette'] = glyphs.palette
+            arrays['version'] = '2.0'
+            if glyphs.row_lengths is not None:
+                arrays['row_lengths'] = glyphs.row_lengths
+            if glyphs.heights is not None:
+                arrays['heights'] = glyphs.heights
+            if 'colors' in data:
+                arrays['colors'] = stack_colors(data['colors'], glyphs.indices.shape[1:],
+                                                self.config.color_bits)
         
         # Save as compressed numpy archive
-        np.savez_compressed(
-            output_path,
-            frames=frames_bytes,
-            config=json.dumps(data['config']),
-            metadata=json.dumps(data['metadata']),
-            version=data['version']
-        )
+        np.savez_compressed(output_path, **arrays)
         
-    def _load_pickle(self, input_path: str) -> Dict[str, Any]:
+    def _load_pickle(self, input_path: str, compression: str,
+                     skip_frames: bool = False) -> Dict[str, Any]:
         """Load from pickle format."""
-        open_func = open
-        
-        if input_path.endswith('.gz'):
-            open_func = gzip.open
-        elif input_path.endswith('.xz'):
-            open_func = lzma.open
-        elif input_path.endswith('.bz2'):
-            open_func = bz2.open
+        with OPEN_FUNCS[compression](input_path, 'rb') as f:
+            data = pickle.load(f)
+            if 'frames' in data:
+                return data
+                
+            # Streamed layout: header, one record per frame, trailer
+            frames = []
+            while True:
+                item = pickle.load(f)
+                if isinstance(item, dict):
+                    break
+                if not skip_frames:
+                    frames.append(item)
+            return self._join_stream(data, frames, item)
             
-        with open_func(input_path, 'rb') as f:
-            return pickle.load(f)
+    def _iter_records(self, input_path: str, storage_format: str,
+                      compression: str) -> Iterator[Any]:
+        """Yield the stored frame records of a pickle or JSON-lines file in order."""
+        if storage_format == 'jsonl':
+            with OPEN_FUNCS[compression](input_path, 'rt', encoding='utf-8') as f:
+                f.readline()  # Header
+                for line in f:
+                    record = json.loads(line)
+                    if isinstance(record, dict):
+                        return
+                    yield record
+            return
             
-    def _load_json(self, input_path: str) -> Dict[str, Any]:
+        with OPEN_FUNCS[compression](input_path, 'rb') as f:
+            data = pickle.load(f)
+            if 'frames' in data:
+                yield from data['frames']
+                return
+            while True:
+                item = pickle.load(f)
+                if isinstance(item, dict):
+                    return
+                yield item
+                
+    def _load_json(self, input_path: str, compression: str) -> Dict[str, Any]:
         """Load from JSON format."""
-        open_func = open
-        mode = 'r'
-        
-        if input_path.endswith('.gz'):
-            open_func = gzip.open
-            mode = 'rt'
-        elif input_path.endswith('.xz'):
-            open_func = lzma.open
-            mode = 'rt'
-        elif input_path.endswith('.bz2'):
-            open_func = bz2.open
-            mode = 'rt'
-            
-        with open_func(input_path, mode) as f:
+        with OPEN_FUNCS[compression](input_path, 'rt', encoding='utf-8') as f:
             return json.load(f)
             
+    def _load_jsonl(self, input_path: str, compression: str) -> Dict[str, Any]:
+        """Load from JSON-lines format."""
+        with OPEN_FUNCS[compression](input_path, 'rt', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            frames = [json.loads(line) for line in f]
+        trailer = frames.pop()
+        return self._join_stream(header, frames, trailer)
+        
+    def _join_stream(self, header: Dict[str, Any], frames: List[Any],
+                     trailer: Dict[str, Any]) -> Dict[str, Any]:
+        """Assemble the data dict from a streamed header, records and trailer."""
+        data = {
+            'frames': frames,
+            'config': header['config'],
+            'metadata': trailer['metadata'],
+            'version': header['version']
+        }
+        if 'encoding' in trailer:
+            data['encoding'] = trailer['encoding']
+        return data
+        
     def _load_npz(self, input_path: str) -> Dict[str, Any]:
         """Load from NumPy format."""
-        data = np.load(input_path, allow_pickle=True)
+        with np.load(input_path) as archive:
+            if 'glyphs' in archive.files:
+                return self._load_npz_glyphs(archive)
+            if 'frames' not in archive.files:
+                return self._load_npz_stream(archive)
         
-        # Decode frames from bytes
+        # Version 1 archives hold an object array of UTF-8 encoded frames
+        data = np.load(input_path, allow_pickle=True)
         frames = [frame.decode('utf-8') for frame in data['frames']]
         
-        return {
+        result = {
             'frames': frames,
             'config': json.loads(str(data['config'])),
             'metadata': json.loads(str(data['metadata'])),
             'version': str(data['version'])
         }
         
+        if 'encoding' in data.files:
+            result['encoding'] = json.loads(str(data['encoding']))
+            result['frames'] = [json.loads(frame) for frame in frames]
+        return result
+        
+    def _load_npz_glyphs(self, archive) -> Dict[str, Any]:
+        """Load a version 2 archive; frames decode from the glyph array on demand."""
+        frames = GlyphFrames(
+            str(archive['palette']),
+            archive['glyphs'],
+            archive['row_lengths'] if 'row_lengths' in archive.files else None,
+            archive['heights'] if 'heights' in archive.files else None
+        )
+        data = {
+            'frames': frames,
+            'glyphs': frames.indices,
+            'palette': frames.palette,
+            'config': json.loads(str(archive['config'])),
+            'metadata': json.loads(str(archive['metadata'])),
+            'version': str(archive['version'])
+        }
+        if 'colors' in archive.files:
+            data['colors'] = archive['colors']
+        return data
+        
+    def _load_npz_stream(self, archive) -> Dict[str, Any]:
+        """Load an npz archive written frame by frame by NpzStreamWriter."""
+        header = {'config': json.loads(str(archive['config'])), 'version': str(archive['version'])}
+        trailer = {'metadata': json.loads(str(archive['metadata']))}
+        
+        if 'encoding' in archive.files:
+            trailer['encoding'] = json.loads(str(archive['encoding']))
+            lines = archive['record_stream'].decode('utf-8').split('\n')[:-1]
+            return self._join_stream(header, [json.loads(line) for line in lines], trailer)
+        
+        # Concatenated per-frame glyph arrays against a palette written on close
+        stream = np.frombuffer(archive['glyph_stream'], dtype='<u2')
+        shapes = archive['shapes']
+        row_lengths = archive['row_lengths'] if 'row_lengths' in archive.files else None
+        encoded = []
+        offset = row = 0
+        for height, width in shapes.tolist():
+            indices = stream[offset:offset + height * width].reshape(height, width)
+            lengths = None if row_lengths is None else row_lengths[row:row + height]
+            encoded.append((indices, lengths))
+            offset += height * width
+            row += height
+        frames = stack_frames(encoded, str(archive['palette']))
+        
+        data = self._join_stream(header, frames, trailer)
+        data['glyphs'] = frames.indices
+        data['palette'] = frames.palette
+        if 'color_stream' in archive.files:
+            data['colors'] = self._read_color_stream(archive)
+        return data
+        
+    def _read_color_stream(self, archive) -> np.ndarray:
+        """Stack the per-frame colour planes written by NpzStreamWriter."""
+        stream = np.frombuffer(archive['color_stream'], dtype=np.uint8)
+        planes = []
+        offset = 0
+        for height, width in archive['shapes'].tolist():
+            planes.append(stream[offset:offset + height * width * 3].reshape(height, width, 3))
+            offset += height * width * 3
+        shape = tuple(max((plane.shape[i] for plane in planes), default=0) for i in (0, 1))
+        return stack_colors(planes, shape, bits=8)
+        
+    def _load_container(self, input_path: str) -> Dict[str, Any]:
+        """Open a container; frames are decompressed only when indexed."""
+        records = ContainerRecords(input_path)
+        data = dict(records.info)
+        data['frames'] = records
+        return data
+        
+    def get_output_path(self, output_path: str) -> str:
+        """Return the path that save() actually writes for ``output_path``."""
+        if self.config.storage_format == 'npz':
+            return output_path if output_path.endswith('.npz') else f"{output_path}.npz"
+        if self.config.storage_format == 'jsonl' and not output_path.endswith('.jsonl'):
+            output_path = f"{output_path}.jsonl"
+        if self.config.storage_format in ('container', 'web') or self.config.compression == 'none':
+            return output_path
+        return f"{output_path}{COMPRESSION_SUFFIXES[self.config.compression]}"
+        
     def get_file_size_mb(self, file_path: str) -> float:
         """Get file size in MB."""
         return Path(file_path).stat().st_size / (1024 * 1024) 
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""Per-stage frame timing for playback (``play --stats``)."""
+import time
+from typing import Any, Callable, Dict, List
+
+# Stages of showing one frame, in order
+STAGES = ('decode', 'resize', 'compose', 'write', 'flush')
+
+# Sub-buckets per power of two; values land within 1/8 of their true size
+SUB_BUCKETS = 8
+_SUB_BITS = SUB_BUCKETS.bit_length() - 1
+_BUCKETS = SUB_BUCKETS * 64
+
+
+def _bucket(value: int) -> int:
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - _SUB_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+
+
+def _bucket_limit(bucket: int) -> int:
+    """Largest value stored in ``bucket``."""
+    if bucket < SUB_BUCKETS:
+        return bucket
+    shift = bucket // SUB_BUCKETS - 1
+    return ((bucket % SUB_BUCKETS + SUB_BUCKETS + 1) << shift) - 1
+
+
+class Histogram:
+    """Log-linear histogram of non-negative integers (nanoseconds, bytes).
+
+    Recording is a bucket increment, so it can run on every frame. Count,
+    total and maximum are exact; percentiles are accurate to one bucket.
+    """
+
+    def __init__(self):
+        self.buckets = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int):
+        self.buckets[_bucket(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, fraction: float) -> int:
+        """Upper bound of the bucket below which ``fraction`` of values fall."""
+        target = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return min(_bucket_limit(bucket), self.max)
+        return self.max
+
+    def summary(self, scale: float = 1.0) -> Dict[str, float]:
+        """Count, mean, p50/p95/p99 and max, with values divided by ``scale``."""
+        return {
+            'count': self.count,
+            'mean': self.mean / scale,
+            'p50': self.percentile(0.50) / scale,
+            'p95': self.percentile(0.95) / scale,
+            'p99': self.percentile(0.99) / scale,
+            'max': self.max / scale,
+        }
+
+
+class PlaybackStats:
+    """Timing of each playback stage, frame rate, drops and output size.
+
+    The player calls ``begin_frame`` before showing a frame, ``lap(stage)``
+    as each stage finishes (the frame cache and renderer lap their own
+    stages) and ``end_frame`` with the bytes written. Stages that did not
+    run for a frame, such as decode and resize on a cache hit, record
+    nothing, so their counts show how often they ran. Time spent paused is
+    left out of the achieved frame rate.
+    """
+
+    def __init__(self, clock: Callable[[], int] = time.perf_counter_ns):
+        self.stages = {stage: Histogram() for stage in STAGES}
+        self.frame_time = Histogram()
+        self.frame_bytes = Histogram()
+        self.frames = 0
+        self.dropped = 0
+        self.late = 0
+        self._clock = clock
+        self._active = 0
+        self._resumed = None
+        self._frame_start = 0
+        self._last_lap = 0
+
+    def start(self):
+        """Start (or resume) counting playing time."""
+        if self._resumed is None:
+            self._resumed = self._clock()
+
+    def pause(self):
+        """Stop counting playing time until ``start`` is called again."""
+        if self._resumed is not None:
+            self._active += self._clock() - self._resumed
+            self._resumed = None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent playing."""
+        running = self._clock() - self._resumed if self._resumed is not None else 0
+        return (self._active + running) / 1e9
+
+    def begin_frame(self):
+        self._frame_start = self._last_lap = self._clock()
+
+    def lap(self, stage: str):
+        """Record the time since the previous lap against ``stage``."""
+        now = self._clock()
+        self.stages[stage].record(now - self._last_lap)
+        self._last_lap = now
+
+    def end_frame(self, written: int):
+        self.frames += 1
+        self.frame_bytes.record(written)
+        self.frame_time.record(self._clock() - self._frame_start)
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-serialisable report; times are in milliseconds."""
+        elapsed = self.elapsed
+        return {
+            'frames': self.frames,
+            'elapsed': elapsed,
+            'fps': self.frames / elapsed if elapsed else 0.0,
+            'dropped': self.dropped,
+            'late': self.late,
+            'frame_ms': self.frame_time.summary(1e6),
+            'stages_ms': {stage: histogram.summary(1e6) for stage, histogram in self.stages.items()},
+            'bytes_per_frame': self.frame_bytes.summary(),
+            'bytes_total': self.frame_bytes.total,
+        }
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Render a ``PlaybackStats.summary()`` as a text table."""
+    lines: List[str] = [
+        f"Frames: {summary['frames']} in {summary['elapsed']:.2f}s "
+        f"({summary['fps']:.1f} fps), dropped {summary['dropped']}, late {summary['late']}",
+        f"{'Stage':<10} {'Count':>7} {'Mean ms':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'Max':>8}",
+    ]
+    rows = list(summary['stages_ms'].items()) + [('frame', summary['frame_ms'])]
+    for stage, stats in rows:
+        lines.append(f"{stage:<10} {stats['count']:>7} {stats['mean']:>9.3f} {stats['p50']:>8.3f} "
+                     f"{stats['p95']:>8.3f} {stats['p99']:>8.3f} {stats['max']:>8.3f}")
+    sizes = summary['bytes_per_frame']
+    lines.append(f"Bytes/frame: mean {sizes['mean']:.0f}, p95 {sizes['p95']:.0f}, "
+                 f"max {sizes['max']:.0f} ({summary['bytes_total']} total)")
+    return '\n'.join(lines)
@@ -2,9 +2,13 @@
 import os
 import sys
 import shutil
+import signal
 import subprocess
-from typing import Tuple, List
+import threading
+from typing import Callable, Tuple, List
 import textwrap
+from glyphs import frame_codes, join_rows
+from resize import FrameLayout, plan_layout, resize_frames, resize_glyph_array
 
 
 def get_terminal_size() -> Tuple[int, int]:
@@ -44,78 +48,194 @@ def get_terminal_size() -> Tuple[int, int]:
         return 80, 40
 
 
-def resize_ascii_frame(frame: str, target_width: int, target_height: int = None) -> str:
-    """Resize an ASCII frame to fit within terminal dimensions."""
-    lines = frame.strip().split('\n')
+class TerminalSizeService:
+    """Terminal size kept up to date by ``SIGWINCH`` instead of probing.
     
-    # Get current frame dimensions
-    current_height = len(lines)
-    current_width = max(len(line) for line in lines) if lines else 0
+    ``size`` is a plain attribute, so reading it every frame costs nothing.
+    The signal handler only records that a resize happened: re-reading the
+    size (which may run ``tput``) and calling subscribers could otherwise
+    re-enter locks held by the code the signal interrupted. Started with an
+    asyncio ``loop``, the resize is handled as a callback on that loop;
+    otherwise ``poll()`` handles it, and should be called once per frame.
+    Subscribers are called with the new ``(columns, rows)``. Where
+    ``SIGWINCH`` is unavailable (Windows, or ``start()`` called off the
+    main thread) the size stays as first read until ``refresh()``.
     
-    # If frame already fits, return as is
-    if current_width <= target_width and (target_height is None or current_height <= target_height):
-        return frame
+    One service is shared by every player in the process, so ``start`` and
+    ``stop`` are counted: the handler is installed by the first ``start``
+    and only restored once every ``start`` has been matched by a ``stop``.
+    """
     
-    # Handle width resizing
-    if current_width > target_width:
-        # Option 1: Truncate (simple but may lose info)
-        resized_lines = [line[:target_width] for line in lines]
+    def __init__(self):
+        self.size: Tuple[int, int] = get_terminal_size()
+        self.listening = False
+        self.pending = False
+        self._subscribers: List[Callable[[int, int], None]] = []
+        self._previous_handler = None
+        self._loop = None
+        self._starts = 0
+        self._lock = threading.Lock()
         
-        # Option 2: Scale down (better but more complex)
-        # We'll implement simple sampling for now
-        scale_factor = target_width / current_width
-        sampled_lines = []
+    def start(self, loop=None):
+        """Start listening for ``SIGWINCH`` (if possible) and re-read the size.
         
-        for line in lines:
-            if not line:
-                sampled_lines.append('')
-                continue
-                
-            # Sample characters from the line
-            sampled_chars = []
-            for i in range(target_width):
-                source_index = int(i / scale_factor)
-                if source_index < len(line):
-                    sampled_chars.append(line[source_index])
-                else:
-                    sampled_chars.append(' ')
-            sampled_lines.append(''.join(sampled_chars))
+        With ``loop``, resizes are handled on that event loop. Every call
+        must be matched by a ``stop()``.
+        """
+        self.refresh()
+        self._starts += 1
+        if self.listening or not hasattr(signal, 'SIGWINCH'):
+            return
+        try:
+            self._previous_handler = signal.getsignal(signal.SIGWINCH)
+            if loop is not None:
+                loop.add_signal_handler(signal.SIGWINCH, self._on_loop_resize)
+                self._loop = loop
+            else:
+                signal.signal(signal.SIGWINCH, self._on_resize)
+            self.listening = True
+        except (ValueError, RuntimeError):
+            # signal handlers can only be installed from the main thread
+            pass
+            
+    def stop(self):
+        """Restore the previous ``SIGWINCH`` handler once the last user stops."""
+        self._starts = max(self._starts - 1, 0)
+        if self.listening and not self._starts:
+            if self._loop is not None:
+                self._loop.remove_signal_handler(signal.SIGWINCH)
+                self._loop = None
+            signal.signal(signal.SIGWINCH, self._previous_handler or signal.SIG_DFL)
+            self.listening = False
+            
+    def subscribe(self, callback: Callable[[int, int], None]) -> Callable[[], None]:
+        """Call ``callback(columns, rows)`` on every size change.
         
-        resized_lines = sampled_lines
-    else:
-        resized_lines = lines
-    
-    # Handle height resizing if specified
-    if target_height and len(resized_lines) > target_height:
-        # Sample rows
-        scale_factor = target_height / len(resized_lines)
-        sampled_indices = [int(i / scale_factor) for i in range(target_height)]
-        resized_lines = [resized_lines[i] for i in sampled_indices if i < len(resized_lines)]
+        Returns a function that removes the subscription.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+        
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+        
+    def poll(self):
+        """Handle a resize reported since the last call, if any."""
+        if self.pending:
+            self.pending = False
+            self.refresh()
+            
+    def refresh(self):
+        """Re-read the terminal size and notify subscribers if it changed."""
+        size = get_terminal_size()
+        if size == self.size:
+            return
+        self.size = size
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(*size)
+            
+    def _on_resize(self, signum, frame):
+        # Runs inside the signal handler: record the resize and nothing else
+        self.pending = True
+        if callable(self._previous_handler):
+            self._previous_handler(signum, frame)
+            
+    def _on_loop_resize(self):
+        self.pending = False
+        self.refresh()
+        if callable(self._previous_handler):
+            self._previous_handler(signal.SIGWINCH, None)
+
+
+_size_service = None
+
+
+def terminal_size_service() -> TerminalSizeService:
+    """The process-wide terminal size service."""
+    global _size_service
+    if _size_service is None:
+        _size_service = TerminalSizeService()
+    return _size_service
+
+
+def content_rows(lines: List[str]) -> Tuple[int, int]:
+    """``(first, end)`` range of ``lines`` without the empty rows at either end.
     
-    return '\n'.join(resized_lines)
+    Only empty rows are dropped; rows of spaces are picture content, and
+    dropping them would move the picture from frame to frame.
+    """
+    first, end = 0, len(lines)
+    while first < end and not lines[first]:
+        first += 1
+    while end > first and not lines[end - 1]:
+        end -= 1
+    return first, end
 
 
-def center_frame(frame: str, terminal_width: int, terminal_height: int = None) -> str:
-    """Center an ASCII frame within terminal dimensions."""
-    lines = frame.strip().split('\n')
+def trim_frame(frame: str) -> str:
+    """``frame`` without the empty rows at either end (see ``content_rows``)."""
+    lines = frame.split('\n')
+    first, end = content_rows(lines)
+    return '\n'.join(lines[first:end])
+
+
+def frame_layout(frame: str, width: int, height: int = None, resize: bool = True,
+                 center: bool = False) -> FrameLayout:
+    """Layout ``resize_ascii_frame`` and then ``center_frame`` give ``frame``."""
+    lines = frame.split('\n')
+    first, end = content_rows(lines)
+    cols = max((len(line) for line in lines[first:end]), default=0)
+    return plan_layout(end - first, cols, width, height, resize, center, first)
+
+
+def resize_ascii_frame(frame: str, target_width: int, target_height: int = None,
+                       mode: str = 'nearest') -> str:
+    """Resize an ASCII frame to fit within terminal dimensions.
     
-    # Get frame dimensions
-    frame_width = max(len(line) for line in lines) if lines else 0
-    frame_height = len(lines)
+    ``mode`` is ``'nearest'`` (sample one character per cell) or ``'area'``
+    (average glyph density over each cell); see ``resize.py``, which also
+    resizes whole animations at once. Cells are sampled at the points of
+    ``frame_layout``.
+    """
+    frame = trim_frame(frame)
+    lines = frame.split('\n')
     
-    # Center horizontally
-    if frame_width < terminal_width:
-        padding = (terminal_width - frame_width) // 2
-        lines = [' ' * padding + line for line in lines]
+    # Get current frame dimensions
+    current_height = len(lines)
+    current_width = max(len(line) for line in lines)
     
-    # Center vertically if height is specified
-    if terminal_height and frame_height < terminal_height:
-        vertical_padding = (terminal_height - frame_height) // 2
-        lines = [''] * vertical_padding + lines + [''] * vertical_padding
+    # If frame already fits, return as is
+    if current_width <= target_width and (not target_height or current_height <= target_height):
+        return frame
     
+    if mode == 'nearest':
+        # Sampling needs no palette: index the codepoints directly
+        codes, _ = frame_codes(frame)
+        return join_rows(resize_glyph_array(codes[None], None, target_width, target_height))[0]
+    return resize_frames([frame], target_width, target_height, mode)[0]
+
+
+def pad_frame(frame: str, layout: FrameLayout) -> str:
+    """Add the centring margins of ``layout`` to a laid-out frame."""
+    lines = frame.split('\n')
+    if layout.left:
+        lines = [' ' * layout.left + line for line in lines]
+    if layout.top:
+        lines = [''] * layout.top + lines + [''] * layout.top
     return '\n'.join(lines)
 
 
+def center_frame(frame: str, terminal_width: int, terminal_height: int = None) -> str:
+    """Center an ASCII frame within terminal dimensions."""
+    layout = frame_layout(frame, terminal_width, terminal_height, resize=False, center=True)
+    return pad_frame(trim_frame(frame), layout)
+
+
 def wrap_text(text: str, width: int) -> List[str]:
     """Wrap text to fit within specified width."""
     return textwrap.wrap(text, width=width)
@@ -0,0 +1,111 @@
+"""Chunked, delta-encoded export of animations for the web.
+
+An export is a directory holding a small ``manifest.json`` and a series
+of ``chunk-NNN.json`` files, each with a precompressed ``.gz`` sibling
+that a static server can send with ``Content-Encoding: gzip``. Every
+chunk starts with a keyframe, so a page can start playing as soon as
+the manifest and the (deliberately short) first chunk have arrived and
+fetch the rest while it plays.
+"""
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+from frame_codec import encode_delta
+
+MANIFEST_NAME = 'manifest.json'
+WEB_FORMAT = 'ascii-web'
+WEB_VERSION = '1.0'
+FIRST_CHUNK_FRAMES = 8
+
+
+def _dump(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _write_with_gzip(path: Path, data: bytes) -> Dict[str, int]:
+    """Write ``data`` and a gzip sibling; return both sizes."""
+    packed = gzip.compress(data, compresslevel=9, mtime=0)
+    path.write_bytes(data)
+    path.with_name(path.name + '.gz').write_bytes(packed)
+    return {'bytes': len(data), 'gzip_bytes': len(packed)}
+
+
+def chunk_bounds(frame_count: int, chunk_frames: int,
+                 first_chunk_frames: int = FIRST_CHUNK_FRAMES) -> List[range]:
+    """Split frames into a short first chunk followed by regular chunks."""
+    bounds = []
+    start = 0
+    size = min(first_chunk_frames, chunk_frames)
+    while start < frame_count:
+        bounds.append(range(start, min(start + size, frame_count)))
+        start += size
+        size = chunk_frames
+    return bounds
+
+
+def export_web(frames: Sequence[str], output_dir: str, metadata: Dict[str, Any],
+               chunk_frames: int = 60, first_chunk_frames: int = FIRST_CHUNK_FRAMES) -> Dict[str, Any]:
+    """Write a web export of ``frames`` to ``output_dir``.
+
+    Returns a report with the gzip bytes needed for first paint (manifest
+    plus first chunk) and for the whole animation, and the raw total.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    chunks = []
+    for number, bounds in enumerate(chunk_bounds(len(frames), chunk_frames, first_chunk_frames)):
+        records, _ = encode_delta([frames[i] for i in bounds], keyframe_interval=len(bounds))
+        name = f"chunk-{number:03d}.json"
+        sizes = _write_with_gzip(output_dir / name, _dump({'start': bounds.start, 'frames': records}))
+        chunks.append({'file': name, 'start': bounds.start, 'count': len(bounds), **sizes})
+
+    manifest = {
+        'format': WEB_FORMAT,
+        'version': WEB_VERSION,
+        'metadata': metadata,
+        # A record is either a full frame string or a list of runs against
+        # the previous frame: [row, col, text] overwrites text at col,
+        # [row, text] replaces the whole row.
+        'encoding': 'delta-runs',
+        'chunks': chunks,
+    }
+    manifest_sizes = _write_with_gzip(output_dir / MANIFEST_NAME, _dump(manifest))
+
+    return {
+        'output_dir': str(output_dir),
+        'chunks': len(chunks),
+        'first_paint_bytes': manifest_sizes['gzip_bytes'] + (chunks[0]['gzip_bytes'] if chunks else 0),
+        'total_bytes': manifest_sizes['gzip_bytes'] + sum(chunk['gzip_bytes'] for chunk in chunks),
+        'raw_total_bytes': manifest_sizes['bytes'] + sum(chunk['bytes'] for chunk in chunks),
+    }
+
+
+def is_web_export(path: str) -> bool:
+    """True if ``path`` is a directory written by ``export_web``."""
+    return (Path(path) / MANIFEST_NAME).is_file()
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """Read an export's manifest."""
+    manifest = json.loads((Path(path) / MANIFEST_NAME).read_text(encoding='utf-8'))
+    if manifest.get('format') != WEB_FORMAT:
+        raise ValueError(f"Not a web export: {path}")
+    return manifest
+
+
+def load_web_records(path: str) -> Dict[str, Any]:
+    """Read every chunk's records, with keyframe positions for ``decode_frames``."""
+    manifest = read_manifest(path)
+    records = []
+    for chunk in manifest['chunks']:
+        records.extend(json.loads((Path(path) / chunk['file']).read_text(encoding='utf-8'))['frames'])
+    keyframes = [index for index, record in enumerate(records) if isinstance(record, str)]
+    return {
+        'frames': records,
+        'metadata': manifest['metadata'],
+        'config': {},
+        'version': manifest['version'],
+        'encoding': {'type': 'delta', 'keyframes': keyframes},
+    }
@@ -0,0 +1,249 @@
+"""Incremental (append-mode) writers for ASCII animation files."""
+import json
+import pickle
+import shutil
+import tempfile
+import zipfile
+import numpy as np
+from typing import Any, Dict
+from config import ASCIIConfig
+from compression import open_compressed
+from frame_codec import create_encoder
+from container import ContainerWriter
+from dictionary import read_dictionary
+from glyphs import GlyphEncoder
+from color import quantize
+
+# Version of the streamed layouts: header, one record per frame, trailer
+STREAM_VERSION = '1.2'
+
+class FrameWriter:
+    """Base class for writers that stream frames to disk one at a time.
+
+    Subclasses implement ``_write_header``, ``_write_record`` and
+    ``_write_trailer``. Only the current frame (plus the encoder's state
+    when delta encoding or interning) is held in memory; ``frame_count``, ``fps`` and
+    ``dimensions`` are written last, once the frame count is known.
+    """
+
+    def __init__(self, config: ASCIIConfig, path: str, metadata: Dict[str, Any] = None):
+        self.config = config
+        self.path = path
+        self.metadata = dict(metadata or {})
+        self.frame_count = 0
+        self.closed = False
+        self.encoder = create_encoder(config, path)
+        self._write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def append(self, frame: str, colors: np.ndarray = None):
+        """Write the next frame, and its ``(rows, cols, 3)`` RGB colour plane if given."""
+        record = self.encoder.encode(frame) if self.encoder else frame
+        self._write_record(record)
+        if colors is not None:
+            self._write_colors(colors)
+        self.frame_count += 1
+
+    def close(self):
+        """Write the metadata trailer and close the file."""
+        if self.closed:
+            return
+        self.metadata.update({
+            'frame_count': self.frame_count,
+            'fps': self.config.target_fps,
+            'dimensions': (self.config.width, self.config.height),
+        })
+        if self.encoder:
+            self.encoder.flush()
+        self._write_trailer()
+        self.closed = True
+
+    @property
+    def encoding(self) -> Dict[str, Any]:
+        """Encoding description for the trailer, or None for full frames."""
+        return self.encoder.info() if self.encoder else None
+
+    def _header(self) -> Dict[str, Any]:
+        return {'format': 'stream', 'config': self.config.__dict__, 'version': STREAM_VERSION}
+
+    def _trailer(self) -> Dict[str, Any]:
+        trailer = {'metadata': self.metadata}
+        if self.encoder:
+            trailer['encoding'] = self.encoding
+        return trailer
+
+    def _write_header(self):
+        raise NotImplementedError
+
+    def _write_record(self, record: Any):
+        raise NotImplementedError
+
+    def _write_trailer(self):
+        raise NotImplementedError
+
+    def _write_colors(self, colors: np.ndarray):
+        raise ValueError("colour planes are only stored by the npz format")
+
+
+class PickleStreamWriter(FrameWriter):
+    """Pickle a header dict, then each frame record, then a trailer dict."""
+
+    def _write_header(self):
+        self._file = open_compressed(self.path, 'wb', self.config.compression,
+                                     self.config.compression_workers)
+        pickle.dump(self._header(), self._file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _write_record(self, record: Any):
+        pickle.dump(record, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _write_trailer(self):
+        pickle.dump(self._trailer(), self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.close()
+
+
+class JSONLinesWriter(FrameWriter):
+    """Write a header object, one JSON value per frame, then a trailer object."""
+
+    def _write_header(self):
+        self._file = open_compressed(self.path, 'wt', self.config.compression,
+                                     self.config.compression_workers)
+        self._write_line(self._header())
+
+    def _write_record(self, record: Any):
+        self._write_line(record)
+
+    def _write_trailer(self):
+        self._write_line(self._trailer())
+        self._file.close()
+
+    def _write_line(self, value: Any):
+        self._file.write(json.dumps(value, ensure_ascii=False))
+        self._file.write('\n')
+
+
+class NpzStreamWriter(FrameWriter):
+    """Stream frames into a single raw member of an npz archive.
+
+    Full frames are appended to ``glyph_stream`` as little-endian uint16
+    indices into a palette that grows as glyphs appear; their shapes, any
+    ragged row lengths and the palette are written on close. Delta or
+    interned records are appended to ``record_stream`` as JSON lines.
+    Keeping one deflate stream lets the compressor see across frames, and
+    the archive loads without ``allow_pickle``. Colour planes, quantized
+    to ``color_bits``, are spooled to a temporary file (a zip archive takes
+    one member at a time) and copied into ``color_stream`` on close.
+    """
+
+    def _write_header(self):
+        self._zip = zipfile.ZipFile(self.path, 'w', compression=zipfile.ZIP_DEFLATED)
+        self._write_array('config', np.array(json.dumps(self.config.__dict__)))
+        self._write_array('version', np.array(STREAM_VERSION))
+        self._glyphs = GlyphEncoder(self.config.ascii_chars)
+        self._shapes = []
+        self._row_lengths = []
+        self._ragged = False
+        self._colors = None
+        self._color_count = 0
+        name = 'record_stream' if self.encoder else 'glyph_stream'
+        self._stream = self._zip.open(name, 'w', force_zip64=True)
+
+    def _write_record(self, record: Any):
+        if self.encoder:
+            self._stream.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+            return
+        indices, row_lengths = self._glyphs.encode(record)
+        self._stream.write(indices.astype('<u2').tobytes())
+        self._shapes.append(indices.shape)
+        self._ragged = self._ragged or row_lengths is not None
+        self._row_lengths.append(np.full(indices.shape[0], indices.shape[1], dtype=np.uint16)
+                                 if row_lengths is None else row_lengths)
+
+    def _write_colors(self, colors: np.ndarray):
+        if self.encoder:
+            raise ValueError("colour planes need full frames (no keyframe_interval or row_store)")
+        if self._colors is None:
+            self._colors = tempfile.TemporaryFile()
+        self._pad_colors(len(self._shapes) - 1)
+        rows, cols = self._shapes[-1]
+        plane = np.zeros((rows, cols, 3), dtype=np.uint8)
+        colors = quantize(colors, self.config.color_bits)[:rows, :cols]
+        plane[:colors.shape[0], :colors.shape[1]] = colors
+        self._colors.write(plane.tobytes())
+        self._color_count += 1
+
+    def _pad_colors(self, count: int):
+        """Give frames appended without a colour plane a black one."""
+        for rows, cols in self._shapes[self._color_count:count]:
+            self._colors.write(bytes(rows * cols * 3))
+        self._color_count = max(self._color_count, count)
+
+    def _write_trailer(self):
+        self._stream.close()
+        if self._colors is not None:
+            self._pad_colors(len(self._shapes))
+            self._colors.seek(0)
+            with self._zip.open('color_stream', 'w', force_zip64=True) as member:
+                shutil.copyfileobj(self._colors, member)
+            self._colors.close()
+        self._write_array('metadata', np.array(json.dumps(self.metadata)))
+        if self.encoder:
+            self._write_array('encoding', np.array(json.dumps(self.encoding)))
+        else:
+            self._write_array('palette', np.array(self._glyphs.palette))
+            self._write_array('shapes', np.array(self._shapes, dtype=np.uint16).reshape(-1, 2))
+            if self._ragged:
+                self._write_array('row_lengths', np.concatenate(self._row_lengths))
+        self._zip.close()
+
+    def _write_array(self, name: str, array: np.ndarray):
+        with self._zip.open(f"{name}.npy", 'w', force_zip64=True) as member:
+            np.lib.format.write_array(member, array, allow_pickle=False)
+
+
+class ContainerStreamWriter(FrameWriter):
+    """Stream frames into a seekable container file."""
+
+    def _write_header(self):
+        zdict = None
+        if self.config.compression_dict:
+            if self.config.compression != 'gzip':
+                raise ValueError("compression_dict requires gzip (zlib) compression")
+            zdict = read_dictionary(self.config.compression_dict)
+        self._writer = ContainerWriter(self.path, self.config.compression, self.encoding, zdict)
+
+    def _write_record(self, record: Any):
+        self._writer.append(record)
+
+    def _write_trailer(self):
+        info = {'config': self.config.__dict__, 'metadata': self.metadata, 'version': '1.0'}
+        if self.encoder:
+            info['encoding'] = self.encoding
+            info['version'] = '1.1'
+        self._writer.close(info)
+
+
+class BufferedWriter(FrameWriter):
+    """Fallback for whole-document formats (JSON): collect frames, save on close."""
+
+    def __init__(self, config: ASCIIConfig, path: str, metadata: Dict[str, Any] = None,
+                 storage=None, output_path: str = None):
+        self.storage = storage
+        self.output_path = output_path
+        self.frames = []
+        super().__init__(config, path, metadata)
+        # save() applies delta encoding itself
+        self.encoder = None
+
+    def _write_header(self):
+        pass
+
+    def _write_record(self, record: Any):
+        self.frames.append(record)
+
+    def _write_trailer(self):
+        self.storage.save(self.frames, self.output_path, self.metadata)
@@ -44,14 +44,19 @@ def test_package():
         config = ASCIIConfig()
         storage = ASCIIStorage(config)
         test_file = os.path.join(animations_dir, animation_files[0])
-        data = storage.load(test_file)
+        info = storage.load_info(test_file)
         
-        required_keys = ['frames', 'config', 'metadata']
+        required_keys = ['config', 'metadata']
         for key in required_keys:
-            if key not in data:
+            if key not in info:
                 print(f"   ❌ Missing key in animation data: {key}")
                 return False
         
+        data = storage.load(test_file)
+        if len(data['frames']) != info['metadata']['frame_count']:
+            print("   ❌ Frame count does not match metadata")
+            return False
+        
         print(f"   ✅ Successfully loaded animation with {len(data['frames'])} frames")
         
     except Exception as e:
@@ -81,6 +86,892 @@ def test_package():
     
     return True
 
+def test_delta_roundtrip():
+    """Delta-encoded frames rebuild exactly, including random seeks."""
+    sys.path.append('src')
+    from frame_codec import encode_delta, decode_frames
+    
+    rows = [' ' * 40 for _ in range(10)]
+    frames = []
+    for i in range(50):
+        rows[i % 10] = rows[i % 10][:i % 40] + '#' + rows[i % 10][i % 40 + 1:]
+        frames.append('\n'.join(rows))
+    
+    records, encoding = encode_delta(frames, keyframe_interval=8)
+    decoded = decode_frames(records, encoding)
+    
+    assert encoding['keyframes'][0] == 0
+    assert any(not isinstance(record, str) for record in records)
+    assert list(decoded) == frames
+    for index in (37, 3, 49, 0, 21):
+        assert decoded[index] == frames[index]
+
+
+
+def test_container_roundtrip(tmp_path):
+    """Container files load lazily and index frames directly."""
+    sys.path.append('src')
+    from config import ASCIIConfig
+    from storage import ASCIIStorage
+    
+    frames = [f"frame {i}\n" + '\u2800' * 20 for i in range(40)]
+    for interval in (0, 10):
+        config = ASCIIConfig(storage_format='container', keyframe_interval=interval)
+        output = str(tmp_path / f"anim{interval}.asca")
+        ASCIIStorage(config).save(frames, output)
+        
+        data = ASCIIStorage(ASCIIConfig()).load(output)
+        assert data['metadata']['frame_count'] == len(frames)
+        assert len(data['frames']) == len(frames)
+        assert data['frames'][33] == frames[33]
+        assert data['frames'][-1] == frames[-1]
+        assert list(data['frames']) == frames
+
+
+
+def test_stream_writers(tmp_path):
+    """Frames appended to a writer load back with metadata written last."""
+    sys.path.append('src')
+    from config import ASCIIConfig
+    from storage import ASCIIStorage
+    
+    frames = [f"{i:03d}" + ' .:-=+*#%@' * 3 for i in range(25)]
+    for storage_format in ('pickle', 'jsonl', 'npz', 'container'):
+        config = ASCIIConfig(storage_format=storage_format, keyframe_interval=5)
+        storage = ASCIIStorage(config)
+        with storage.open_writer(str(tmp_path / storage_format)) as writer:
+            for frame in frames:
+                writer.append(frame)
+        
+        data = ASCIIStorage(ASCIIConfig()).load(storage.get_output_path(str(tmp_path / storage_format)))
+        assert data['metadata']['frame_count'] == len(frames)
+        assert list(data['frames']) == frames
+
+
+def test_parallel_compression(tmp_path):
+    """Block-parallel saves produce multi-member files the loaders accept."""
+    sys.path.append('src')
+    from config import ASCIIConfig
+    from storage import ASCIIStorage
+    from compression import open_compressed
+
+    frames = [f"{i:04d}" + ' .:-=+*#%@' * 50 for i in range(400)]
+    for compression in ('gzip', 'lzma', 'bz2'):
+        for storage_format in ('pickle', 'json', 'jsonl'):
+            config = ASCIIConfig(storage_format=storage_format, compression=compression,
+                                 compression_workers=4)
+            output = str(tmp_path / f"{compression}.{storage_format}")
+            ASCIIStorage(config).save(frames, output)
+            data = ASCIIStorage(ASCIIConfig()).load(ASCIIStorage(config).get_output_path(output))
+            assert list(data['frames']) == frames
+
+    # Small blocks force several members
+    with open_compressed(str(tmp_path / 'blocks.gz'), 'wb', 'gzip', 2, block_size=64) as f:
+        f.write(b'x' * 1000)
+    assert (tmp_path / 'blocks.gz').read_bytes().count(b'\x1f\x8b') >= 16
+
+
+def test_transcode_library(tmp_path):
+    """Transcoding reports a measured, verified output per file and format."""
+    sys.path.append('src')
+    from config import ASCIIConfig
+    from storage import ASCIIStorage
+    from transcode import transcode_library
+
+    frames = [f"{i:03d}" + ' .:-=+*#%@' * 3 for i in range(20)]
+    source = str(tmp_path / 'source.pkl')
+    ASCIIStorage(ASCIIConfig()).save(frames, source)
+
+    results = transcode_library([source + '.gz'], str(tmp_path / 'out'), ['npz', 'container'],
+                                'gzip', workers=1)
+    assert [result['format'] for result in results] == ['npz', 'container']
+    for result in results:
+        assert result['size'] > 0 and result['first_frame_time'] > 0
+        assert list(ASCIIStorage(ASCIIConfig()).load(result['output'])['frames']) == frames
+
+
+def test_web_export(tmp_path):
+    """Web exports chunk frames behind a manifest and load back exactly."""
+    sys.path.append('src')
+    from config import ASCIIConfig
+    from storage import ASCIIStorage
+    from web_export import read_manifest
+
+    rows = ['.' * 30 for _ in range(6)]
+    frames = []
+    for i in range(100):
+        rows[i % 6] = rows[i % 6][:i % 30] + '#' + rows[i % 6][i % 30 + 1:]
+        frames.append('\n'.join(rows))
+
+    output = str(tmp_path / 'web')
+    report = ASCIIStorage(ASCIIConfig(web_chunk_frames=40)).export_web(frames, output)
+    manifest = read_manifest(output)
+    assert [chunk['count'] for chunk in manifest['chunks']] == [8, 40, 40, 12]
+    assert all((tmp_path / 'web' / (chunk['file'] + '.gz')).exists() for chunk in manifest['chunks'])
+    assert report['first_paint_bytes'] < report['total_bytes']
+
+    data = ASCIIStorage(ASCIIConfig()).load(output)
+    assert list(data['frames']) == frames
+    assert ASCIIStorage(ASCIIConfig()).load_info(output)['format'] == 'web'
+
+
+def _replay(output, height=12, width=40):
+    """Apply cursor moves, line clears and text from a renderer to a screen grid."""
+    import re
+    screen = [[' '] * width for _ in range(height)]
+    row = col = 0
+    for escape, text in re.findall(r'(\x1b\[[0-9;]*[A-Za-z])|([^\x1b]+)', output):
+        if text:
+            for char in text:
+                screen[row][col] = char
+                col += 1
+        elif escape == '\x1b[2J':
+            screen = [[' '] * width for _ in range(height)]
+        elif escape == '\x1b[K':
+            screen[row][col:] = [' '] * (width - col)
+        elif escape.endswith('H'):
+            row, col = (int(n) - 1 for n in escape[2:-1].split(';'))
+    return [''.join(line).rstrip() for line in screen]
+
+
+def test_diff_renderer():
+    """The diff renderer leaves the same screen as a full redraw, in fewer bytes."""
+    import io
+    sys.path.append('src')
+    from renderer import create_renderer
+
+    rows = ['.' * 30 for _ in range(8)]
+    frames = []
+    for i in range(40):
+        rows[i % 8] = rows[i % 8][:i % 30] + '#' + rows[i % 8][i % 30 + 1:]
+        frames.append('\n'.join(rows[:8 - (i == 20)]))
+
+    outputs = {mode: io.StringIO() for mode in ('full', 'diff')}
+    renderers = {mode: create_renderer(mode, out) for mode, out in outputs.items()}
+    for i, frame in enumerate(frames):
+        for renderer in renderers.values():
+            renderer.render(frame, f"frame {i}", 10)
+        assert _replay(outputs['diff'].getvalue()) == _replay(outputs['full'].getvalue())
+    assert renderers['diff'].bytes_written * 5 < renderers['full'].bytes_written
+
+    # Sizes are UTF-8 bytes, so three per Braille glyph
+    out = io.StringIO()
+    renderer = create_renderer('full', out)
+    written = renderer.render('\u2801\u2802\n\u28ff.', 'ok', 3)
+    assert written == renderer.bytes_written == len(out.getvalue()) + 6
+
+
+def test_frame_clock():
+    """Frames are paced by absolute deadlines and dropped when behind."""
+    sys.path.append('src')
+    from pacing import FrameClock
+
+    now = [0.0]
+    clock = FrameClock(10, clock=lambda: now[0], sleep=lambda s: now.__setitem__(0, now[0] + s))
+    assert clock.wait_for(0) == 0
+    now[0] += 0.05  # render time is absorbed by the wait
+    assert clock.wait_for(1) == 1 and now[0] == 0.1
+    now[0] += 0.25  # a slow frame: slots 2 and 3 have passed
+    assert clock.wait_for(2) == 3
+    assert (clock.dropped, clock.late) == (1, 1)
+
+    clock.set_speed(2.0, 4)
+    assert clock.wait_for(4) == 4
+    assert clock.wait_for(5) == 5 and abs(now[0] - 0.4) < 1e-9
+
+
+def test_resized_frame_cache():
+    """Resized frames are prerendered per layout and evicted least recently used."""
+    import time
+    sys.path.append('src')
+    from frame_cache import ResizedFrameCache
+    from terminal_utils import resize_ascii_frame
+
+    frames = ['\n'.join(f"{i:03d}" + '#' * 57 for _ in range(30)) for i in range(50)]
+    cache = ResizedFrameCache(frames, max_sizes=2)
+    assert cache.get(10, 20, 10) == resize_ascii_frame(frames[10], 20, 10)
+
+    deadline = time.time() + 5
+    while None in cache._layouts[(20, 10, True, False)]:
+        assert time.time() < deadline
+        time.sleep(0.01)
+    misses = cache.misses
+    assert [cache.get(i, 20, 10) for i in range(50)] == [resize_ascii_frame(f, 20, 10) for f in frames]
+    assert cache.misses == misses
+
+    cache.prerender = False
+    cache.get(0, 30, 12)
+    cache.get(0, 20, 10)
+    cache.get(0, 40, 20)
+    assert list(cache._layouts) == [(20, 10, True, False), (40, 20, True, False)]
+    cache.close()
+
+
+def test_cache_formats_agree(tmp_path):
+    """An animation is laid out the same from npz glyph arrays as from a pickle."""
+    sys.path.append('src')
+    from config import ASCIIConfig
+    from storage import ASCIIStorage
+    from frame_cache import ResizedFrameCache
+
+    frames = ['\n' * (i % 3) + '\n'.join('#.' * (i + row) for row in range(12)) + '\n' * (i % 2)
+              for i in range(8)] + ['', 'x', ' \n\nab  ']
+    loaded = []
+    for storage_format in ('npz', 'pickle'):
+        storage = ASCIIStorage(ASCIIConfig(storage_format=storage_format))
+        storage.save(frames, str(tmp_path / storage_format))
+        loaded.append(storage.load(storage.get_output_path(str(tmp_path / storage_format)))['frames'])
+    assert type(loaded[0]).__name__ == 'GlyphFrames'
+    for mode in ('nearest', 'area'):
+        glyphs, strings = (ResizedFrameCache(source, max_sizes=8, prerender=False, mode=mode) for source in loaded)
+        for key in [(6, 5, True, False), (40, 30, True, False), (10, 20, True, True), (30, 8, True, True)]:
+            for index in range(len(frames)):
+                (glyph_frame, glyph_layout), (frame, layout) = (glyphs.get_with_layout(index, *key),
+                                                                strings.get_with_layout(index, *key))
+                assert glyph_layout == layout
+                # Area mode may pick from the whole animation's palette, but never moves a cell
+                if mode == 'nearest':
+                    assert glyph_frame == frame
+                assert list(map(len, glyph_frame.split('\n'))) == list(map(len, frame.split('\n')))
+
+
+def test_resize_engine():
+    """Whole animations resize in one call; area mode keeps average density."""
+    sys.path.append('src')
+    from resize import resize_frames
+    from terminal_utils import resize_ascii_frame
+
+    ramp = ' .:-=+*#%@'
+    frames = ['\n'.join(''.join(ramp[1 + (r * c + i) % 9] for c in range(64)) for r in range(32))
+              for i in range(12)]
+    resized = resize_frames(frames, 20, 10, ramp=ramp)
+    assert resized.indices.shape == (12, 10, 20)
+    assert resized.decode() == [resize_ascii_frame(frame, 20, 10) for frame in frames]
+
+    # Alternating full and empty columns average to a mid-ramp glyph
+    stripes = '\n'.join('@ ' * 8 for _ in range(4))
+    assert set(resize_frames([stripes], 8, 4, mode='area', ramp=ramp)[0].replace('\n', '')) <= {'=', '+'}
+    assert set(resize_frames([stripes], 8, 4, ramp=ramp)[0].replace('\n', '')) == {'@'}
+
+
+def test_terminal_size_service(monkeypatch):
+    """SIGWINCH is only recorded in the handler; the size is read outside it."""
+    import asyncio
+    import signal
+    sys.path.append('src')
+    import terminal_utils
+
+    sizes = iter([(80, 24), (80, 24), (120, 40), (120, 40), (100, 30)])
+    monkeypatch.setattr(terminal_utils, 'get_terminal_size', lambda: next(sizes))
+    service = terminal_utils.TerminalSizeService()
+    changes = []
+    unsubscribe = service.subscribe(lambda cols, rows: changes.append((cols, rows)))
+    service.start()
+    try:
+        assert service.size == (80, 24) and not changes
+        if service.listening:
+            os.kill(os.getpid(), signal.SIGWINCH)
+            assert service.pending and service.size == (80, 24)
+            service.poll()
+        else:
+            service.refresh()
+        assert service.size == (120, 40)
+        assert changes == [(120, 40)]
+    finally:
+        service.stop()
+
+    # On an event loop the resize is handled as a loop callback
+    async def resize_on_loop():
+        service.start(asyncio.get_running_loop())
+        try:
+            assert changes == [(120, 40)]
+            if service.listening:
+                os.kill(os.getpid(), signal.SIGWINCH)
+                await asyncio.sleep(0.05)
+            else:
+                service.refresh()
+        finally:
+            service.stop()
+    asyncio.run(resize_on_loop())
+    unsubscribe()
+    assert changes == [(120, 40), (100, 30)]
+
+    # Players share the service: the handler stays until the last one stops
+    monkeypatch.setattr(terminal_utils, 'get_terminal_size', lambda: (100, 30))
+    service.start()
+    service.start()
+    listening = service.listening
+    service.stop()
+    assert service.listening == listening
+    if listening:
+        assert signal.getsignal(signal.SIGWINCH) == service._on_resize
+    service.stop()
+    assert not service.listening
+
+
+def test_async_player_controls():
+    """Keys read on the event loop pause, seek and quit playback."""
+    import asyncio
+    import io
+    sys.path.append('src')
+    from config import ASCIIConfig
+    from player import ASCIIPlayer
+
+    frames = [f"frame {i}" for i in range(1000)]
+    player = ASCIIPlayer(ASCIIConfig(loop=True))
+    player.renderer.out = io.StringIO()
+    read_fd, write_fd = os.pipe()
+
+    async def drive():
+        playback = asyncio.ensure_future(player.play_async(frames, 100, input_fd=read_fd))
+        await asyncio.sleep(0.1)
+        os.write(write_fd, b' ')
+        await asyncio.sleep(0.05)
+        paused_at = player._shown_frame
+        os.write(write_fd, b'\x1b[')
+        await asyncio.sleep(0.05)
+        os.write(write_fd, b'C')
+        await asyncio.sleep(0.05)
+        assert not player.is_playing and player._shown_frame == paused_at + 5
+        assert not player.center_content  # The split sequence's 'C' is not a key
+        assert f"[Frame {paused_at + 6}/1000] [PAUSED]" in player.renderer.out.getvalue()
+        os.write(write_fd, b'q')
+        await asyncio.wait_for(playback, 1)
+
+    try:
+        asyncio.run(drive())
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+    assert not player.running
+
+
+def test_prefetched_frames(tmp_path):
+    """Streamed files decode ahead into a bounded buffer and restart on loop."""
+    sys.path.append('src')
+    from config import ASCIIConfig
+    from storage import ASCIIStorage
+    from prefetch import PrefetchedFrames, KEEP_BEHIND
+
+    frames = [f"frame {i}\n" + '#' * (i % 7) for i in range(200)]
+    starts = []
+
+    def factory():
+        starts.append(1)
+        return iter(frames)
+
+    prefetched = PrefetchedFrames(factory, len(frames), capacity=16)
+    for i in range(100):
+        assert prefetched[i] == frames[i]
+        assert len(prefetched._buffer) <= 16 + KEEP_BEHIND + 1
+    assert prefetched[0] == frames[0] and len(starts) == 2
+    assert prefetched[150] == frames[150] and len(starts) == 2
+    prefetched.close()
+
+    storage = ASCIIStorage(ASCIIConfig(storage_format='jsonl', keyframe_interval=10))
+    with storage.open_writer(str(tmp_path / "stream")) as writer:
+        for frame in frames:
+            writer.append(frame)
+    stream = storage.open_frames(storage.get_output_path(str(tmp_path / "stream")))
+    assert isinstance(stream, PrefetchedFrames)
+    assert list(stream) == frames
+    stream.close()
+    
+    # A looping streamed pickle is only resized on its first pass
+    from player import ASCIIPlayer
+    config = ASCIIConfig(storage_format='pickle')
+    with ASCIIStorage(config).open_writer(str(tmp_path / "loop")) as writer:
+        for frame in frames:
+            writer.append(frame)
+    stream = ASCIIStorage(config).open_frames(ASCIIStorage(config).get_output_path(str(tmp_path / "loop")))
+    cache = ASCIIPlayer(config)._create_frame_cache(stream)
+    first = [cache.get(i, 4, 10) for i in range(len(frames))]
+    misses = cache.misses
+    assert [cache.get(i, 4, 10) for i in range(len(frames))] == first and cache.misses == misses == len(frames)
+    stream.close()
+
+
+def test_playback_stats():
+    """Stage timings land in histograms; paused time is left out of fps."""
+    import io
+    sys.path.append('src')
+    from renderer import create_renderer
+    from telemetry import Histogram, PlaybackStats, format_summary
+
+    histogram = Histogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+    assert histogram.count == 1000 and histogram.max == 1000
+    assert 500 <= histogram.percentile(0.5) <= 500 * 9 // 8
+    assert 950 <= histogram.percentile(0.95) <= 1000
+
+    now = [0]
+    stats = PlaybackStats(clock=lambda: now[0])
+    renderer = create_renderer('full', io.StringIO())
+    renderer.stats = stats
+    stats.start()
+    for _ in range(10):
+        stats.begin_frame()
+        now[0] += 2_000_000
+        stats.lap('resize')
+        stats.end_frame(renderer.render("ab\ncd", "status", 3))
+        now[0] += 98_000_000
+    stats.pause()
+    now[0] += 5_000_000_000
+
+    report = stats.summary()
+    assert report['frames'] == 10 and report['fps'] == 10.0
+    assert report['stages_ms']['resize']['mean'] == 2.0
+    assert report['stages_ms']['decode']['count'] == 0
+    assert report['stages_ms']['flush']['count'] == 10
+    assert report['bytes_total'] == renderer.bytes_written
+    assert 'fps' in format_summary(report)
+
+
+def test_bench(tmp_path):
+    """The benchmark renders every frame and flags regressions against a baseline."""
+    sys.path.append('src')
+    from config import ASCIIConfig
+    from storage import ASCIIStorage
+    from bench import bench_library, compare_baseline, save_baseline, load_baseline
+
+    frames = ['\n'.join(f"{i:03d}" + ' .:-=+*#%@' * 9 for _ in range(30)) for i in range(20)]
+    storage = ASCIIStorage(ASCIIConfig())
+    storage.save(frames, str(tmp_path / "anim.pkl"))
+    report = bench_library([storage.get_output_path(str(tmp_path / "anim.pkl"))], size=(40, 12))
+    assert [(r['renderer'], r['resize']) for r in report['results']] == [
+        ('full', False), ('full', True), ('diff', False), ('diff', True)]
+    full, resized, diff = report['results'][:3]
+    assert full['frames'] == 20 and full['fps'] > 0 and full['cpu_ms_per_frame'] > 0
+    assert resized['bytes_per_frame'] < full['bytes_per_frame']
+    assert diff['bytes_per_frame'] < full['bytes_per_frame']
+
+    save_baseline(report, str(tmp_path / "baseline.json"))
+    baseline = load_baseline(str(tmp_path / "baseline.json"))
+    assert not any(change['regression'] for change in compare_baseline(baseline, baseline))
+    baseline['results'][0]['fps'] *= 2
+    assert [change['regression'] for change in compare_baseline(report, baseline)] == [True, False, False, False]
+
+
+def test_broadcast_server():
+    """Clients are grouped by reported size; slow clients drop frames and resync."""
+    import asyncio
+    sys.path.append('src')
+    from broadcast import BroadcastServer, parse_telnet, IAC, SB, SE, NAWS
+
+    naws = bytes([IAC, SB, NAWS, 0, 40, 0, 12, IAC, SE])
+    assert parse_telnet(b'a' + naws + b'q' + bytes([IAC, 253])) == (b'aq', (40, 12), bytes([IAC, 253]))
+
+    frames = ['\n'.join(f"{i:03d}" + '#' * 97 for _ in range(50)) for i in range(30)]
+    server = BroadcastServer(frames, 200)
+
+    async def drive():
+        await server.start()
+        connections = [await asyncio.open_connection('127.0.0.1', server.port) for _ in range(3)]
+        connections[0][1].write(naws)
+        await asyncio.sleep(0.2)
+        assert sorted(len(group.clients) for group in server.groups.values()) == [1, 2]
+        small = await connections[0][0].read(65536)
+        assert b'\033[2J' in small and (40, 9, True, False) in server.frame_cache._layouts
+
+        slow = server.groups[(80, 24)].clients[0]
+        slow.transport.get_write_buffer_size = lambda: server.max_buffered + 1
+        await asyncio.sleep(0.05)
+        assert slow.dropped > 0 and not slow.synced
+        dropped = server.dropped
+        connections[1][1].write(b'q')
+        await asyncio.sleep(0.05)
+        assert len(server.clients) == 2
+        await server.stop()
+        return dropped
+
+    assert asyncio.run(drive()) > 0
+    assert server.frames_sent > 0
+
+    # Sizes are clamped and capped; a group's frames go when its last client leaves
+    def naws_for(cols, rows):
+        return bytes([IAC, SB, NAWS, cols >> 8, cols & 255, rows >> 8, rows & 255, IAC, SE])
+    capped = BroadcastServer(frames, 200, max_groups=2)
+
+    async def drive_capped():
+        await capped.start()
+        connections = [await asyncio.open_connection('127.0.0.1', capped.port) for _ in range(4)]
+        for (_, writer), size in zip(connections[1:], [(40, 12), (65535, 65535), (30, 10)]):
+            writer.write(naws_for(*size))
+            await asyncio.sleep(0.1)
+        assert {size: len(group.clients) for size, group in capped.groups.items()} == {(80, 24): 2, (40, 12): 2}
+        assert len(capped.frame_cache._layouts) <= 2
+        for index in (1, 3):
+            connections[index][1].write(b'q')
+        await asyncio.sleep(0.1)
+        assert list(capped.groups) == [(80, 24)]
+        assert list(capped.frame_cache._layouts) == [(80, 21, True, False)]
+        await capped.stop()
+
+    asyncio.run(drive_capped())
+
+
+def test_interned_library(tmp_path):
+    """Animations sharing a row store store each distinct row once."""
+    sys.path.append('src')
+    from config import ASCIIConfig
+    from storage import ASCIIStorage
+    from interning import open_store
+    
+    sky = '~' * 30
+    first = [f"{sky}\n{'.' * i:<30}" for i in range(12)]
+    second = [f"{sky}\n{'.' * i:<30}" for i in range(12, 0, -1)] + first[:3]
+    store_path = str(tmp_path / 'rows.store')
+    config = ASCIIConfig(row_store=store_path)
+    
+    for name, frames in (('first.pkl', first), ('second.pkl', second)):
+        ASCIIStorage(config).save(frames, str(tmp_path / name))
+    
+    # One sky row plus the 13 distinct dotted rows
+    assert len(open_store(store_path)) == 14
+    for name, frames in (('first.pkl.gz', first), ('second.pkl.gz', second)):
+        data = ASCIIStorage(ASCIIConfig()).load(str(tmp_path / name))
+        assert list(data['frames']) == frames
+        assert set(data['encoding']) == {'type', 'store', 'store_rows'}
+    
+    # Streamed, with repeated frames referencing their first record
+    streamed = ASCIIStorage(ASCIIConfig(row_store=store_path, storage_format='jsonl', compression='none'))
+    with streamed.open_writer(str(tmp_path / 'third')) as writer:
+        for frame in second + second:
+            writer.append(frame)
+    data = ASCIIStorage(ASCIIConfig()).load(streamed.get_output_path(str(tmp_path / 'third')))
+    assert list(data['frames']) == second + second
+    assert data['frames']._records[len(second)] == 0
+    
+    # A second writer waits for the first to flush, then continues its ids
+    import threading
+    from interning import RowStore
+    one, two = RowStore(store_path), RowStore(store_path)
+    assert one.intern('new in one') == 14
+    ids = []
+    waiting = threading.Thread(target=lambda: ids.extend([two.intern('new in two'), two.intern('new in one')]))
+    waiting.start()
+    waiting.join(0.2)
+    assert not ids
+    one.flush()
+    waiting.join(5)
+    two.flush()
+    assert ids == [15, 14] and RowStore(store_path).rows[14:] == ['new in one', 'new in two']
+
+
+def test_dictionary_container(tmp_path):
+    """Containers compressed with a trained dictionary find it by header id."""
+    sys.path.append('src')
+    from config import ASCIIConfig
+    from storage import ASCIIStorage
+    from dictionary import train_dictionary, save_dictionary
+    
+    frames = [(' .:-=+*#%@' * 4 + '\n') * 6 + f"{i:04d}" for i in range(30)]
+    dict_path = save_dictionary(train_dictionary([frames], size=1024), str(tmp_path))
+    
+    config = ASCIIConfig(storage_format='container', compression_dict=str(dict_path))
+    ASCIIStorage(config).save(frames, str(tmp_path / 'anim.asca'))
+    
+    data = ASCIIStorage(ASCIIConfig()).load(str(tmp_path / 'anim.asca'))
+    assert data['frames'].dictionary_id == dict_path.stem
+    assert list(data['frames']) == frames
+    
+    # A repeated row is kept even when single-use rows score higher
+    zdict = train_dictionary([['ABCDEFGHIJKLMNOPQRSTUVWXYZ\n01', '01']])
+    assert b'01\n' in zdict
+    
+    try:
+        ASCIIStorage(ASCIIConfig(storage_format='container', compression='bz2',
+                                 compression_dict=str(dict_path))).save(frames, str(tmp_path / 'bz2.asca'))
+        assert False, "a zlib dictionary must not be combined with bz2"
+    except ValueError:
+        pass
+
+
+
+def test_format_sniffing(tmp_path):
+    """Formats are detected from content, whatever the file is called."""
+    sys.path.append('src')
+    from config import ASCIIConfig
+    from storage import ASCIIStorage, sniff_format
+    
+    frames = ['ab\ncd', 'ef\ngh']
+    cases = [('pickle', 'gzip'), ('json', 'bz2'), ('jsonl', 'lzma'), ('jsonl', 'none'), ('npz', 'none'),
+             ('container', 'gzip')]
+    for storage_format, compression in cases:
+        storage = ASCIIStorage(ASCIIConfig(storage_format=storage_format, compression=compression))
+        written = storage.get_output_path(str(tmp_path / storage_format))
+        storage.save(frames, str(tmp_path / storage_format))
+        renamed = tmp_path / f"{storage_format}.misnamed"
+        os.rename(written, renamed)
+        
+        detected = sniff_format(str(renamed))
+        assert detected[0] == storage_format
+        info = ASCIIStorage(ASCIIConfig()).load_info(str(renamed))
+        assert info['metadata']['frame_count'] == 2 and 'frames' not in info
+        assert list(ASCIIStorage(ASCIIConfig()).load(str(renamed))['frames']) == frames
+    
+    # The trailer of an uncompressed JSON-lines file is read from the end
+    from storage import read_last_line
+    path = tmp_path / 'lines'
+    path.write_bytes(b'{"a": 1}\n' + b'[1]\n' * 5000 + b'{"b": 2}\n')
+    assert read_last_line(str(path), chunk_size=7) == b'{"b": 2}\n'
+    path.write_bytes(b'{"only": 1}')
+    assert read_last_line(str(path)) == b'{"only": 1}'
+
+
+
+def test_glyph_npz(tmp_path):
+    """npz v2 stores a palette plus glyph indices and decodes exactly."""
+    sys.path.append('src')
+    import numpy as np
+    from config import ASCIIConfig
+    from storage import ASCIIStorage
+    
+    frames = ['\u2801\u2802 \n #%@', ' .:-\n=+*#', 'ab\ncde\nf']
+    for streamed in (False, True):
+        storage = ASCIIStorage(ASCIIConfig(storage_format='npz'))
+        output = str(tmp_path / f"glyphs{streamed}")
+        if streamed:
+            with storage.open_writer(output) as writer:
+                for frame in frames:
+                    writer.append(frame)
+        else:
+            storage.save(frames, output)
+        
+        data = ASCIIStorage(ASCIIConfig()).load(f"{output}.npz")
+        assert data['glyphs'].shape == (3, 3, 4)
+        assert data['palette'].startswith(' .:-=+*#%@')
+        assert list(data['frames']) == frames
+        assert np.load(f"{output}.npz", allow_pickle=False) is not None
+
+
+def test_color_playback(tmp_path):
+    """Colour planes round-trip through npz and render as coalesced SGR runs."""
+    sys.path.append('src')
+    import io
+    import numpy as np
+    from config import ASCIIConfig
+    from storage import ASCIIStorage
+    from renderer import DiffRenderer
+    from color import quantize, palette_lut, color_codes, style_rows, sgr, cell_colors, fit_colors, NO_COLOR
+    from frame_cache import ResizedFrameCache
+    
+    assert quantize(np.array([0, 255, 200], dtype=np.uint8), 5).tolist() == [0, 255, 206]
+    assert color_codes(np.array([[[255, 0, 0]]], dtype=np.uint8), 'ansi256')[0, 0] == 196
+    assert color_codes(np.array([[[255, 0, 0]]], dtype=np.uint8), 'ansi')[0, 0] == 9
+    assert len(palette_lut('ansi256')) == 32768
+    image = np.zeros((4, 6, 3), dtype=np.uint8)
+    image[:, 3:] = (255, 0, 0)  # BGR blue
+    assert cell_colors(image, 2, 2)[:, 1].tolist() == [[0, 0, 255]] * 2
+    assert cell_colors(image[..., 0], 1, 2).shape == (1, 2, 3)
+    
+    # One SGR per run, not per cell
+    codes = np.array([[1, 1, 1, 2, 2], [3, 3, 3, 3, 3]])
+    styled = style_rows(['abcde', 'fghij'], codes, 'ansi256')
+    assert styled[0] == f"{sgr(1, 'ansi256')}abc{sgr(2, 'ansi256')}de\033[39m"
+    assert styled[1].count('\033[38;5;') == 1
+    
+    frames = ['ab\ncd', 'ab\ncx']
+    planes = [np.full((2, 2, 3), value, dtype=np.uint8) for value in (0, 255)]
+    planes[1][0] = 0
+    storage = ASCIIStorage(ASCIIConfig(storage_format='npz'))
+    for streamed in (False, True):
+        output = str(tmp_path / f"color{streamed}")
+        if streamed:
+            with storage.open_writer(output) as writer:
+                for frame, plane in zip(frames, planes):
+                    writer.append(frame, plane)
+        else:
+            storage.save(frames, output, colors=planes)
+        colors = storage.load_colors(f"{output}.npz")
+        assert np.array_equal(np.asarray(colors), np.stack(planes))
+    
+    # Only the changed styled row is redrawn
+    out = io.StringIO()
+    renderer = DiffRenderer(out, color_mode='truecolor')
+    renderer.render(frames[0], colors=color_codes(planes[0], 'truecolor'))
+    out.seek(0)
+    out.truncate()
+    renderer.render(frames[1], colors=color_codes(planes[1], 'truecolor'))
+    assert '\033[1;1H' not in out.getvalue() and 'cx' in out.getvalue()
+    
+    # Colours are laid out at the cells the text samples, blank rows included
+    frame = '\n' + '\n'.join(['    '] * 4 + ['aaaa'] * 4 + ['wwww'] * 4) + '\n'
+    codes = np.repeat(np.array([7, 0, 1, 2, 7]), [1, 4, 4, 4, 1])[:, None].repeat(4, axis=1)
+    for key in [(4, 4, True, False), (8, 12, True, False), (10, 20, False, True), (10, 6, True, True)]:
+        text, layout = ResizedFrameCache([frame], prerender=False).get_with_layout(0, *key)
+        lines = text.split('\n')
+        fitted = fit_colors(codes, layout)
+        for row, col in np.ndindex(fitted.shape):
+            glyph = lines[row][col:col + 1] or ' '
+            assert glyph == ' ' if fitted[row, col] == NO_COLOR else fitted[row, col] == ' aw'.index(glyph)
+        if key == (4, 4, True, False):
+            assert lines == ['    ', '    ', 'aaaa', 'wwww']
+
+
+class _FakeVideo:
+    """Stand-in for VideoToASCII over a 10 fps, 1000-frame clip of numbered frames."""
+    FPS, FRAMES = 10.0, 1000
+    
+    def __init__(self, cfg):
+        self.cfg = cfg
+    
+    def extract_frames(self, video_file):
+        import numpy as np
+        skip = self.cfg.get_frame_skip(self.FPS)
+        start = int(self.cfg.start_time * self.FPS)
+        end = self.FRAMES if self.cfg.end_time is None else min(self.FRAMES, int(self.cfg.end_time * self.FPS))
+        for index in range(start, end):
+            if (index - start) % skip == 0:
+                yield np.full((4, 4, 3), index % 256, dtype=np.uint8)
+    
+    def enhance_frame(self, frame):
+        return frame
+    
+    def frame_to_ascii_custom(self, frame):
+        return f"{frame[0, 0, 0]:03d}\n..."
+
+
+def test_segment_conversion(monkeypatch):
+    """Parallel segment conversion matches the sequential frames exactly, in order."""
+    sys.path.append('src')
+    from concurrent.futures import ProcessPoolExecutor
+    from config import ASCIIConfig
+    import segments as segments_module
+    from segments import iter_ascii_frames, iter_segment_frames, plan_segments, SEGMENTS_IN_FLIGHT_PER_WORKER
+    
+    # Edge detection keeps conversion on the stand-in processor
+    cfg = ASCIIConfig(target_fps=5, start_time=3.3, end_time=95.0, show_progress=False, color_mode='ansi',
+                      edge_detection=True)
+    source = (_FakeVideo.FPS, _FakeVideo.FRAMES)
+    segments = plan_segments(cfg, *source, workers=2)
+    assert len(segments) > 2 and segments[-1][1:] == (None, None)
+    assert all(end == start + 2 * expected for start, end, expected in segments[:-1])
+    
+    sequential = list(iter_ascii_frames(_FakeVideo(cfg), cfg, 'clip.mp4'))
+    parallel = list(iter_segment_frames(_FakeVideo, cfg, 'clip.mp4', workers=2, source=source))
+    assert [frame for frame, _ in parallel] == [frame for frame, _ in sequential]
+    assert all((a == b).all() for (_, a), (_, b) in zip(parallel, sequential))
+    
+    # Metadata overstating the length: later segments come back empty
+    cfg.end_time = None
+    long_source = (_FakeVideo.FPS, 3 * _FakeVideo.FRAMES)
+    parallel = list(iter_segment_frames(_FakeVideo, cfg, 'clip.mp4', workers=2, source=long_source))
+    assert len(parallel) == len(list(iter_ascii_frames(_FakeVideo(cfg), cfg, 'clip.mp4')))
+    
+    # Only a window of segments is submitted ahead of the consumer
+    submitted = []
+    
+    class CountingPool(ProcessPoolExecutor):
+        def submit(self, *args):
+            submitted.append(args[-1])
+            return super().submit(*args)
+    
+    monkeypatch.setattr(segments_module, 'ProcessPoolExecutor', CountingPool)
+    frames = iter_segment_frames(_FakeVideo, cfg, 'clip.mp4', workers=2, source=long_source)
+    next(frames)
+    assert len(submitted) == 2 * SEGMENTS_IN_FLIGHT_PER_WORKER < len(plan_segments(cfg, *long_source, 2))
+    frames.close()
+
+
+def test_glyph_lut_mapping():
+    """The brightness LUT matches per-pixel mapping, for one frame and a batch."""
+    sys.path.append('src')
+    import numpy as np
+    from glyph_map import brightness_lut, map_frame, map_frames
+    
+    chars = " .:-=+*#%@"
+    lut = brightness_lut(chars)
+    assert len(lut) == 256 and lut[0] == 0 and lut[255] == len(chars) - 1
+    assert brightness_lut(chars, reverse=True)[0] == len(chars) - 1
+    assert np.bincount(lut).tolist() == [26, 26, 25, 26, 25, 26, 26, 25, 26, 25]
+    
+    gray = np.random.default_rng(0).integers(0, 256, (3, 6, 10), dtype=np.uint8)
+    for reverse in (False, True):
+        ramp = chars[::-1] if reverse else chars
+        expected = ['\n'.join(''.join(ramp[int(p) * len(ramp) // 256] for p in row) for row in frame)
+                    for frame in gray]
+        assert map_frame(gray[0], chars, reverse) == expected[0]
+        batch = map_frames(gray, chars, reverse)
+        assert batch.indices.shape == (3, 6, 10) and batch.decode() == expected
+    
+    # BGR frames are mapped by luma
+    bgr = np.zeros((2, 2, 3), dtype=np.uint8)
+    bgr[0] = 255
+    assert map_frame(bgr, chars) == '@@\n  '
+
+
+def test_braille_packing():
+    """Vectorised Braille packing matches per-cell dot numbering."""
+    sys.path.append('src')
+    import numpy as np
+    from braille import braille_frame, braille_frames, braille_masks, pack_dots
+    
+    # Dots 1-3 down the left column, 4-6 down the right, 7-8 along the bottom
+    bits = [(0, 0, 0), (1, 0, 1), (2, 0, 2), (0, 1, 3), (1, 1, 4), (2, 1, 5), (3, 0, 6), (3, 1, 7)]
+    for row, col, bit in bits:
+        dots = np.zeros((4, 2), dtype=bool)
+        dots[row, col] = True
+        assert pack_dots(dots)[0, 0] == 1 << bit
+    
+    gray = np.random.default_rng(1).integers(0, 256, (3, 12, 8), dtype=np.uint8)
+    expected = []
+    for frame in gray:
+        rows = []
+        for top in range(0, 12, 4):
+            cells = [sum(1 << bit for row, col, bit in bits if frame[top + row, left + col] >= 128)
+                     for left in range(0, 8, 2)]
+            rows.append(''.join(chr(0x2800 + mask) for mask in cells))
+        expected.append('\n'.join(rows))
+    assert braille_frame(gray[0]) == expected[0]
+    assert braille_frames(gray).decode() == expected
+    
+    # Partial cells are padded with unset dots
+    assert braille_frame(np.full((5, 3), 255, dtype=np.uint8)) == '\u28ff\u2847\n\u2809\u2801'
+    assert braille_masks(np.zeros((4, 2)), invert=True)[0, 0] == 0xFF
+
+
+def test_threshold_dithering():
+    """Ordered and blue-noise dithering keep average brightness and are stable."""
+    sys.path.append('src')
+    import numpy as np
+    from dither import bayer_matrix, threshold_matrix, threshold_map, dither_dots, dither_levels
+    from glyph_map import map_indices
+    from braille import braille_masks
+    from config import ASCIIConfig
+    from glyph_map import cell_grid
+    
+    assert bayer_matrix(4).tolist() == [[0, 8, 2, 10], [12, 4, 14, 6], [3, 11, 1, 9], [15, 7, 13, 5]]
+    for mode in ('bayer2', 'bayer4', 'bayer8', 'blue-noise'):
+        thresholds = threshold_matrix(mode)
+        assert np.allclose(np.sort(thresholds.ravel()), (np.arange(thresholds.size) + 0.5) / thresholds.size)
+        assert threshold_map(mode, 70, 90).shape == (70, 90)
+        
+        # Flat areas raise dots and pick glyph levels in proportion to brightness
+        flat = np.full((64, 64), 64, dtype=np.uint8)
+        assert abs(dither_dots(flat, mode).mean() - 64 / 255) < 0.02
+        assert abs(dither_levels(flat, 10, mode).mean() - 64 * 9 / 255) < 0.05
+        assert not dither_dots(np.zeros((8, 8)), mode).any() and dither_dots(np.full((8, 8), 255), mode).all()
+        
+        # A change in one pixel only changes that pixel's output
+        frame = np.random.default_rng(2).integers(0, 256, (16, 16), dtype=np.uint8)
+        changed = frame.copy()
+        changed[5, 5] ^= 0x80
+        difference = (map_indices(frame, ' .:-=+*#%@', dither_mode=mode)
+                      != map_indices(changed, ' .:-=+*#%@', dither_mode=mode))
+        difference[5, 5] = False
+        assert not difference.any()
+        assert braille_masks(frame[None], dither_mode=mode).shape == (1, 4, 8)
+    
+    # The cell grid keeps the clip's shape when either dimension is the limit
+    cfg = ASCIIConfig(width=100, height=40)
+    assert cell_grid(cfg, 1080, 1920) == (100, 28)
+    assert cell_grid(cfg, 1920, 1080) == (45, 40)
+    cfg.maintain_aspect_ratio = False
+    assert cell_grid(cfg, 1920, 1080) == (100, 40)
+
+
 if __name__ == '__main__':
     success = test_package()
     sys.exit(0 if success else 1) 
\ No newline at end of file